@@ -4,7 +4,145 @@ Espen LangChain - Visual Learning Environment for Multi-Agent Workflows
 
 A project optimized for visual learning and exploration of LangChain and LangGraph
 multi-agent systems, designed for design leaders and AI-native builders.
+
+Command line (run from the repository root):
+
+    python -m python setup                 # Verify the environment
+    python -m python simple                # 01: simple agent
+    python -m python graph                 # 02: multi-agent graph + DAG simulation
+    python -m python workflow [args...]    # 03: LangGraph workflow (e.g. --batch tasks.jsonl)
+    python -m python workflow --serve      # 03 as an HTTP service (/invoke, /stream, /batch, /metrics)
+    python -m python benchmark [args...]   # Offline benchmark suites
+    python -m python loadtest [args...]    # 03 over HTTP against a local OpenAI-compatible stub
+    python -m python versions              # Installed package versions (no heavy imports)
+    python -m python profile-imports graph # Which modules cost the most at startup
+
+Each subcommand imports only what it needs, so short-lived jobs don't pay for
+LangChain, LangGraph or matplotlib unless they use them.
 """
 
+import os
+import sys
+
 __version__ = "0.1.0"
 
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Subcommand -> script it runs (relative to this package)
+SCRIPTS = {
+    "setup": ("notebooks/00_setup_and_overview.py", "Verify the environment and API keys"),
+    "simple": ("examples/01_simple_agent.py", "Run the simple agent example"),
+    "graph": ("examples/02_multi_agent_graph.py", "Run the multi-agent graph example"),
+    "workflow": ("examples/03_langgraph_real_multi_agent.py", "Run the LangGraph multi-agent workflow"),
+    "benchmark": ("benchmarks/run_benchmarks.py", "Run the offline benchmark suites"),
+    "loadtest": ("benchmarks/load_test.py", "Load-test the workflow against a local OpenAI-compatible stub"),
+}
+
+# Packages reported by `versions`
+PACKAGES = ("langchain", "langchain-core", "langgraph", "langchain-openai",
+            "langchain-anthropic", "matplotlib", "networkx", "aiohttp")
+
+
+def run_script(name: str, args=()) -> None:
+    """Run one of the package's scripts as `__main__` with the given arguments."""
+    import runpy
+
+    path = os.path.join(PACKAGE_DIR, SCRIPTS[name][0])
+    saved_argv = sys.argv
+    sys.argv = [path, *args]
+    try:
+        runpy.run_path(path, run_name="__main__")
+    finally:
+        sys.argv = saved_argv
+
+
+def print_versions() -> None:
+    """Print installed package versions from metadata (nothing is imported)."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    print(f"Python: {sys.version.split()[0]}")
+    for package in PACKAGES:
+        try:
+            print(f"✅ {package}: {version(package)}")
+        except PackageNotFoundError:
+            print(f"➖ {package}: not installed")
+
+
+def parse_importtime(stderr: str):
+    """Parse `-X importtime` output into (module, self_us, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def profile_imports(target: str, top: int = 20, sort: str = "cumulative") -> int:
+    """Import `target` in a fresh interpreter with `-X importtime` and report the costliest modules.
+
+    `target` is a subcommand name (its script is loaded without running it) or
+    a module name importable from the repository root.
+    """
+    import subprocess
+
+    if target in SCRIPTS:
+        path = os.path.join(PACKAGE_DIR, SCRIPTS[target][0])
+        code = f"import runpy; runpy.run_path({path!r}, run_name='profiled')"
+    else:
+        code = f"import {target}"
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(PACKAGE_DIR),
+    )
+    rows = parse_importtime(result.stderr)
+    if result.returncode != 0:
+        print(f"❌ Importing {target} failed:")
+        print("\n".join(l for l in result.stderr.splitlines() if not l.startswith("import time:")))
+        return result.returncode
+
+    total_ms = sum(r[1] for r in rows) / 1000
+    key = 1 if sort == "self" else 2
+    print(f"⏱️  Import time for {target}: {total_ms:.0f}ms across {len(rows)} modules")
+    print(f"\n   {'module':<48} {'self ms':>9} {'cumulative ms':>14}")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda r: r[key], reverse=True)[:top]:
+        print(f"   {module:<48} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+    return 0
+
+
+def main(argv=None) -> int:
+    """Entry point for `python -m python`."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m python", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--version", action="version", version=__version__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Script commands take no options of their own: everything after the
+    # command name (including --help) is passed through to the script
+    for name, (_, help_text) in SCRIPTS.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+
+    commands.add_parser("versions", help="Show installed package versions")
+
+    profile = commands.add_parser("profile-imports", help="Report which modules cost the most at startup")
+    profile.add_argument("target", nargs="?", default="python",
+                         help=f"Subcommand ({', '.join(SCRIPTS)}) or module to import (default: python)")
+    profile.add_argument("--top", type=int, default=20, help="Number of modules to show")
+    profile.add_argument("--sort", choices=("cumulative", "self"), default="cumulative",
+                         help="Rank by time including (cumulative) or excluding (self) sub-imports")
+
+    args, script_args = parser.parse_known_args(argv)
+    if script_args and args.command not in SCRIPTS:
+        parser.error(f"unrecognized arguments: {' '.join(script_args)}")
+    if args.command == "versions":
+        print_versions()
+    elif args.command == "profile-imports":
+        return profile_imports(args.target, top=args.top, sort=args.sort)
+    else:
+        run_script(args.command, script_args)
+    return 0
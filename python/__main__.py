@@ -0,0 +1,7 @@
+"""Allow `python -m python <command>` from the repository root."""
+
+import sys
+
+from . import main
+
+sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Agents - Reusable Building Blocks for the Examples
+===================================================
+
+Shared infrastructure used by the runnable examples in `python/examples/`.
+Import the submodule you need directly (e.g. `from agents.pool import AgentPool`)
+so that each example only pays for the dependencies it actually uses.
+
+Modules:
+- pool: Build each configured model + tool binding once per process
+- batch: Run many tasks through a compiled graph with bounded concurrency
+- stats: Percentile and latency summary helpers
+- providers: Select the chat model backend (openai, anthropic, fake) from config
+- fake_llm: Deterministic offline chat model with realistic timing
+- tokens: Cheap token estimates for budgeting and cost
+- loader: Import the numbered example scripts as modules
+- cache: Persistent SQLite response cache for deterministic agents
+- pricing: Per-model token prices and cost estimates
+- history: Token-budgeted message windows and a bounded state reducer
+- tracing: Per-node latency, token and cost spans with local JSONL export
+- streaming: Forward agent tokens live, labelled by node, with time-to-first-token
+- dag: Dependency-aware concurrent execution of workflow steps
+- tool_executor: Concurrent tool-call execution with per-tool timeouts and limits
+- checkpoint: Durable SQLite checkpoints with incremental message storage and resume
+- tool_cache: TTL memoization for tools with merged concurrent calls and hit-rate stats
+- render: Cached graph diagrams (skip unchanged outputs, reuse layouts, parallel batches)
+- graph_render: Offline SVG/PNG diagrams of compiled LangGraph workflows
+- registry: Compile each graph once per configuration and share it
+- service: aiohttp service (invoke, SSE stream, batch, metrics) with admission control
+- scheduler: Rate-limit-aware admission for model calls (token buckets, priorities, fair queuing)
+- hedging: Hedged, deadline-bounded model calls with fallbacks and wasted-spend reporting
+- router: Tiered model selection by live latency, errors and cost, with cross-provider failover
+- quality_gate: Opt-in local draft checks that reject clearly broken drafts before the reviewer LLM
+- pipeline: Start downstream agents on streamed upstream sections, and time it against sequential runs
+- stub_server: Local OpenAI-compatible chat completions server (latency, errors, 429s, streaming) for load tests
+"""
@@ -0,0 +1,156 @@
+"""
+Batch Runner - Push Many Tasks Through One Compiled Graph
+==========================================================
+
+Runs a stream of tasks through a compiled LangGraph graph with a bounded number
+of workflows in flight, writes each result as soon as it finishes, and reports
+throughput plus p50/p95/p99 latency. Each task is isolated: an exception is
+recorded on that task's result line and the batch carries on.
+
+Task files are JSONL, one task per line, either a JSON string or an object:
+    {"id": "t1", "task": "Research and summarize multi-agent AI systems"}
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional
+
+from .stats import format_latency_summary, latency_summary
+
+
+def load_tasks(path: str) -> Iterator[Dict[str, Any]]:
+    """Lazily read tasks from a JSONL file (blank lines are skipped)."""
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                task = json.loads(line)
+            except json.JSONDecodeError as e:
+                # Surface the bad line as a failed task instead of aborting the batch
+                yield {"id": str(line_number), "parse_error": str(e)}
+                continue
+            if isinstance(task, str):
+                task = {"task": task}
+            if not isinstance(task, dict):
+                yield {"id": str(line_number),
+                       "parse_error": f"Expected a JSON object or string, got {type(task).__name__}"}
+                continue
+            task.setdefault("id", str(line_number))
+            yield task
+
+
+def default_summarize(final_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a final workflow state to something small enough to write per task."""
+    messages = final_state.get("messages", [])
+    last = messages[-1] if messages else None
+    return {
+        "output": getattr(last, "content", None),
+        "message_count": len(messages),
+    }
+
+
+@dataclass
+class BatchReport:
+    """Aggregate outcome of a batch run."""
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    wall_time: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Completed tasks per second over the whole batch."""
+        return self.total / self.wall_time if self.wall_time else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "wall_time": self.wall_time,
+            "throughput": self.throughput,
+            "latency": latency_summary(self.latencies),
+        }
+
+    def print_summary(self) -> None:
+        print(f"📦 Tasks: {self.total} ({self.succeeded} ok, {self.failed} failed)")
+        print(f"⏱️  Wall time: {self.wall_time:.2f}s  |  Throughput: {self.throughput:.2f} tasks/s")
+        print(f"📈 Latency: {format_latency_summary(latency_summary(self.latencies))}")
+
+
+async def arun_batch(
+    graph,
+    tasks: Iterable[Dict[str, Any]],
+    build_state: Callable[[Dict[str, Any]], Dict[str, Any]],
+    concurrency: int = 8,
+    output_path: Optional[str] = None,
+    summarize: Callable[[Dict[str, Any]], Dict[str, Any]] = default_summarize,
+    config: Optional[Dict[str, Any]] = None,
+    task_scope: Optional[Callable[[Dict[str, Any]], ContextManager]] = None,
+) -> BatchReport:
+    """Run every task through `graph.ainvoke` with at most `concurrency` in flight.
+
+    `tasks` may be any (possibly very long) iterable; it is consumed lazily by
+    `concurrency` workers, so memory stays flat regardless of batch size.
+    `task_scope(task)`, if given, is entered around each task's run (e.g.
+    `agents.scheduler.scheduler_scope` to tag its model calls).
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    report = BatchReport()
+    task_iter = iter(tasks)
+    output = open(output_path, "w") if output_path else None
+
+    def record(result: Dict[str, Any]) -> None:
+        report.total += 1
+        if result["ok"]:
+            report.succeeded += 1
+        else:
+            report.failed += 1
+        report.latencies.append(result["latency"])
+        if output:
+            output.write(json.dumps(result, default=str) + "\n")
+            output.flush()
+
+    async def run_one(task: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = {"id": task.get("id")}
+        try:
+            if "parse_error" in task:
+                raise ValueError(f"Invalid task line: {task['parse_error']}")
+            with task_scope(task) if task_scope else contextlib.nullcontext():
+                final_state = await graph.ainvoke(build_state(task), config=config)
+            result.update(ok=True, **summarize(final_state))
+        except Exception as e:
+            # Isolate the failure to this task and keep the batch going
+            result.update(ok=False, error=f"{type(e).__name__}: {e}",
+                          traceback=traceback.format_exc(limit=5))
+        result["latency"] = time.perf_counter() - started
+        return result
+
+    async def worker() -> None:
+        # All workers share one iterator; `next` never yields control, so no lock is needed
+        for task in task_iter:
+            record(await run_one(task))
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        report.wall_time = time.perf_counter() - started
+        if output:
+            output.close()
+    return report
+
+
+def run_batch(graph, tasks, build_state, **kwargs) -> BatchReport:
+    """Synchronous wrapper around `arun_batch`."""
+    return asyncio.run(arun_batch(graph, tasks, build_state, **kwargs))
@@ -0,0 +1,181 @@
+"""
+Response Cache - Persistent LLM Cache for Deterministic Agents
+===============================================================
+
+Agents that run with `temperature=0` and a fixed seed give (essentially) the
+same answer to the same prompt, so paying for the call again is waste.
+`SQLiteResponseCache` is a LangChain `BaseCache` backed by a local SQLite file:
+
+- Keys cover the model, its parameters and bound tool schemas (LangChain's
+  `llm_string`) plus the message list, normalized so per-run ids and metadata
+  do not cause misses
+- Entries expire after `ttl_seconds`; the least recently used are evicted past
+  `max_entries`
+- Hits, misses and the estimated cost saved are tracked
+
+Caching is opt-in per agent: pass `cache=response_cache` when creating the
+models that should use it, and leave non-deterministic agents (like a
+temperature 0.7 writer) out.
+
+    LLM_CACHE_PATH=python/.cache/llm_cache.sqlite   # enables get_response_cache()
+    LLM_CACHE_TTL_SECONDS=86400
+    LLM_CACHE_MAX_ENTRIES=10000
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration
+
+from .pricing import message_cost
+
+# Per-call fields that differ between otherwise identical conversations
+# (`additional_kwargs` only duplicates provider-specific tool call payloads)
+_VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata", "additional_kwargs")
+
+
+def _normalize(value: Any, call_ids: Optional[Dict[str, str]] = None) -> Any:
+    """Drop volatile fields from serialized messages and renumber tool call ids.
+
+    Providers generate random tool call ids, so the same tool exchange would
+    otherwise never produce the same key twice.
+    """
+    call_ids = {} if call_ids is None else call_ids
+
+    def stable_id(call_id: str) -> str:
+        return call_ids.setdefault(call_id, f"call_{len(call_ids)}")
+
+    if isinstance(value, list):
+        return [_normalize(v, call_ids) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    normalized = {k: _normalize(v, call_ids) for k, v in value.items()}
+    kwargs = normalized.get("kwargs")
+    if isinstance(kwargs, dict):
+        for field in _VOLATILE_FIELDS:
+            kwargs.pop(field, None)
+        if "tool_call_id" in kwargs:
+            kwargs["tool_call_id"] = stable_id(kwargs["tool_call_id"])
+        for call in kwargs.get("tool_calls") or []:
+            if isinstance(call, dict) and "id" in call:
+                call["id"] = stable_id(call["id"])
+    return normalized
+
+
+class SQLiteResponseCache(BaseCache):
+    """Disk-backed LangChain cache with TTL and LRU-size eviction."""
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = 10_000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.cost_saved = 0.0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " cost REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used_at)")
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        """Stable key for a (messages, model configuration) pair."""
+        try:
+            prompt = json.dumps(_normalize(json.loads(prompt)), sort_keys=True)
+        except ValueError:
+            pass  # Not JSON (e.g. a plain-text LLM prompt) - use as is
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str):
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, cost, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl_seconds is not None and now - row[2] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self.cost_saved += row[1]
+        return [ChatGeneration(message=m) for m in messages_from_dict(json.loads(row[0]))]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        messages = [getattr(g, "message", None) for g in return_val]
+        if not messages or any(m is None for m in messages):
+            return  # Only chat model generations are cached
+        key = self.make_key(prompt, llm_string)
+        value = json.dumps([message_to_dict(m) for m in messages])
+        cost = sum(message_cost(m) for m in messages)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, cost, created_at, last_used_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, cost, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+            "cost_saved_usd": self.cost_saved,
+        }
+
+
+def get_response_cache() -> Optional[SQLiteResponseCache]:
+    """Return the cache configured by LLM_CACHE_* env vars, or None when disabled."""
+    path = os.getenv("LLM_CACHE_PATH")
+    if not path:
+        return None
+    ttl = os.getenv("LLM_CACHE_TTL_SECONDS")
+    max_entries = os.getenv("LLM_CACHE_MAX_ENTRIES")
+    return SQLiteResponseCache(
+        path,
+        ttl_seconds=float(ttl) if ttl else None,
+        max_entries=int(max_entries) if max_entries else 10_000,
+    )
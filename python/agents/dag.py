@@ -0,0 +1,164 @@
+"""
+DAG - Run Dependent Agent Steps Concurrently
+=============================================
+
+Describe a workflow as tasks plus the tasks they depend on, and `TaskGraph`
+starts every task as soon as its dependencies have finished. Independent
+steps (e.g. a supervisor planning while a researcher searches) overlap
+instead of waiting on each other.
+
+    dag = TaskGraph()
+    dag.add_task("research", lambda deps: researcher.process("..."))
+    dag.add_task("write", lambda deps: writer.process(deps["research"]), depends_on=["research"])
+    report = dag.run()
+    report.print_timing()   # serial time vs critical path vs actual wall time
+
+Task functions receive a dict of their dependencies' results and may be
+plain functions (run on worker threads) or coroutines (awaited directly).
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class TaskResult:
+    """Outcome and timing of one task (times relative to the run start)."""
+    name: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    started: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class DagReport:
+    """Results of a DAG run plus the numbers needed to judge the speedup."""
+    results: Dict[str, TaskResult] = field(default_factory=dict)
+    wall_time: float = 0.0
+    serial_time: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_time: float = 0.0
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name].value
+
+    def print_timing(self) -> None:
+        print("⏱️  Timing:")
+        print(f"   Serial (sum of steps):  {self.serial_time:.2f}s")
+        print(f"   Critical path:          {self.critical_path_time:.2f}s  ({' → '.join(self.critical_path)})")
+        print(f"   Actual wall time:       {self.wall_time:.2f}s")
+        if self.wall_time:
+            print(f"   Speedup vs serial:      {self.serial_time / self.wall_time:.2f}x")
+
+
+class TaskGraph:
+    """A set of tasks with dependencies, executed with maximum overlap."""
+
+    def __init__(self):
+        self._tasks: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._deps: Dict[str, List[str]] = {}
+
+    def add_task(self, name: str, fn: Callable[[Dict[str, Any]], Any], depends_on: Sequence[str] = ()) -> None:
+        """Add a task; `fn(deps)` gets a dict of its dependencies' results."""
+        if name in self._tasks:
+            raise ValueError(f"Task '{name}' already exists")
+        self._tasks[name] = fn
+        self._deps[name] = list(depends_on)
+
+    @property
+    def dependencies(self) -> Dict[str, List[str]]:
+        return {name: list(deps) for name, deps in self._deps.items()}
+
+    def topological_order(self) -> List[str]:
+        """Tasks in an order that respects dependencies (raises on cycles/unknown deps)."""
+        for name, deps in self._deps.items():
+            for dep in deps:
+                if dep not in self._tasks:
+                    raise ValueError(f"Task '{name}' depends on unknown task '{dep}'")
+
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Dependency cycle: {' → '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self._deps[name]:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self._tasks:
+            visit(name, [])
+        return order
+
+    async def arun(self) -> DagReport:
+        """Run all tasks, each starting as soon as its dependencies finish."""
+        order = self.topological_order()
+        report = DagReport()
+        futures: Dict[str, asyncio.Future] = {}
+        run_started = time.perf_counter()
+
+        async def run_task(name: str) -> Any:
+            # Wait for dependencies; a failed dependency fails this task too
+            dep_values = {dep: await futures[dep] for dep in self._deps[name]}
+            result = TaskResult(name=name, started=time.perf_counter() - run_started)
+            report.results[name] = result
+            fn = self._tasks[name]
+            try:
+                if inspect.iscoroutinefunction(fn):
+                    result.value = await fn(dep_values)
+                else:
+                    result.value = await asyncio.to_thread(fn, dep_values)
+            except BaseException as e:
+                result.error = e
+                raise
+            finally:
+                result.finished = time.perf_counter() - run_started
+            return result.value
+
+        for name in order:
+            futures[name] = asyncio.ensure_future(run_task(name))
+        try:
+            await asyncio.gather(*futures.values())
+        finally:
+            for future in futures.values():
+                future.cancel()
+            report.wall_time = time.perf_counter() - run_started
+            self._fill_timing(report, order)
+        return report
+
+    def run(self) -> DagReport:
+        """Synchronous wrapper around `arun`."""
+        return asyncio.run(self.arun())
+
+    def _fill_timing(self, report: DagReport, order: List[str]) -> None:
+        """Serial time and the longest dependency chain, from measured durations."""
+        durations = {n: r.duration for n, r in report.results.items()}
+        report.serial_time = sum(durations.values())
+
+        longest: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in order:
+            best = max(self._deps[name], key=lambda d: longest.get(d, 0.0), default=None)
+            longest[name] = durations.get(name, 0.0) + (longest.get(best, 0.0) if best else 0.0)
+            previous[name] = best
+
+        if longest:
+            end = max(longest, key=longest.get)
+            report.critical_path_time = longest[end]
+            path = []
+            while end is not None:
+                path.append(end)
+                end = previous[end]
+            report.critical_path = list(reversed(path))
@@ -0,0 +1,264 @@
+"""
+Fake LLM - Deterministic, Offline Chat Model for Demos and Load Tests
+======================================================================
+
+`FakeChatModel` is a drop-in `BaseChatModel` that never touches the network:
+- Responses are deterministic for a given (model, seed, messages)
+- `bind_tools` works, and the model emits real tool calls for bound tools
+- Latency follows a configurable distribution (constant/uniform/normal/lognormal)
+  plus a per-token generation time, so timings look like a real provider
+- Every response carries `usage_metadata` with prompt/completion token counts
+- Sync, async and streaming (token-by-token) paths are all supported
+
+Configure it in code or through environment variables (see `from_env`):
+    FAKE_LLM_LATENCY_MS=400 FAKE_LLM_LATENCY_DISTRIBUTION=lognormal \\
+    LLM_PROVIDER=fake python python/examples/03_langgraph_real_multi_agent.py
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+from .tokens import estimate_messages_tokens
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal")
+
+_VOCABULARY = (
+    "agents coordinate specialized roles through shared state while a supervisor "
+    "routes work between research writing and review steps each agent uses tools "
+    "to gather evidence summarize findings and refine drafts graphs make the flow "
+    "explicit so failures retries and handoffs are easy to inspect and measure"
+).split()
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline chat model with realistic timing and tool-calling behaviour."""
+
+    model: str = "gpt-4o-mini"
+    temperature: float = 0.0
+    seed: int = 42
+
+    # Time to first token, in milliseconds
+    latency_ms: float = 0.0
+    latency_distribution: str = "constant"
+    # Uniform/normal: spread in ms (half-width / standard deviation). Lognormal: sigma.
+    latency_spread: float = 0.0
+    # Generation speed after the first token (0 = instantaneous)
+    tokens_per_second: float = 0.0
+
+    # Mean completion length in tokens (actual length varies +/- 25%)
+    completion_tokens: int = 60
+    # "first": call a bound tool unless the latest message is a tool result
+    # "never": always answer with text
+    tool_call_mode: str = "first"
+
+    _latency_rng: random.Random = PrivateAttr()
+    _calls: int = PrivateAttr(default=0)
+
+    def __init__(self, **kwargs: Any):
+        # Accept the same `model_kwargs={"seed": ...}` shape the real providers use
+        model_kwargs = kwargs.pop("model_kwargs", None) or {}
+        if "seed" in model_kwargs:
+            kwargs.setdefault("seed", model_kwargs["seed"])
+        super().__init__(**kwargs)
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"latency_distribution must be one of {LATENCY_DISTRIBUTIONS}, "
+                f"got '{self.latency_distribution}'"
+            )
+        self._latency_rng = random.Random(self.seed)
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> "FakeChatModel":
+        """Build a fake model, filling timing/size settings from FAKE_LLM_* env vars."""
+        env = {
+            "latency_ms": ("FAKE_LLM_LATENCY_MS", float),
+            "latency_distribution": ("FAKE_LLM_LATENCY_DISTRIBUTION", str),
+            "latency_spread": ("FAKE_LLM_LATENCY_SPREAD", float),
+            "tokens_per_second": ("FAKE_LLM_TOKENS_PER_SECOND", float),
+            "completion_tokens": ("FAKE_LLM_COMPLETION_TOKENS", int),
+            "tool_call_mode": ("FAKE_LLM_TOOL_CALLS", str),
+        }
+        for field_name, (var, cast) in env.items():
+            if field_name not in kwargs and os.getenv(var):
+                kwargs[field_name] = cast(os.environ[var])
+        return cls(**kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "temperature": self.temperature, "seed": self.seed}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """Bind tools the same way real providers do (as OpenAI tool schemas)."""
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    # ------------------------------------------------------------------
+    # Response construction
+    # ------------------------------------------------------------------
+    def _rng_for(self, messages: List[BaseMessage]) -> random.Random:
+        digest = hashlib.sha256()
+        digest.update(f"{self.model}|{self.seed}".encode())
+        for message in messages:
+            digest.update(f"{message.type}:{message.content}".encode())
+        return random.Random(int.from_bytes(digest.digest()[:8], "big"))
+
+    def _build_message(self, messages: List[BaseMessage], tools: Optional[List[Dict]]) -> AIMessage:
+        rng = self._rng_for(messages)
+        prompt_tokens = estimate_messages_tokens(messages)
+        self._calls += 1
+
+        if tools and self.tool_call_mode == "first" and not isinstance(messages[-1], ToolMessage):
+            tool = tools[rng.randrange(len(tools))]["function"]
+            args = self._fake_args(tool, messages)
+            call_id = f"call_{rng.getrandbits(48):012x}"
+            completion = max(1, len(json.dumps(args)) // 4)
+            return AIMessage(
+                content="",
+                tool_calls=[{"name": tool["name"], "args": args, "id": call_id}],
+                usage_metadata=_usage(prompt_tokens, completion),
+                response_metadata={"model_name": self.model, "finish_reason": "tool_calls"},
+            )
+
+        length = max(1, int(self.completion_tokens * rng.uniform(0.75, 1.25)))
+        words = [rng.choice(_VOCABULARY) for _ in range(length)]
+        # Break the text into sentences so it reads like real prose
+        for i in range(0, length, 12):
+            words[i] = words[i].capitalize()
+            if i > 0:
+                words[i - 1] += "."
+        text = " ".join(words) + "."
+        return AIMessage(
+            content=text,
+            usage_metadata=_usage(prompt_tokens, length),
+            response_metadata={"model_name": self.model, "finish_reason": "stop"},
+        )
+
+    def respond(self, messages: List[BaseMessage], tools: Optional[List[Dict]] = None) -> AIMessage:
+        """The reply to `messages` (tools as OpenAI schemas), built without any delay."""
+        return self._build_message(messages, tools)
+
+    @staticmethod
+    def _fake_args(tool: Dict[str, Any], messages: List[BaseMessage]) -> Dict[str, Any]:
+        """Fill a tool's required arguments from the latest human message."""
+        request = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "the task"
+        )
+        parameters = tool.get("parameters", {})
+        defaults = {"integer": 0, "number": 0.0, "boolean": False, "array": [], "object": {}}
+        args = {}
+        for name in parameters.get("required", []):
+            kind = parameters.get("properties", {}).get(name, {}).get("type", "string")
+            args[name] = str(request)[:200] if kind == "string" else defaults.get(kind)
+        return args
+
+    # ------------------------------------------------------------------
+    # Timing
+    # ------------------------------------------------------------------
+    def sample_latency(self) -> float:
+        """Sample a time-to-first-token in seconds from the configured distribution."""
+        mean, spread, rng = self.latency_ms, self.latency_spread, self._latency_rng
+        if self.latency_distribution == "uniform":
+            value = rng.uniform(mean - spread, mean + spread)
+        elif self.latency_distribution == "normal":
+            value = rng.gauss(mean, spread)
+        elif self.latency_distribution == "lognormal":
+            # `latency_ms` is the median; `latency_spread` is sigma of the log
+            value = math.exp(rng.gauss(math.log(mean), spread)) if mean > 0 else 0.0
+        else:
+            value = mean
+        return max(0.0, value) / 1000.0
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _total_delay(self, message: AIMessage) -> float:
+        completion = message.usage_metadata["output_tokens"] if message.usage_metadata else 0
+        return self.sample_latency() + completion * self._token_delay()
+
+    # ------------------------------------------------------------------
+    # BaseChatModel hooks
+    # ------------------------------------------------------------------
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._build_message(messages, kwargs.get("tools"))
+        delay = self._total_delay(message)
+        if delay:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._build_message(messages, kwargs.get("tools"))
+        delay = self._total_delay(message)
+        if delay:
+            await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        message = self._build_message(messages, kwargs.get("tools"))
+        first_token = self.sample_latency()
+        if first_token:
+            time.sleep(first_token)
+        for i, chunk in enumerate(_chunks(message)):
+            if i and self._token_delay():
+                time.sleep(self._token_delay())
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._build_message(messages, kwargs.get("tools"))
+        first_token = self.sample_latency()
+        if first_token:
+            await asyncio.sleep(first_token)
+        for i, chunk in enumerate(_chunks(message)):
+            if i and self._token_delay():
+                await asyncio.sleep(self._token_delay())
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, int]:
+    return {
+        "input_tokens": prompt_tokens,
+        "output_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _chunks(message: AIMessage) -> Iterator[ChatGenerationChunk]:
+    """Split a finished message into streaming chunks (one per word)."""
+    if message.tool_calls:
+        tool_call_chunks = [
+            {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": i}
+            for i, tc in enumerate(message.tool_calls)
+        ]
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", tool_call_chunks=tool_call_chunks,
+            usage_metadata=message.usage_metadata, response_metadata=message.response_metadata,
+        ))
+        return
+
+    words = message.content.split(" ")
+    for i, word in enumerate(words):
+        last = i == len(words) - 1
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content=word if last else word + " ",
+            # Usage and finish reason arrive with the final chunk, as with real providers
+            usage_metadata=message.usage_metadata if last else None,
+            response_metadata=message.response_metadata if last else {},
+        ))
@@ -0,0 +1,322 @@
+"""
+Graph Render - Offline Diagrams of Compiled LangGraph Workflows
+================================================================
+
+`graph.get_graph().draw_mermaid_png()` sends the diagram to a remote rendering
+service, so without network access every run waits for a timeout before it
+fails. This module draws the same node/edge structure locally, with no network
+calls:
+
+- `to_svg(graph)` lays the graph out top-down (ranks by longest path from
+  `__start__`) and writes a standalone SVG in the Mermaid color scheme:
+  conditional edges dashed, loops curved around the side
+- `to_png(graph, path)` draws the same layout with matplotlib
+- `render_workflow(graph, path)` picks the remote or local renderer: local
+  whenever the rendering service is unreachable (or `GRAPH_RENDERER=local`)
+- `compare_renderers(graph)` times the local and remote paths side by side
+
+Usage:
+    result = render_workflow(compiled.get_graph(), "python/visualizations/03_workflow.png")
+    print(result.renderer, result.seconds)
+
+    GRAPH_RENDERER=auto     # auto (default), local or remote
+"""
+
+import functools
+import os
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+MERMAID_HOST = "mermaid.ink"
+
+# Mermaid's default LangGraph theme
+NODE_FILL = "#f2f0ff"
+END_FILL = "#bfb6fc"
+STROKE = "#9370db"
+EDGE_COLOR = "#333333"
+
+NODE_HEIGHT = 40
+RANK_GAP = 80
+NODE_GAP = 40
+CHAR_WIDTH = 8
+MARGIN = 30
+
+
+@dataclass
+class GraphRenderResult:
+    """Where a diagram was written, by which renderer and how long it took."""
+    path: str
+    renderer: str  # "remote" or "local"
+    seconds: float
+    fallback_reason: Optional[str] = None
+
+
+@dataclass
+class _Box:
+    x: float  # Center
+    y: float  # Top
+    width: float
+    label: str
+    kind: str  # "first", "last" or "default"
+
+
+def _label(node) -> str:
+    return str(getattr(node, "name", None) or node.id)
+
+
+def layout(graph) -> Dict[str, _Box]:
+    """Top-down layered layout: each node sits one rank below its deepest forward predecessor."""
+    ids = list(graph.nodes)
+    successors: Dict[str, List[str]] = {n: [] for n in ids}
+    for edge in graph.edges:
+        successors[edge.source].append(edge.target)
+
+    # Depth-first search from the entry point to find the edges that close loops
+    start = "__start__" if "__start__" in successors else ids[0]
+    back_edges, visiting, done = set(), set(), set()
+
+    def visit(node):
+        visiting.add(node)
+        for nxt in successors[node]:
+            if nxt in visiting:
+                back_edges.add((node, nxt))
+            elif nxt not in done:
+                visit(nxt)
+        visiting.discard(node)
+        done.add(node)
+
+    visit(start)
+    for node in ids:
+        if node not in done:
+            visit(node)
+
+    # Longest path over the remaining (acyclic) edges
+    rank = {n: 0 for n in ids}
+    for _ in ids:
+        changed = False
+        for edge in graph.edges:
+            if (edge.source, edge.target) not in back_edges and rank[edge.target] <= rank[edge.source]:
+                rank[edge.target] = rank[edge.source] + 1
+                changed = True
+        if not changed:
+            break
+    if "__end__" in rank and len(ids) > 1:
+        # Keep the exit on its own bottom row
+        rank["__end__"] = max(r for n, r in rank.items() if n != "__end__") + 1
+
+    rows: Dict[int, List[str]] = {}
+    for node in ids:
+        rows.setdefault(rank[node], []).append(node)
+
+    widths = {n: max(80, CHAR_WIDTH * len(_label(graph.nodes[n])) + 40) for n in ids}
+    row_widths = {r: sum(widths[n] for n in row) + NODE_GAP * (len(row) - 1) for r, row in rows.items()}
+    canvas = max(row_widths.values())
+
+    boxes = {}
+    for r, row in rows.items():
+        x = MARGIN + (canvas - row_widths[r]) / 2
+        for node in row:
+            kind = "first" if node == "__start__" else "last" if node == "__end__" else "default"
+            boxes[node] = _Box(x + widths[node] / 2, MARGIN + r * (NODE_HEIGHT + RANK_GAP),
+                               widths[node], _label(graph.nodes[node]), kind)
+            x += widths[node] + NODE_GAP
+    return boxes
+
+
+Point = Tuple[float, float]
+
+
+def edge_routes(graph, boxes: Dict[str, _Box]) -> List[Tuple[object, Tuple[Point, Point, Point, Point], Point]]:
+    """Cubic Bezier (start, control, control, end) and label point for every edge.
+
+    Edges to the next rank go straight down. Longer forward edges curve around
+    the left of the diagram and loops back up around the right, each one a
+    little further out so they don't overlap.
+    """
+    routes = []
+    left = right = 0
+    min_x = min(b.x - b.width / 2 for b in boxes.values())
+    max_x = max(b.x + b.width / 2 for b in boxes.values())
+    for edge in graph.edges:
+        src, dst = boxes[edge.source], boxes[edge.target]
+        ranks = round((dst.y - src.y) / (NODE_HEIGHT + RANK_GAP))
+        if ranks == 1:
+            x1, y1, x2, y2 = src.x, src.y + NODE_HEIGHT, dst.x, dst.y
+            mid = (y1 + y2) / 2
+            routes.append((edge, ((x1, y1), (x1, mid), (x2, mid), (x2, y2)), ((x1 + x2) / 2, mid)))
+        elif ranks > 1:
+            left += 1
+            side = min_x - 30 * left
+            x1, y1 = src.x - src.width / 2, src.y + NODE_HEIGHT / 2
+            x2, y2 = dst.x - dst.width / 2, dst.y + NODE_HEIGHT / 2
+            routes.append((edge, ((x1, y1), (side, y1), (side, y2), (x2, y2)), (side + 20, (y1 + y2) / 2)))
+        else:
+            right += 1
+            side = max_x + 30 * right
+            x1, y1 = src.x + src.width / 2, src.y + NODE_HEIGHT / 2
+            x2, y2 = dst.x + dst.width / 2, dst.y + NODE_HEIGHT / 2
+            routes.append((edge, ((x1, y1), (side, y1), (side, y2), (x2, y2)), (side - 20, (y1 + y2) / 2)))
+    return routes
+
+
+def _canvas(boxes: Dict[str, _Box], routes) -> Tuple[float, float, float]:
+    """(x offset, width, height) that fits every node and every curve."""
+    xs = [b.x - b.width / 2 for b in boxes.values()] + [b.x + b.width / 2 for b in boxes.values()]
+    for _, points, _ in routes:
+        xs.extend(p[0] for p in points)
+    shift = MARGIN - min(min(xs), MARGIN)
+    width = max(xs) + shift + MARGIN
+    height = max(b.y for b in boxes.values()) + NODE_HEIGHT + MARGIN
+    return shift, width, height
+
+
+def to_svg(graph) -> str:
+    """Standalone SVG document for a LangGraph `Graph` (from `compiled.get_graph()`)."""
+    boxes = layout(graph)
+    routes = edge_routes(graph, boxes)
+    shift, width, height = _canvas(boxes, routes)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="{-shift:.0f} 0 {width:.0f} {height:.0f}" font-family="Helvetica, Arial, sans-serif" '
+        'font-size="14">',
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" '
+        f'markerHeight="8" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{EDGE_COLOR}"/>'
+        '</marker></defs>',
+        f'<rect x="{-shift:.0f}" width="100%" height="100%" fill="white"/>',
+    ]
+    for edge, (p0, c1, c2, p3), (lx, ly) in routes:
+        path = (f"M{p0[0]:.1f},{p0[1]:.1f} C{c1[0]:.1f},{c1[1]:.1f} "
+                f"{c2[0]:.1f},{c2[1]:.1f} {p3[0]:.1f},{p3[1]:.1f}")
+        dash = ' stroke-dasharray="5,4"' if edge.conditional else ""
+        parts.append(f'<path d="{path}" fill="none" stroke="{EDGE_COLOR}" stroke-width="1.5"{dash} '
+                     'marker-end="url(#arrow)"/>')
+        if edge.data:
+            parts.append(f'<text x="{lx:.1f}" y="{ly:.1f}" text-anchor="middle" font-size="12" '
+                         f'fill="{EDGE_COLOR}">{escape(str(edge.data))}</text>')
+    for box in boxes.values():
+        fill = {"first": "none", "last": END_FILL}.get(box.kind, NODE_FILL)
+        radius = NODE_HEIGHT / 2 if box.kind != "default" else 6
+        parts.append(f'<rect x="{box.x - box.width / 2:.1f}" y="{box.y:.1f}" width="{box.width:.1f}" '
+                     f'height="{NODE_HEIGHT}" rx="{radius:.0f}" fill="{fill}" stroke="{STROKE}"/>')
+        parts.append(f'<text x="{box.x:.1f}" y="{box.y + NODE_HEIGHT / 2 + 5:.1f}" '
+                     f'text-anchor="middle">{escape(box.label)}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def write_svg(graph, path: str) -> str:
+    """Write `to_svg(graph)` to `path` and return the path."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write(to_svg(graph))
+    return path
+
+
+def to_png(graph, path: str, dpi: int = 100) -> str:
+    """Draw the same layout as `to_svg` to a PNG with matplotlib."""
+    from matplotlib.figure import Figure
+    from matplotlib.patches import FancyArrowPatch, FancyBboxPatch
+    from matplotlib.path import Path
+
+    boxes = layout(graph)
+    routes = edge_routes(graph, boxes)
+    shift, width, height = _canvas(boxes, routes)
+
+    fig = Figure(figsize=(width / 72, height / 72))
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.set_xlim(-shift, width - shift)
+    ax.set_ylim(height, 0)  # SVG coordinates: y grows downwards
+    ax.axis("off")
+
+    for edge, points, (lx, ly) in routes:
+        curve = Path(points, [Path.MOVETO, Path.CURVE4, Path.CURVE4, Path.CURVE4])
+        ax.add_patch(FancyArrowPatch(path=curve, arrowstyle="-|>", mutation_scale=14,
+                                     color=EDGE_COLOR, linewidth=1.2,
+                                     linestyle="--" if edge.conditional else "-"))
+        if edge.data:
+            ax.text(lx, ly, str(edge.data), ha="center", va="center", fontsize=9, color=EDGE_COLOR)
+
+    for box in boxes.values():
+        fill = {"first": "none", "last": END_FILL}.get(box.kind, NODE_FILL)
+        pad = NODE_HEIGHT / 2 if box.kind != "default" else 6
+        ax.add_patch(FancyBboxPatch((box.x - box.width / 2 + pad, box.y + pad),
+                                    box.width - 2 * pad, NODE_HEIGHT - 2 * pad,
+                                    boxstyle=f"round,pad={pad}", facecolor=fill, edgecolor=STROKE))
+        ax.text(box.x, box.y + NODE_HEIGHT / 2, box.label, ha="center", va="center", fontsize=11)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fig.savefig(path, dpi=dpi, facecolor="white")
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def network_available(host: str = MERMAID_HOST, port: int = 443, timeout: float = 1.0) -> bool:
+    """Whether the remote renderer is reachable (checked once per process)."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _render_local(graph, path: str) -> str:
+    if path.endswith(".svg"):
+        return write_svg(graph, path)
+    return to_png(graph, path)
+
+
+def render_workflow(graph, path: str, renderer: Optional[str] = None) -> GraphRenderResult:
+    """Write a diagram of `graph` to `path` (.png or .svg).
+
+    `renderer` (or GRAPH_RENDERER) is "auto", "local" or "remote". In auto mode
+    the remote Mermaid service is used only when it is reachable, and a remote
+    failure falls back to the local renderer.
+    """
+    renderer = (renderer or os.getenv("GRAPH_RENDERER") or "auto").lower()
+    start = time.perf_counter()
+    fallback_reason = None
+
+    if renderer == "remote" or (renderer == "auto" and not path.endswith(".svg")):
+        if renderer == "remote" or network_available():
+            try:
+                png = graph.draw_mermaid_png()
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(png)
+                return GraphRenderResult(path, "remote", time.perf_counter() - start)
+            except Exception as e:
+                if renderer == "remote":
+                    raise
+                fallback_reason = f"remote renderer failed: {e}"
+        else:
+            fallback_reason = f"{MERMAID_HOST} is unreachable"
+
+    _render_local(graph, path)
+    return GraphRenderResult(path, "local", time.perf_counter() - start, fallback_reason)
+
+
+def compare_renderers(graph, output_dir: str, repeat: int = 3) -> Dict[str, Optional[float]]:
+    """Best-of-`repeat` seconds for each rendering path (None when remote is unavailable)."""
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        return min(times)
+
+    timings: Dict[str, Optional[float]] = {
+        "local_svg": best(lambda: write_svg(graph, os.path.join(output_dir, "compare_local.svg"))),
+        "local_png": best(lambda: to_png(graph, os.path.join(output_dir, "compare_local.png"))),
+        "remote_png": None,
+    }
+    if network_available():
+        try:
+            timings["remote_png"] = best(graph.draw_mermaid_png)
+        except Exception:
+            pass
+    return timings
@@ -0,0 +1,371 @@
+"""
+Hedging - Tail-Latency Control for Model Calls
+===============================================
+
+One slow completion stalls the whole workflow, so p99 ends up several times
+the median. `Hedger` bounds that tail per call site (e.g. per graph node):
+
+- Hedging: if a call has not returned after the recent `percentile` latency
+  of its call site, a duplicate is fired and whichever finishes first wins;
+  the loser is cancelled (async) or its result discarded (threads)
+- Deadlines: the deadline bounds the whole call, fallbacks included. When
+  fallbacks are supplied the primary call is abandoned once it has used
+  `1 - fallback_fraction` of the deadline, and they are tried in order in the
+  time left - an earlier answer to the exact same request, then the fallback
+  calls (typically the same prompt on a cheaper model). A call that fails with
+  an error other than a timeout is not covered up: the error is raised
+- Reporting: hedge rate, how often the hedge won, deadline misses, fallbacks
+  used and the estimated spend on calls whose results were thrown away
+
+Usage:
+    hedger = Hedger(HedgePolicy(percentile=95, deadline=30))
+    response = await hedger.acall(
+        "writer", lambda duplicate: llm.ainvoke(messages),
+        fallbacks=[lambda duplicate: cheap_llm.ainvoke(messages)],
+        request_key=request_key(messages),
+    )
+    hedger.print_stats()
+
+    HEDGE_PERCENTILE=95      # unset = no hedging
+    HEDGE_MIN_SAMPLES=20     # latencies observed before the percentile is trusted
+    HEDGE_INITIAL_DELAY=5    # seconds; hedge delay until then (unset = don't hedge yet)
+    HEDGE_FALLBACK_FRACTION=0.25  # share of the deadline kept for fallbacks
+
+Calls receive `duplicate=True` when they are the hedge, so callers can e.g.
+keep a duplicate from streaming tokens a second time.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from .pricing import message_cost
+from .stats import percentile
+
+MAX_REMEMBERED_ANSWERS = 256
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to hedge and when to give up on a call."""
+    percentile: Optional[float] = None  # Hedge after this latency percentile (None = never)
+    min_samples: int = 20
+    initial_delay: Optional[float] = None  # Hedge delay before `min_samples` latencies are known
+    deadline: Optional[float] = None  # Seconds for the whole call, fallbacks included (None = wait forever)
+    fallback_fraction: float = 0.25  # Share of the deadline kept for fallbacks, when there are any
+
+    @classmethod
+    def from_env(cls, deadline: Optional[float] = None) -> "HedgePolicy":
+        """Build a policy from HEDGE_* environment variables."""
+        pct, initial = os.getenv("HEDGE_PERCENTILE"), os.getenv("HEDGE_INITIAL_DELAY")
+        return cls(
+            percentile=float(pct) if pct else None,
+            min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+            initial_delay=float(initial) if initial else None,
+            deadline=deadline,
+            fallback_fraction=float(os.getenv("HEDGE_FALLBACK_FRACTION", "0.25")),
+        )
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call missed its deadline and no fallback produced an answer."""
+
+
+def _is_timeout(error: BaseException) -> bool:
+    """Whether a failed call timed out (the only failure fallbacks stand in for)."""
+    return isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
+
+
+def request_key(messages: Sequence[Any]) -> str:
+    """Stable key for a model request, used to remember answers for fallback."""
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(f"{getattr(message, 'type', '')}\0{getattr(message, 'content', message)}\0".encode())
+    return digest.hexdigest()
+
+
+class Hedger:
+    """Hedged, deadline-bounded calls with per-call-site latency tracking."""
+
+    def __init__(self, policy: Optional[HedgePolicy] = None, window: int = 200,
+                 cost_of: Callable[[Any], float] = message_cost, max_workers: int = 32):
+        self.policy = policy or HedgePolicy()
+        self.cost_of = cost_of
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._answers: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._max_workers = max_workers
+        self.counts: Dict[str, Counter] = defaultdict(Counter)
+        self.spend: Dict[str, Counter] = defaultdict(Counter)  # "used_usd" / "wasted_usd" per key
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging a call at `key` (None = don't hedge)."""
+        if self.policy.percentile is None:
+            return None
+        with self._lock:
+            recent = list(self._latencies[key])
+        if len(recent) < self.policy.min_samples:
+            return self.policy.initial_delay
+        return percentile(recent, self.policy.percentile)
+
+    def _finished(self, key: str, started: float, result: Any, req_key: Optional[str]) -> None:
+        with self._lock:
+            self._latencies[key].append(time.perf_counter() - started)
+            self.spend[key]["used_usd"] += self.cost_of(result)
+            if req_key is not None:
+                self._answers[(key, req_key)] = result
+                self._answers.move_to_end((key, req_key))
+                while len(self._answers) > MAX_REMEMBERED_ANSWERS:
+                    self._answers.popitem(last=False)
+
+    def _wasted(self, key: str, result: Any = None, estimated_cost: float = 0.0) -> None:
+        with self._lock:
+            self.counts[key]["wasted_calls"] += 1
+            self.spend[key]["wasted_usd"] += self.cost_of(result) if result is not None else estimated_cost
+
+    def _remembered(self, key: str, req_key: Optional[str]) -> Any:
+        with self._lock:
+            return self._answers.get((key, req_key)) if req_key is not None else None
+
+    def _stop_times(self, started: float, deadline: Optional[float],
+                    fallbacks: Sequence[Any]) -> Tuple[Optional[float], Optional[float]]:
+        """When to give up on the primary call, and when the whole call must be done."""
+        if not deadline:
+            return None, None
+        stop_at = started + deadline
+        reserve = deadline * self.policy.fallback_fraction if fallbacks else 0.0
+        return stop_at - reserve, stop_at
+
+    def _give_up(self, key: str, error: Optional[BaseException]) -> None:
+        """Count a call that got no answer from its primary or hedge; raise real errors."""
+        if error is None:
+            self.counts[key]["deadline_exceeded"] += 1
+        elif not _is_timeout(error):
+            self.counts[key]["failed"] += 1
+            raise error
+
+    # ------------------------------------------------------------------
+    # Async
+    # ------------------------------------------------------------------
+    async def acall(self, key: str, call: Callable[[bool], Awaitable[Any]], *,
+                    fallbacks: Sequence[Callable[[bool], Awaitable[Any]]] = (),
+                    request_key: Optional[str] = None, deadline: Optional[float] = None,
+                    estimated_cost: float = 0.0) -> Any:
+        """Await `call(duplicate)`, hedging and falling back as the policy says.
+
+        `estimated_cost` is charged as wasted spend for a cancelled duplicate
+        (whose real usage is never reported).
+        """
+        deadline = deadline if deadline is not None else self.policy.deadline
+        self.counts[key]["calls"] += 1
+        started = time.perf_counter()
+        primary_stop, stop_at = self._stop_times(started, deadline, fallbacks)
+        primary = asyncio.ensure_future(call(False))
+        launched = {primary: started}
+        pending = {primary}
+        error: Optional[BaseException] = None
+
+        def remaining() -> Optional[float]:
+            return None if primary_stop is None else max(0.0, primary_stop - time.perf_counter())
+
+        try:
+            delay = self.hedge_delay(key)
+            if delay is not None:
+                timeout = delay if primary_stop is None else min(delay, remaining())
+                done, pending = await asyncio.wait(pending, timeout=timeout)
+                if not done and (primary_stop is None or remaining() > 0):
+                    self.counts[key]["hedged"] += 1
+                    hedge = asyncio.ensure_future(call(True))
+                    launched[hedge] = time.perf_counter()
+                    pending = {primary, hedge}
+                else:
+                    pending = pending | done
+
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=remaining(),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break  # Deadline
+                winners = [task for task in done if task.exception() is None]
+                if not winners:
+                    error = next(iter(done)).exception()
+                    continue
+                winner = primary if primary in winners else winners[0]
+                for task in winners:
+                    if task is not winner:  # Both finished together: the other reply is discarded
+                        self._wasted(key, result=task.result())
+                if winner is not primary:
+                    self.counts[key]["hedge_wins"] += 1
+                self._finished(key, launched[winner], winner.result(), request_key)
+                return winner.result()
+        finally:
+            # Also reached when the caller is cancelled: the calls it started go with it
+            for task in pending:
+                task.cancel()
+                self._wasted(key, estimated_cost=estimated_cost)
+
+        self._give_up(key, error)
+        return await self._afallback(key, fallbacks, request_key, error, deadline, stop_at)
+
+    async def _afallback(self, key, fallbacks, req_key, error, deadline, stop_at) -> Any:
+        remembered = self._remembered(key, req_key)
+        if remembered is not None:
+            self.counts[key]["fallback_cached"] += 1
+            return remembered
+        for fallback in fallbacks:
+            timeout = None if stop_at is None else stop_at - time.perf_counter()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                result = await asyncio.wait_for(fallback(False), timeout=timeout)
+            except Exception as e:
+                error = e
+                continue
+            self.counts[key]["fallback_model"] += 1
+            with self._lock:
+                self.spend[key]["used_usd"] += self.cost_of(result)
+            return result
+        self.counts[key]["failed"] += 1
+        if error is not None:
+            raise error
+        raise DeadlineExceeded(f"'{key}' missed its {deadline}s deadline and no fallback answered")
+
+    # ------------------------------------------------------------------
+    # Threads
+    # ------------------------------------------------------------------
+    def _submit(self, fn: Callable[[bool], Any], duplicate: bool) -> concurrent.futures.Future:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self._max_workers, thread_name_prefix="hedge")
+        # Carry the caller's context (callbacks, scheduler scope) into the worker
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, fn, duplicate)
+
+    def call(self, key: str, call: Callable[[bool], Any], *,
+             fallbacks: Sequence[Callable[[bool], Any]] = (),
+             request_key: Optional[str] = None, deadline: Optional[float] = None,
+             estimated_cost: float = 0.0) -> Any:
+        """Blocking version of `acall` for synchronous callers.
+
+        Threads cannot be cancelled: an abandoned call runs to completion and
+        its actual cost is counted as wasted.
+        """
+        deadline = deadline if deadline is not None else self.policy.deadline
+        delay = self.hedge_delay(key)
+        if delay is None and deadline is None:
+            # Nothing to bound: run inline, no thread hop
+            self.counts[key]["calls"] += 1
+            started = time.perf_counter()
+            result = call(False)
+            self._finished(key, started, result, request_key)
+            return result
+
+        self.counts[key]["calls"] += 1
+        started = time.perf_counter()
+        primary_stop, stop_at = self._stop_times(started, deadline, fallbacks)
+        primary = self._submit(call, False)
+        launched = {primary: started}
+        pending = {primary}
+        error: Optional[BaseException] = None
+
+        def remaining() -> Optional[float]:
+            return None if primary_stop is None else max(0.0, primary_stop - time.perf_counter())
+
+        if delay is not None:
+            timeout = delay if primary_stop is None else min(delay, remaining())
+            done, _ = concurrent.futures.wait(pending, timeout=timeout)
+            if not done and (primary_stop is None or remaining() > 0):
+                self.counts[key]["hedged"] += 1
+                hedge = self._submit(call, True)
+                launched[hedge] = time.perf_counter()
+                pending.add(hedge)
+
+        while pending:
+            done, pending = concurrent.futures.wait(pending, timeout=remaining(),
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                break  # Deadline
+            winners = [future for future in done if future.exception() is None]
+            if not winners:
+                error = next(iter(done)).exception()
+                continue
+            winner = primary if primary in winners else winners[0]
+            for loser in [*pending, *(f for f in winners if f is not winner)]:
+                self._abandon(key, loser)
+            if winner is not primary:
+                self.counts[key]["hedge_wins"] += 1
+            self._finished(key, launched[winner], winner.result(), request_key)
+            return winner.result()
+
+        for loser in pending:
+            self._abandon(key, loser)
+        self._give_up(key, error)
+        return self._fallback(key, fallbacks, request_key, error, deadline, stop_at)
+
+    def _abandon(self, key: str, future: concurrent.futures.Future) -> None:
+        """Count an abandoned call's real cost once it finishes."""
+        def done(f: concurrent.futures.Future) -> None:
+            self._wasted(key, result=None if f.cancelled() or f.exception() else f.result())
+        future.add_done_callback(done)
+
+    def _fallback(self, key, fallbacks, req_key, error, deadline, stop_at) -> Any:
+        remembered = self._remembered(key, req_key)
+        if remembered is not None:
+            self.counts[key]["fallback_cached"] += 1
+            return remembered
+        for fallback in fallbacks:
+            timeout = None if stop_at is None else stop_at - time.perf_counter()
+            if timeout is not None and timeout <= 0:
+                break
+            future = self._submit(fallback, False)
+            try:
+                result = future.result(timeout=timeout)
+            except Exception as e:
+                if isinstance(e, concurrent.futures.TimeoutError):
+                    self._abandon(key, future)
+                error = e
+                continue
+            self.counts[key]["fallback_model"] += 1
+            with self._lock:
+                self.spend[key]["used_usd"] += self.cost_of(result)
+            return result
+        self.counts[key]["failed"] += 1
+        if error is not None:
+            raise error
+        raise DeadlineExceeded(f"'{key}' missed its {deadline}s deadline and no fallback answered")
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per call site: counts, hedge rate, and used vs wasted spend."""
+        with self._lock:
+            result = {}
+            for key, counts in self.counts.items():
+                spend = self.spend[key]
+                total = spend["used_usd"] + spend["wasted_usd"]
+                result[key] = {
+                    **counts,
+                    "hedge_rate": counts["hedged"] / counts["calls"] if counts["calls"] else 0.0,
+                    "used_usd": spend["used_usd"],
+                    "wasted_usd": spend["wasted_usd"],
+                    "wasted_fraction": spend["wasted_usd"] / total if total else 0.0,
+                }
+            return result
+
+    def print_stats(self) -> None:
+        for key, s in self.stats().items():
+            print(f"   {key:<10} {s['calls']} calls, {s['hedge_rate']:.0%} hedged "
+                  f"({s.get('hedge_wins', 0)} won), {s.get('deadline_exceeded', 0)} past deadline, "
+                  f"{s.get('fallback_cached', 0) + s.get('fallback_model', 0)} fallbacks, "
+                  f"{s.get('wasted_calls', 0)} wasted calls (~${s['wasted_usd']:.4f})")
@@ -0,0 +1,150 @@
+"""
+History - Token-Budgeted Message Windows
+=========================================
+
+With an `operator.add` reducer every node appends to the shared history and
+sends all of it to the model, so prompts (and latency) grow with every step.
+These helpers keep a window that fits a token budget instead:
+
+- The original human task is always pinned at the front
+- An AIMessage that calls tools stays together with its ToolMessage results
+  (providers reject tool results whose call is missing)
+- Older turns are dropped, or folded into a short summary message
+
+Use `select_window` right before calling a model (per-node budgets), and
+`windowed_add` as a state reducer to keep the stored history bounded too:
+
+    class AgentState(TypedDict):
+        messages: Annotated[Sequence[BaseMessage], windowed_add(max_tokens=16_000)]
+"""
+
+from typing import Any, Callable, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from .tokens import estimate_message_tokens
+
+SUMMARY_PREFIX = "Summary of earlier conversation:"
+
+
+def group_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Split messages into groups that must be kept or dropped together."""
+    groups: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and groups and _calls_tools(groups[-1][0]):
+            groups[-1].append(message)
+        else:
+            groups.append([message])
+    return groups
+
+
+def _calls_tools(message: BaseMessage) -> bool:
+    return isinstance(message, AIMessage) and bool(message.tool_calls)
+
+
+def _pinned_count(messages: Sequence[BaseMessage]) -> int:
+    """Number of leading messages to pin: system prompts plus the first human task."""
+    for i, message in enumerate(messages):
+        if isinstance(message, SystemMessage):
+            continue
+        return i + 1 if isinstance(message, HumanMessage) else i
+    return len(messages)
+
+
+def extractive_summary(messages: Sequence[BaseMessage], max_chars: int = 600) -> str:
+    """Cheap local summary: the first sentence of each dropped message."""
+    lines = []
+    for message in messages:
+        if isinstance(message, AIMessage) and message.tool_calls:
+            lines.append(f"- {message.type} called: {', '.join(tc['name'] for tc in message.tool_calls)}")
+            continue
+        text = str(message.content).strip()
+        if text.startswith(SUMMARY_PREFIX):
+            text = text[len(SUMMARY_PREFIX):].strip()
+        elif text:
+            text = f"- {message.type}: {text.split('. ')[0][:160]}"
+        if text:
+            lines.append(text)
+    # Keep the most recent lines when the summary is over length
+    while len(lines) > 1 and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def select_window(
+    messages: Sequence[BaseMessage],
+    max_tokens: Optional[int],
+    summarize: bool = False,
+    summarizer: Callable[[Sequence[BaseMessage]], str] = extractive_summary,
+    token_counter: Callable[[Any], int] = estimate_message_tokens,
+) -> List[BaseMessage]:
+    """Return the newest messages that fit in `max_tokens`, with the task pinned.
+
+    The most recent turn is always kept, even if it alone exceeds the budget.
+    With `summarize=True` the dropped turns are replaced by one summary message.
+    """
+    messages = list(messages)
+    if max_tokens is None:
+        return messages
+
+    pinned_count = _pinned_count(messages)
+    pinned, rest = messages[:pinned_count], messages[pinned_count:]
+    budget = max_tokens - sum(token_counter(m) for m in pinned)
+
+    kept: List[List[BaseMessage]] = []
+    groups = group_turns(rest)
+    for group in reversed(groups):
+        cost = sum(token_counter(m) for m in group)
+        if kept and cost > budget:
+            break
+        kept.append(group)
+        budget -= cost
+
+    if len(kept) == len(groups):
+        return messages
+
+    window = [m for group in reversed(kept) for m in group]
+    if summarize:
+        dropped = [m for group in groups[: len(groups) - len(kept)] for m in group]
+        summary = HumanMessage(content=f"{SUMMARY_PREFIX}\n{summarizer(dropped)}")
+        return pinned + [summary] + window
+    return pinned + window
+
+
+class _TokenWindow(list):
+    """A message list that remembers its estimated token total.
+
+    Saves recounting the whole history on every merge. Serializers see a
+    plain list; after a restore the total is simply recounted once.
+    """
+    tokens: int = 0
+
+
+def windowed_add(max_tokens: int, summarize: bool = False, low_water: float = 0.75):
+    """State reducer: append new messages, then trim to a token budget.
+
+    Drop-in replacement for `operator.add` on a `messages` channel. Because
+    the stored history never exceeds the budget, merge cost stays flat
+    instead of growing with every step of a long run. When the budget is
+    exceeded the history is trimmed to `low_water * max_tokens`, so trimming
+    happens once every several turns rather than on every merge.
+    """
+    def count(messages: Sequence[BaseMessage]) -> int:
+        return sum(estimate_message_tokens(m) for m in messages)
+
+    def reduce(left: Sequence[BaseMessage], right: Any) -> List[BaseMessage]:
+        if not isinstance(right, (list, tuple)):
+            right = [right]
+        left_tokens = left.tokens if isinstance(left, _TokenWindow) else count(left)
+
+        merged = _TokenWindow(left)
+        merged.extend(right)
+        merged.tokens = left_tokens + count(right)
+        if merged.tokens <= max_tokens:
+            return merged
+
+        trimmed = _TokenWindow(select_window(merged, int(max_tokens * low_water), summarize=summarize))
+        trimmed.tokens = count(trimmed)
+        return trimmed
+
+    return reduce
@@ -0,0 +1,34 @@
+"""
+Loader - Import the Numbered Example Scripts as Modules
+========================================================
+
+The examples are named `01_...py`, `02_...py` so they sort in learning order,
+which means they cannot be imported with a normal `import` statement. Tools
+that reuse their graphs (benchmarks, batch jobs, services) load them here.
+"""
+
+import importlib.util
+import os
+import sys
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples")
+
+
+def load_example(name: str):
+    """Import `python/examples/<name>.py` once and return the module."""
+    module_name = f"example_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    path = os.path.join(EXAMPLES_DIR, f"{name}.py")
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load example '{name}' from {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
@@ -0,0 +1,301 @@
+"""
+Pipeline - Start Downstream Agents on Partial Upstream Output
+==============================================================
+
+A research -> writer chain is stop-and-wait by default: the writer only
+starts once the research completion has fully finished. Research streams in
+as fairly self-contained paragraphs, so the writer can draft each one while
+the rest is still being generated. The draft is the written sections in
+order:
+
+- `SectionSplitter` cuts streamed text into sections at paragraph breaks, or
+  at the first sentence end once a paragraph grows past a word budget
+- `SectionPipeline` consumes a model stream and starts the downstream call
+  for each section as soon as it is complete. `consume` runs those calls on
+  a thread pool, `aconsume` runs them as tasks on the event loop
+- `compare_modes` times a workflow end to end in each mode so the gain is
+  measured rather than assumed
+
+Usage:
+    pipeline = SectionPipeline(lambda index, section: writer.invoke(prompt(section)))
+    research = pipeline.consume(researcher.stream(messages))  # writer calls start mid-stream
+    sections = pipeline.results()                             # in order
+    pipeline.report().print_summary()
+
+    summaries = compare_modes(lambda mode: run_task(mode), repeat=5)
+    print_comparison(summaries)
+
+    PIPELINE_MODE=pipelined          # opt in (default: sequential)
+    PIPELINE_SECTION_WORDS=40        # cut long paragraphs past this many words
+"""
+
+import asyncio
+import contextvars
+import os
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .stats import format_latency_summary, latency_summary
+
+SEQUENTIAL, PIPELINED = "sequential", "pipelined"
+MODES = (SEQUENTIAL, PIPELINED)
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# A sentence has only ended once the whitespace after it has arrived ("3." may be "3.5")
+_SENTENCE_END = re.compile(r"[.!?]+(?=\s)")
+
+
+def pipeline_mode(default: str = SEQUENTIAL) -> str:
+    """The configured execution mode (PIPELINE_MODE), validated."""
+    mode = os.getenv("PIPELINE_MODE", default).strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"PIPELINE_MODE must be one of {MODES}, got '{mode}'")
+    return mode
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+class SectionSplitter:
+    """Cut streamed text into sections for downstream work.
+
+    A section ends at a paragraph break once it has `min_words`, or at the
+    first sentence end past `max_words` when a paragraph runs long. Shorter
+    paragraphs (headings, one-liners) are kept with the text that follows.
+    """
+
+    def __init__(self, max_words: int = 40, min_words: Optional[int] = None):
+        self.max_words = max_words
+        self.min_words = max_words // 2 if min_words is None else min_words
+        self._buffer = ""
+
+    @classmethod
+    def from_env(cls) -> "SectionSplitter":
+        return cls(max_words=int(os.getenv("PIPELINE_SECTION_WORDS", "40")))
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; return the sections it completed."""
+        self._buffer += text
+        sections = []
+        cut = self._cut_point()
+        while cut is not None:
+            section, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+            if section:
+                sections.append(section)
+            cut = self._cut_point()
+        return sections
+
+    def flush(self) -> Optional[str]:
+        """The final, possibly short, section once the stream has ended."""
+        section, self._buffer = self._buffer.strip(), ""
+        return section or None
+
+    def _cut_point(self) -> Optional[int]:
+        for match in _PARAGRAPH_BREAK.finditer(self._buffer):
+            if _words(self._buffer[:match.start()]) >= self.min_words:
+                return match.end()
+        if _words(self._buffer) > self.max_words:
+            for match in _SENTENCE_END.finditer(self._buffer):
+                if _words(self._buffer[:match.end()]) >= self.max_words:
+                    return match.end()
+        return None
+
+
+@dataclass
+class PipelineReport:
+    """Timings of one pipelined hand-off, in seconds from the start of the stream."""
+    sections: int
+    upstream_seconds: float  # When the upstream stream finished
+    first_start_seconds: Optional[float]  # When the first downstream call started
+    total_seconds: float  # When the last downstream call finished
+
+    @property
+    def head_start(self) -> float:
+        """How much earlier downstream work started than it would have stop-and-wait."""
+        if self.first_start_seconds is None:
+            return 0.0
+        return max(0.0, self.upstream_seconds - self.first_start_seconds)
+
+    def print_summary(self) -> None:
+        print(f"   ⏩ {self.sections} section{'' if self.sections == 1 else 's'}: downstream started "
+              f"{self.head_start * 1000:.0f}ms before upstream finished "
+              f"(upstream {self.upstream_seconds * 1000:.0f}ms, all done {self.total_seconds * 1000:.0f}ms)")
+
+
+class SectionPipeline:
+    """Run `stage(index, section)` on each section of a stream as soon as it is complete.
+
+    Feed it a model stream with `consume` (stage runs on a thread pool) or
+    `aconsume` (`stage` is async and runs as tasks); either returns the
+    aggregated upstream message. `results`/`aresults` wait for the stage
+    calls and return them in section order. `cancel` drops unfinished work,
+    e.g. when the upstream answer turns out to be a tool call or is retried.
+    """
+
+    def __init__(self, stage: Callable[[int, str], Any], splitter: Optional[SectionSplitter] = None,
+                 max_workers: int = 4):
+        self.stage = stage
+        self.splitter = splitter or SectionSplitter.from_env()
+        self.max_workers = max_workers
+        self.sections: List[str] = []
+        self._pending: List[Any] = []  # Futures (consume) or tasks (aconsume)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started = 0.0
+        self._first_start: Optional[float] = None
+        self._upstream_done = 0.0
+        self._finished = 0.0
+
+    # ------------------------------------------------------------------
+    # Upstream
+    # ------------------------------------------------------------------
+    def consume(self, chunks: Iterable[Any]) -> Any:
+        """Read a sync stream of message chunks, starting stage calls on a thread pool."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+        self._started = time.perf_counter()
+        message = None
+        try:
+            for chunk in chunks:
+                message = chunk if message is None else message + chunk
+                self._dispatch(self.splitter.feed(_chunk_text(chunk)), self._submit)
+        except BaseException:
+            self.cancel()
+            raise
+        return self._finish_upstream(message, self._submit)
+
+    async def aconsume(self, chunks: AsyncIterable[Any]) -> Any:
+        """Read an async stream of message chunks, starting `stage` coroutines as tasks."""
+        self._started = time.perf_counter()
+        message = None
+        try:
+            async for chunk in chunks:
+                message = chunk if message is None else message + chunk
+                self._dispatch(self.splitter.feed(_chunk_text(chunk)), self._create_task)
+        except BaseException:
+            self.cancel()
+            raise
+        return self._finish_upstream(message, self._create_task)
+
+    def _finish_upstream(self, message: Any, start: Callable[[int, str], Any]) -> Any:
+        self._upstream_done = time.perf_counter()
+        self._dispatch([s for s in [self.splitter.flush()] if s], start)
+        return _as_message(message)
+
+    def _dispatch(self, sections: Sequence[str], start: Callable[[int, str], Any]) -> None:
+        for section in sections:
+            if self._first_start is None:
+                self._first_start = time.perf_counter()
+            self._pending.append(start(len(self.sections), section))
+            self.sections.append(section)
+
+    def _submit(self, index: int, section: str) -> Future:
+        # Carry the caller's context (callbacks, scheduler scope) into the worker
+        return self._executor.submit(contextvars.copy_context().run, self.stage, index, section)
+
+    def _create_task(self, index: int, section: str) -> asyncio.Task:
+        return asyncio.ensure_future(self.stage(index, section))
+
+    # ------------------------------------------------------------------
+    # Downstream
+    # ------------------------------------------------------------------
+    def results(self) -> List[Any]:
+        """Wait for every stage call started by `consume`; results in section order."""
+        try:
+            return [future.result() for future in self._pending]
+        finally:
+            self._finished = time.perf_counter()
+            self._shutdown()
+
+    async def aresults(self) -> List[Any]:
+        """Wait for every stage task started by `aconsume`; results in section order."""
+        try:
+            return list(await asyncio.gather(*self._pending))
+        except BaseException:
+            self.cancel()
+            raise
+        finally:
+            self._finished = time.perf_counter()
+
+    def cancel(self) -> None:
+        """Drop stage calls that have not finished (running threads finish in the background)."""
+        for pending in self._pending:
+            pending.cancel()
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def report(self) -> PipelineReport:
+        """Timings of this hand-off (call after `results`/`aresults`)."""
+        def since_start(moment: float) -> float:
+            return moment - self._started
+
+        return PipelineReport(
+            sections=len(self.sections),
+            upstream_seconds=since_start(self._upstream_done),
+            first_start_seconds=since_start(self._first_start) if self._first_start is not None else None,
+            total_seconds=since_start(self._finished or self._upstream_done),
+        )
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    # Content blocks (e.g. Anthropic): join the text parts
+    return "".join(b.get("text", "") for b in content if isinstance(b, dict))
+
+
+def _as_message(message: Any) -> Any:
+    """Turn an aggregated message chunk into the plain message a node returns."""
+    if message is None:
+        return None
+    from langchain_core.messages import BaseMessageChunk, message_chunk_to_message
+
+    return message_chunk_to_message(message) if isinstance(message, BaseMessageChunk) else message
+
+
+# ----------------------------------------------------------------------
+# Measuring
+# ----------------------------------------------------------------------
+def compare_modes(run: Callable[[str], Any], modes: Sequence[str] = MODES,
+                  repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Time `run(mode)` end to end `repeat` times per mode and summarize the latencies.
+
+    Runs are interleaved (sequential, pipelined, sequential, ...) so drift
+    in provider latency affects both modes alike.
+    """
+    timings: Dict[str, List[float]] = {mode: [] for mode in modes}
+    for _ in range(repeat):
+        for mode in modes:
+            started = time.perf_counter()
+            run(mode)
+            timings[mode].append(time.perf_counter() - started)
+    return {mode: latency_summary(values) for mode, values in timings.items()}
+
+
+async def acompare_modes(run: Callable[[str], Any], modes: Sequence[str] = MODES,
+                         repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Async version of `compare_modes`; `run(mode)` returns an awaitable."""
+    timings: Dict[str, List[float]] = {mode: [] for mode in modes}
+    for _ in range(repeat):
+        for mode in modes:
+            started = time.perf_counter()
+            await run(mode)
+            timings[mode].append(time.perf_counter() - started)
+    return {mode: latency_summary(values) for mode, values in timings.items()}
+
+
+def print_comparison(summaries: Dict[str, Dict[str, float]], baseline: str = SEQUENTIAL) -> None:
+    """Print each mode's end-to-end latency and its speedup over `baseline`."""
+    base = summaries.get(baseline, {}).get("mean")
+    for mode, summary in summaries.items():
+        line = f"   {mode:<11} mean={summary['mean'] * 1000:.0f}ms {format_latency_summary(summary)}"
+        if base and mode != baseline and summary["mean"]:
+            line += f"  ({base / summary['mean']:.2f}x, {(summary['mean'] - base) * 1000:+.0f}ms)"
+        print(line)
@@ -0,0 +1,97 @@
+"""
+Agent Pool - Build Once, Share Everywhere
+==========================================
+
+Creating a chat model builds a new HTTP client (and, on first use, a new TLS
+connection), and `bind_tools` re-serializes every tool schema. Doing that on
+every graph step is wasted work, so the pool builds each configured agent once
+per process and hands out the same instance to every thread and async task.
+
+Usage:
+    pool = AgentPool()
+    pool.register("research", create_research_agent, tools=[research_tool])
+
+    agent = pool.get("research")
+    response = agent.bound.invoke(messages)
+
+    print(pool.build_counts)  # {'research': 1}
+"""
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class PooledAgent:
+    """A built chat model together with its tool-bound variant."""
+    name: str
+    llm: Any  # The raw chat model
+    bound: Any  # The model with tools bound (same as `llm` when there are no tools)
+    tools: Tuple[Any, ...] = field(default_factory=tuple)
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """How to build one agent: a model factory plus the tools to bind."""
+    factory: Callable[..., Any]
+    tools: Tuple[Any, ...] = field(default_factory=tuple)
+
+
+class AgentPool:
+    """Thread-safe registry that builds each agent at most once per process.
+
+    Agents are built lazily on first `get`. Keyword overrides passed to `get`
+    are forwarded to the factory and cached as a separate variant, so e.g.
+    `get("writer", model="gpt-4o")` is built once alongside the default.
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, AgentSpec] = {}
+        self._agents: Dict[Tuple, PooledAgent] = {}
+        self._lock = threading.Lock()
+        self.build_counts: Counter = Counter()
+
+    def register(self, name: str, factory: Callable[..., Any], tools: Sequence[Any] = ()) -> None:
+        """Register how to build the agent called `name`."""
+        with self._lock:
+            self._specs[name] = AgentSpec(factory=factory, tools=tuple(tools))
+            # A new spec makes any previously built variants stale
+            for key in [k for k in self._agents if k[0] == name]:
+                del self._agents[key]
+
+    def get(self, name: str, **overrides) -> PooledAgent:
+        """Return the shared agent for `name`, building it on first use."""
+        key = (name, tuple(sorted(overrides.items())))
+        agent = self._agents.get(key)
+        if agent is not None:
+            return agent
+
+        with self._lock:
+            # Another thread may have built it while we waited for the lock
+            agent = self._agents.get(key)
+            if agent is None:
+                agent = self._build(name, overrides)
+                self._agents[key] = agent
+            return agent
+
+    def _build(self, name: str, overrides: Dict[str, Any]) -> PooledAgent:
+        try:
+            spec = self._specs[name]
+        except KeyError:
+            raise KeyError(f"No agent registered under '{name}'") from None
+
+        llm = spec.factory(**overrides)
+        bound = llm.bind_tools(list(spec.tools)) if spec.tools else llm
+        self.build_counts[name] += 1
+        return PooledAgent(name=name, llm=llm, bound=bound, tools=spec.tools)
+
+    def clear(self) -> None:
+        """Drop all built agents (they are rebuilt on next `get`)."""
+        with self._lock:
+            self._agents.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Number of times each agent has been built in this process."""
+        return dict(self.build_counts)
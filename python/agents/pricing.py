@@ -0,0 +1,44 @@
+"""
+Pricing - Estimated Cost per Model Call
+========================================
+
+List prices in USD per 1M tokens (input, output). Used for cost estimates in
+caches, traces and routing decisions - not for billing.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+PRICES_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+}
+
+
+def model_prices(model: Optional[str]) -> Tuple[float, float]:
+    """Return (input, output) prices for `model`, matching dated/suffixed names by prefix."""
+    if not model:
+        return (0.0, 0.0)
+    if model in PRICES_PER_MILLION:
+        return PRICES_PER_MILLION[model]
+    # e.g. "gpt-4o-mini-2024-07-18" or "claude-3-5-haiku-latest"; prefer the longest match
+    for name in sorted(PRICES_PER_MILLION, key=len, reverse=True):
+        if model.startswith(name):
+            return PRICES_PER_MILLION[name]
+    return (0.0, 0.0)
+
+
+def estimate_cost(model: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of one call."""
+    input_price, output_price = model_prices(model)
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def message_cost(message: Any, default_model: Optional[str] = None) -> float:
+    """Estimated cost of the call that produced `message`, from its usage metadata."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    model = (getattr(message, "response_metadata", None) or {}).get("model_name") or default_model
+    return estimate_cost(model, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
@@ -0,0 +1,68 @@
+"""
+Providers - Pick the Chat Model Backend from Config
+====================================================
+
+Every example asks `get_chat_model(...)` for a model instead of constructing
+`ChatOpenAI` directly, so the backend can be switched without code changes:
+
+    LLM_PROVIDER=openai     # default - real OpenAI calls (needs OPENAI_API_KEY)
+    LLM_PROVIDER=anthropic  # Claude models (needs ANTHROPIC_API_KEY)
+    LLM_PROVIDER=fake       # offline FakeChatModel, see agents/fake_llm.py
+
+Provider packages are imported only when selected. OpenAI models return
+their rate-limit response headers, which `agents.scheduler` adapts to.
+
+Models are built with the SDK's own retries off (`max_retries=0`): every retry
+of a throttled or failed call goes back through the scheduler's admission and
+backoff, or fails over in the router, instead of being retried again inside
+the client. Pass `max_retries` explicitly for a model used outside them.
+"""
+
+import os
+from typing import Any, Optional
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_ANTHROPIC_MODEL = "claude-3-5-haiku-latest"
+PROVIDERS = ("openai", "anthropic", "fake")
+
+
+def get_provider(provider: Optional[str] = None) -> str:
+    """Resolve the provider name from the argument or the LLM_PROVIDER env var."""
+    name = (provider or os.getenv("LLM_PROVIDER") or "openai").strip().lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{name}'. Choose one of: {', '.join(PROVIDERS)}")
+    return name
+
+
+def get_chat_model(
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0,
+    provider: Optional[str] = None,
+    **kwargs: Any,
+):
+    """Create a chat model for the configured provider.
+
+    `model` is the OpenAI-style model name used throughout the examples; the
+    Anthropic backend substitutes ANTHROPIC_MODEL (or a default Claude model)
+    unless a Claude model is requested explicitly.
+    """
+    name = get_provider(provider)
+
+    if name == "fake":
+        from .fake_llm import FakeChatModel
+        return FakeChatModel.from_env(model=model, temperature=temperature, **kwargs)
+
+    if name == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+        if not model.startswith("claude"):
+            model = os.getenv("ANTHROPIC_MODEL", DEFAULT_ANTHROPIC_MODEL)
+        # OpenAI-only options such as `seed` have no Anthropic equivalent
+        kwargs.pop("model_kwargs", None)
+        kwargs.setdefault("max_retries", 0)
+        return ChatAnthropic(model=model, temperature=temperature, **kwargs)
+
+    from langchain_openai import ChatOpenAI
+    # Put the x-ratelimit-* headers in `response_metadata` so the scheduler can adapt to them
+    kwargs.setdefault("include_response_headers", True)
+    kwargs.setdefault("max_retries", 0)
+    return ChatOpenAI(model=model, temperature=temperature, **kwargs)
@@ -0,0 +1,317 @@
+"""
+Quality Gate - Cheap Local Checks Before the Reviewer LLM
+==========================================================
+
+Most drafts are obviously fine (or obviously broken), yet every one of them
+costs a full reviewer LLM round-trip. `QualityGate` screens a draft locally
+in well under a millisecond and only sends borderline drafts to the LLM:
+
+- Checks: word count, required sections, banned phrases, plus any callables
+  you add (`text -> CheckResult`). A failed hard check rejects the draft; a
+  failed soft check makes it borderline
+- A small logistic-regression classifier over text features (length,
+  vocabulary variety, sentence shape, repetition) scores the rest: very
+  low scores fail, the rest goes to the LLM. The features say nothing about
+  relevance or correctness, so nothing is approved locally unless you set a
+  `pass_threshold` - do that only after `fit`ting the weights on your own
+  labelled drafts and checking how often bad drafts would be approved
+- Reporting: how often the LLM was skipped, and the latency saved (skips
+  times the measured latency of the LLM reviews that did run, or of
+  `expected_review_seconds()` before any has)
+
+Usage:
+    gate = QualityGate.from_env()   # off unless QUALITY_GATE=on
+    review = gate.review(draft, lambda: reviewer.invoke(messages),
+                         on_skip=lambda result: AIMessage(content=result.feedback()))
+    gate.print_stats()
+
+    QUALITY_GATE=on                         # default off: always call the reviewer LLM
+    QUALITY_GATE_PASS_THRESHOLD=0.99        # approve locally (fitted weights only)
+    QUALITY_GATE_MIN_WORDS=40
+    QUALITY_GATE_REQUIRED_SECTIONS=Summary,Conclusion
+    QUALITY_GATE_BANNED_PHRASES=lorem ipsum,as an ai language model
+"""
+
+import math
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+PASS, FAIL, BORDERLINE = "pass", "fail", "borderline"
+DEFAULT_BANNED_PHRASES = (
+    "as an ai language model",
+    "i cannot help with",
+    "i'm sorry, but",
+    "lorem ipsum",
+    "[insert",
+    "todo:",
+)
+
+_WORD = re.compile(r"[A-Za-z0-9']+")
+_SENTENCE_END = re.compile(r"[.!?]+(?:\s|$)")
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """Outcome of one local check."""
+    name: str
+    passed: bool
+    hard: bool = False  # A failed hard check rejects the draft outright
+    detail: str = ""
+
+
+@dataclass
+class GateResult:
+    """The gate's decision on one draft."""
+    verdict: str  # pass, fail or borderline
+    score: float  # Classifier probability that the draft is acceptable
+    checks: List[CheckResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def decided(self) -> bool:
+        """True when no LLM review is needed."""
+        return self.verdict != BORDERLINE
+
+    def feedback(self) -> str:
+        """Reviewer-style feedback for a decided draft."""
+        problems = [c.detail for c in self.checks if not c.passed]
+        if self.verdict == PASS:
+            return f"Review complete (local quality gate, score {self.score:.2f}): approved."
+        return (f"Review complete (local quality gate, score {self.score:.2f}): needs revision - "
+                + ("; ".join(problems) or "the draft reads as low quality") + ".")
+
+
+# ----------------------------------------------------------------------
+# Checks
+# ----------------------------------------------------------------------
+def length_check(min_words: int = 40, max_words: Optional[int] = 2000) -> Callable[[str], CheckResult]:
+    """Too short is a hard failure (nothing to review); too long is borderline."""
+    def check(text: str) -> CheckResult:
+        words = len(_WORD.findall(text))
+        if words < min_words:
+            return CheckResult("length", False, hard=True, detail=f"only {words} words (minimum {min_words})")
+        if max_words is not None and words > max_words:
+            return CheckResult("length", False, detail=f"{words} words (maximum {max_words})")
+        return CheckResult("length", True)
+    return check
+
+
+def sections_check(required: Sequence[str]) -> Callable[[str], CheckResult]:
+    """Each required section must appear as a heading or label (case-insensitive)."""
+    def check(text: str) -> CheckResult:
+        lowered = text.lower()
+        missing = [s for s in required if s.lower() not in lowered]
+        if missing:
+            return CheckResult("sections", False, detail=f"missing sections: {', '.join(missing)}")
+        return CheckResult("sections", True)
+    return check
+
+
+def banned_phrases_check(phrases: Sequence[str] = DEFAULT_BANNED_PHRASES) -> Callable[[str], CheckResult]:
+    """Any banned phrase (refusals, placeholders) rejects the draft."""
+    lowered_phrases = [p.lower() for p in phrases]
+
+    def check(text: str) -> CheckResult:
+        lowered = text.lower()
+        found = [p for p in lowered_phrases if p in lowered]
+        if found:
+            return CheckResult("banned_phrases", False, hard=True, detail=f"contains {', '.join(found)}")
+        return CheckResult("banned_phrases", True)
+    return check
+
+
+# ----------------------------------------------------------------------
+# Classifier
+# ----------------------------------------------------------------------
+def text_features(text: str) -> Dict[str, float]:
+    """Cheap, length-normalized features of a draft."""
+    words = [w.lower() for w in _WORD.findall(text)]
+    if not words:
+        return {"log_words": 0.0, "variety": 0.0, "sentence_shape": 0.0, "repetition": 1.0, "finished": 0.0}
+    sentences = max(1, len(_SENTENCE_END.findall(text)))
+    mean_sentence = len(words) / sentences
+    trigrams = list(zip(words, words[1:], words[2:]))
+    repeated = sum(n - 1 for n in Counter(trigrams).values() if n > 1)
+    return {
+        "log_words": math.log10(len(words)),
+        # Type/token ratio over at most 100 words, so long texts are not penalized
+        "variety": len(set(words[:100])) / min(len(words), 100),
+        # 1.0 for typical prose sentences (8-30 words), falling off outside that
+        "sentence_shape": 1.0 if 8 <= mean_sentence <= 30 else max(0.0, 1 - abs(mean_sentence - 19) / 40),
+        "repetition": repeated / len(trigrams) if trigrams else 0.0,
+        "finished": 1.0 if text.rstrip().endswith((".", "!", "?", '"', ")")) else 0.0,
+    }
+
+
+class LocalClassifier:
+    """Logistic regression over `text_features`: P(draft is acceptable).
+
+    The default weights only separate well-formed prose from broken output
+    (fragments, loops, truncation); any fluent text scores high, on topic or
+    not. Use them to reject, not to approve.
+    """
+
+    DEFAULT_WEIGHTS = {
+        "bias": -4.0,
+        "log_words": 1.5,
+        "variety": 3.0,
+        "sentence_shape": 1.5,
+        "repetition": -6.0,
+        "finished": 1.5,
+    }
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(weights or self.DEFAULT_WEIGHTS)
+
+    def predict(self, text: str) -> float:
+        features = text_features(text)
+        z = self.weights.get("bias", 0.0) + sum(self.weights.get(k, 0.0) * v for k, v in features.items())
+        return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def fit(self, texts: Sequence[str], labels: Sequence[int], epochs: int = 300,
+            learning_rate: float = 0.5) -> "LocalClassifier":
+        """Retrain the weights on drafts labelled 1 (acceptable) or 0 (needs revision)."""
+        rows = [text_features(t) for t in texts]
+        for name in ("bias", *rows[0]):
+            self.weights.setdefault(name, 0.0)
+        for _ in range(epochs):
+            gradient = Counter()
+            for row, label in zip(rows, labels):
+                z = self.weights["bias"] + sum(self.weights[k] * v for k, v in row.items())
+                error = 1 / (1 + math.exp(-max(-30.0, min(30.0, z)))) - label
+                gradient["bias"] += error
+                for k, v in row.items():
+                    gradient[k] += error * v
+            for k in self.weights:
+                self.weights[k] -= learning_rate * gradient[k] / len(rows)
+        return self
+
+
+# ----------------------------------------------------------------------
+# Gate
+# ----------------------------------------------------------------------
+class QualityGate:
+    """Local pre-review: reject obviously broken drafts, send the rest to the LLM.
+
+    With `pass_threshold` set, drafts scoring at least that are approved
+    without the LLM too; leave it at None unless the classifier was fitted.
+    """
+
+    def __init__(self, checks: Optional[Sequence[Callable[[str], CheckResult]]] = None,
+                 classifier: Optional[LocalClassifier] = None,
+                 pass_threshold: Optional[float] = None, fail_threshold: float = 0.2, enabled: bool = True,
+                 expected_review_seconds: Optional[Callable[[], Optional[float]]] = None):
+        self.checks = list(checks if checks is not None else (length_check(), banned_phrases_check()))
+        self.classifier = classifier or LocalClassifier()
+        self.pass_threshold = pass_threshold
+        self.fail_threshold = fail_threshold
+        self.enabled = enabled
+        # Estimate of one LLM review's latency, used until reviews have been measured
+        self.expected_review_seconds = expected_review_seconds
+        self.counts: Counter = Counter()
+        self.llm_seconds = 0.0  # Total time of the LLM reviews that did run
+        self.gate_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> "QualityGate":
+        """Build a gate from QUALITY_GATE_* environment variables."""
+        def listed(var: str, default: Sequence[str]) -> List[str]:
+            value = os.getenv(var)
+            return [p.strip() for p in value.split(",") if p.strip()] if value is not None else list(default)
+
+        checks = [
+            length_check(int(os.getenv("QUALITY_GATE_MIN_WORDS", "40"))),
+            banned_phrases_check(listed("QUALITY_GATE_BANNED_PHRASES", DEFAULT_BANNED_PHRASES)),
+        ]
+        sections = listed("QUALITY_GATE_REQUIRED_SECTIONS", ())
+        if sections:
+            checks.append(sections_check(sections))
+        enabled = os.getenv("QUALITY_GATE", "off").strip().lower() in ("on", "1", "true")
+        if os.getenv("QUALITY_GATE_PASS_THRESHOLD"):
+            kwargs.setdefault("pass_threshold", float(os.environ["QUALITY_GATE_PASS_THRESHOLD"]))
+        return cls(checks=checks, enabled=enabled, **kwargs)
+
+    def add_check(self, check: Callable[[str], CheckResult]) -> None:
+        self.checks.append(check)
+
+    def evaluate(self, text: str) -> GateResult:
+        """Run the local checks and classifier on `text`."""
+        started = time.perf_counter()
+        results = [check(text) for check in self.checks]
+        score = self.classifier.predict(text)
+        if any(not r.passed and r.hard for r in results):
+            verdict = FAIL
+        elif any(not r.passed for r in results):
+            verdict = BORDERLINE
+        elif self.pass_threshold is not None and score >= self.pass_threshold:
+            verdict = PASS
+        elif score <= self.fail_threshold:
+            verdict = FAIL
+        else:
+            verdict = BORDERLINE
+        seconds = time.perf_counter() - started
+        self.gate_seconds += seconds
+        return GateResult(verdict, score, results, seconds)
+
+    def _decide(self, text: str) -> Optional[GateResult]:
+        """The gate result when the LLM can be skipped, else None."""
+        self.counts["drafts"] += 1
+        if not self.enabled:
+            self.counts["llm_reviews"] += 1
+            return None
+        result = self.evaluate(text)
+        if result.decided:
+            self.counts[f"skipped_{result.verdict}"] += 1
+            return result
+        self.counts["llm_reviews"] += 1
+        return None
+
+    def review(self, text: str, llm_review: Callable[[], Any], on_skip: Callable[[GateResult], Any]) -> Any:
+        """`on_skip(result)` for decided drafts, otherwise the (timed) `llm_review()`."""
+        result = self._decide(text)
+        if result is not None:
+            return on_skip(result)
+        started = time.perf_counter()
+        response = llm_review()
+        self.llm_seconds += time.perf_counter() - started
+        return response
+
+    async def areview(self, text: str, llm_review: Callable[[], Awaitable[Any]],
+                      on_skip: Callable[[GateResult], Any]) -> Any:
+        """Async version of `review`."""
+        result = self._decide(text)
+        if result is not None:
+            return on_skip(result)
+        started = time.perf_counter()
+        response = await llm_review()
+        self.llm_seconds += time.perf_counter() - started
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Skip rate and estimated latency saved (skips x mean LLM review latency)."""
+        drafts, llm_reviews = self.counts["drafts"], self.counts["llm_reviews"]
+        skipped = drafts - llm_reviews
+        mean_llm = self.llm_seconds / llm_reviews if llm_reviews else None
+        if mean_llm is None and self.expected_review_seconds is not None:
+            mean_llm = self.expected_review_seconds()
+        return {
+            **self.counts,
+            "drafts": drafts,
+            "llm_reviews": llm_reviews,
+            "skip_rate": skipped / drafts if drafts else 0.0,
+            "mean_llm_review_s": mean_llm,
+            "latency_saved_s": skipped * mean_llm if mean_llm is not None else None,
+            "gate_time_s": self.gate_seconds,
+        }
+
+    def print_stats(self) -> None:
+        s = self.stats()
+        saved = (f"~{s['latency_saved_s']:.2f}s saved" if s["latency_saved_s"] is not None
+                 else "latency saved unknown (no LLM review measured yet)")
+        print(f"   {s['drafts']} drafts, {s['skip_rate']:.0%} decided locally "
+              f"({s.get('skipped_pass', 0)} passed, {s.get('skipped_fail', 0)} failed), "
+              f"{s['llm_reviews']} sent to the LLM; {saved}, gate cost {s['gate_time_s'] * 1000:.1f}ms")
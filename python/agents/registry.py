@@ -0,0 +1,171 @@
+"""
+Graph Registry - Compile Once, Serve Many
+==========================================
+
+Building a `StateGraph` re-adds every node and edge and recompiling it
+re-validates the whole structure. A long-running process (a server, a
+notebook kernel, a batch worker) should do that once per configuration and
+share the compiled graph, which is safe to invoke from many threads and tasks
+at the same time.
+
+Usage:
+    registry = GraphRegistry()
+    registry.register("multi_agent", create_multi_agent_graph)
+
+    graph = registry.get("multi_agent", tools=TOOLS, routes=ROUTES)   # built + validated
+    graph = registry.get("multi_agent", tools=TOOLS, routes=ROUTES)   # same instance
+
+    registry.invalidate("multi_agent")          # config changed: rebuild on next get
+    graph = registry.reload("multi_agent", tools=TOOLS, routes=ROUTES)  # or rebuild now
+
+The keyword configuration passed to `get` is forwarded to the builder and is
+the cache key. Tools are keyed by name, chat models by their identifying
+parameters (model, temperature, ...), functions by qualified name and any
+other object (e.g. a checkpointer) by identity.
+"""
+
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def config_key(value: Any) -> Any:
+    """Hashable, stable key for a builder configuration value."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), config_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(config_key(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((config_key(v) for v in value), key=repr))
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    # LangChain tools and chat models describe themselves
+    if hasattr(value, "args_schema") and hasattr(value, "name"):
+        return ("tool", value.name)
+    params = getattr(value, "_identifying_params", None)
+    if isinstance(params, dict):
+        return (type(value).__name__, config_key(params))
+    if callable(value) and hasattr(value, "__qualname__"):
+        return ("callable", getattr(value, "__module__", ""), value.__qualname__)
+    return (type(value).__name__, id(value))
+
+
+def validate_graph(compiled) -> None:
+    """Check that every node is reachable from the entry point and can reach the end.
+
+    Raises ValueError listing the offending nodes.
+    """
+    graph = compiled.get_graph()
+    successors: Dict[str, List[str]] = {node: [] for node in graph.nodes}
+    predecessors: Dict[str, List[str]] = {node: [] for node in graph.nodes}
+    for edge in graph.edges:
+        successors[edge.source].append(edge.target)
+        predecessors[edge.target].append(edge.source)
+
+    def reachable(start: str, neighbours: Dict[str, List[str]]) -> set:
+        seen, stack = {start}, [start]
+        while stack:
+            for nxt in neighbours[stack.pop()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    problems = []
+    if "__start__" in successors:
+        unreachable = set(successors) - reachable("__start__", successors)
+        if unreachable:
+            problems.append(f"unreachable from the entry point: {sorted(unreachable)}")
+    if "__end__" in predecessors:
+        stuck = set(predecessors) - reachable("__end__", predecessors)
+        if stuck:
+            problems.append(f"cannot reach the end: {sorted(stuck)}")
+    if problems:
+        raise ValueError("Invalid graph - " + "; ".join(problems))
+
+
+@dataclass(frozen=True)
+class GraphSpec:
+    """How to build one graph: a builder plus an optional validator."""
+    builder: Callable[..., Any]
+    validator: Optional[Callable[[Any], None]] = validate_graph
+
+
+class GraphRegistry:
+    """Thread-safe cache of compiled graphs, one per (name, configuration)."""
+
+    def __init__(self):
+        self._specs: Dict[str, GraphSpec] = {}
+        self._graphs: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+        self.build_counts: Counter = Counter()
+        self.hits: Counter = Counter()
+
+    def register(self, name: str, builder: Callable[..., Any],
+                 validator: Optional[Callable[[Any], None]] = validate_graph) -> None:
+        """Register how to build the graph called `name` (pass `validator=None` to skip checks)."""
+        with self._lock:
+            self._specs[name] = GraphSpec(builder=builder, validator=validator)
+            # A new builder makes any previously compiled variants stale
+            self._drop(name)
+
+    def get(self, name: str, **config) -> Any:
+        """Return the shared compiled graph for `name` and `config`, building it on first use."""
+        key = (name, config_key(config))
+        graph = self._graphs.get(key)
+        if graph is not None:
+            self.hits[name] += 1
+            return graph
+
+        with self._lock:
+            # Another thread may have built it while we waited for the lock
+            graph = self._graphs.get(key)
+            if graph is None:
+                graph = self._build(name, config)
+                self._graphs[key] = graph
+            else:
+                self.hits[name] += 1
+            return graph
+
+    def _build(self, name: str, config: Dict[str, Any]) -> Any:
+        try:
+            spec = self._specs[name]
+        except KeyError:
+            raise KeyError(f"No graph registered as '{name}'. Known graphs: {sorted(self._specs)}")
+        graph = spec.builder(**config)
+        if spec.validator is not None:
+            spec.validator(graph)
+        self.build_counts[name] += 1
+        return graph
+
+    def _drop(self, name: Optional[str]) -> int:
+        keys = [k for k in self._graphs if name is None or k[0] == name]
+        for key in keys:
+            del self._graphs[key]
+        return len(keys)
+
+    def invalidate(self, name: Optional[str] = None) -> int:
+        """Forget compiled graphs (one name, or all) so the next `get` rebuilds them.
+
+        Returns how many compiled variants were dropped. Runs already holding a
+        graph keep using it until they finish.
+        """
+        with self._lock:
+            return self._drop(name)
+
+    def reload(self, name: str, **config) -> Any:
+        """Rebuild `name` for `config` now, replacing the cached instance."""
+        key = (name, config_key(config))
+        with self._lock:
+            self._graphs.pop(key, None)
+            graph = self._build(name, config)
+            self._graphs[key] = graph
+            return graph
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Builds and cache hits per graph name."""
+        with self._lock:
+            return {name: {"builds": self.build_counts[name], "hits": self.hits[name],
+                           "variants": sum(1 for k in self._graphs if k[0] == name)}
+                    for name in self._specs}
@@ -0,0 +1,257 @@
+"""
+Render - Cached, Fast Diagrams for Agent Graphs
+================================================
+
+Drawing a workflow diagram means a spring layout plus a 300-dpi matplotlib
+render, which is slow to redo for every workflow variant in CI. This renderer
+only does work that is actually needed:
+
+- The graph's nodes, edges, attributes and render options are hashed; if the
+  output file was produced from the same hash, rendering is skipped
+- Layouts are cached by graph structure (in memory and on disk), so restyling
+  a graph reuses its node positions
+- `fast=True` writes SVG (or a low-dpi PNG), which is much cheaper than a
+  300-dpi raster
+- `render_many` renders a batch of graphs in a process pool, skipping the
+  ones that are already current
+
+Usage:
+    result = render_graph(G, "python/visualizations/02_multi_agent_graph.png",
+                          title="Multi-Agent Workflow Architecture")
+    print(result.skipped, result.seconds)
+
+    render_many([RenderJob(G1, "a.svg"), RenderJob(G2, "b.svg")], fast=True)
+
+Nodes may carry `color` and `type` attributes (used for fill and legend) and
+edges a `label`. networkx and matplotlib are imported only when a render runs.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_CACHE_DIR = "python/.cache/render"
+DEFAULT_COLOR = "#95A5A6"
+
+_layouts: Dict[str, Dict[Any, Tuple[float, float]]] = {}
+_layouts_lock = threading.Lock()
+
+
+@dataclass
+class RenderJob:
+    """One graph to render with `render_many`."""
+    graph: Any
+    output_path: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RenderResult:
+    """What a render call did."""
+    output_path: str
+    fingerprint: str
+    skipped: bool  # The output was already current
+    layout_cached: bool = False
+    seconds: float = 0.0
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-friendly, order-independent form of attribute values."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple, set)):
+        items = [_canonical(v) for v in value]
+        return sorted(items, key=repr) if isinstance(value, set) else items
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return repr(value)
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def structure_hash(graph, layout: Dict[str, Any]) -> str:
+    """Hash of what determines node positions: nodes, edges and layout parameters."""
+    nodes = sorted(repr(n) for n in graph.nodes())
+    edges = sorted((repr(u), repr(v)) for u, v in graph.edges())
+    return _digest({"nodes": nodes, "edges": edges, "layout": _canonical(layout)})
+
+
+def graph_fingerprint(graph, options: Dict[str, Any]) -> str:
+    """Hash of everything that affects the rendered file."""
+    nodes = sorted((repr(n), _canonical(attrs)) for n, attrs in graph.nodes(data=True))
+    edges = sorted((repr(u), repr(v), _canonical(attrs)) for u, v, attrs in graph.edges(data=True))
+    return _digest({"nodes": nodes, "edges": edges, "options": _canonical(options)})
+
+
+def _stamp_path(cache_dir: str, output_path: str) -> str:
+    """Where the fingerprint of an output file is recorded."""
+    name = hashlib.sha1(os.path.abspath(output_path).encode()).hexdigest()
+    return os.path.join(cache_dir, "outputs", name)
+
+
+def is_current(output_path: str, fingerprint: str, cache_dir: str = DEFAULT_CACHE_DIR) -> bool:
+    """True when `output_path` exists and was rendered from `fingerprint`."""
+    if not os.path.exists(output_path):
+        return False
+    try:
+        with open(_stamp_path(cache_dir, output_path)) as f:
+            return f.read().strip() == fingerprint
+    except OSError:
+        return False
+
+
+def _record(output_path: str, fingerprint: str, cache_dir: str) -> None:
+    path = _stamp_path(cache_dir, output_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(fingerprint)
+
+
+def compute_layout(graph, layout: Dict[str, Any], cache_dir: str = DEFAULT_CACHE_DIR):
+    """Return (positions, was_cached) for `graph`, computing a spring layout on a miss."""
+    key = structure_hash(graph, layout)
+    with _layouts_lock:
+        if key in _layouts:
+            return _layouts[key], True
+
+    path = os.path.join(cache_dir, "layouts", f"{key}.json")
+    by_repr = {repr(n): n for n in graph.nodes()}
+    try:
+        with open(path) as f:
+            positions = {by_repr[k]: tuple(v) for k, v in json.load(f).items()}
+        cached = True
+    except (OSError, ValueError, KeyError):
+        import networkx as nx
+
+        raw = nx.spring_layout(graph, **layout)
+        positions = {n: (float(x), float(y)) for n, (x, y) in raw.items()}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({repr(n): p for n, p in positions.items()}, f)
+        cached = False
+
+    with _layouts_lock:
+        _layouts[key] = positions
+    return positions, cached
+
+
+def _resolve_options(output_path: str, fast: bool, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in defaults; fast mode means vector output (or a low-dpi PNG)."""
+    fmt = options.get("format") or os.path.splitext(output_path)[1].lstrip(".").lower() or "png"
+    resolved = {
+        "title": options.get("title"),
+        "format": fmt,
+        "dpi": options.get("dpi") or (72 if fast else 300),
+        "figsize": tuple(options.get("figsize") or (14, 10)),
+        "layout": dict(options.get("layout") or {"k": 3, "iterations": 50, "seed": 42}),
+        "edge_labels": options.get("edge_labels", not fast or fmt == "svg"),
+    }
+    if fmt == "svg":
+        resolved["dpi"] = 72  # Irrelevant for vector output; fixed so it doesn't affect the hash
+    return resolved
+
+
+def _draw(graph, positions, output_path: str, opts: Dict[str, Any]) -> None:
+    import networkx as nx
+    from matplotlib.figure import Figure
+    from matplotlib.lines import Line2D
+
+    # A bare Figure avoids pyplot's global state (safe in worker processes and threads)
+    fig = Figure(figsize=opts["figsize"])
+    ax = fig.subplots()
+    if opts["title"]:
+        fig.suptitle(opts["title"], fontsize=16, fontweight="bold")
+
+    node_colors = [attrs.get("color", DEFAULT_COLOR) for _, attrs in graph.nodes(data=True)]
+    nx.draw_networkx_nodes(graph, positions, node_color=node_colors,
+                           node_size=3000, alpha=0.9,
+                           ax=ax, edgecolors="white", linewidths=2)
+    nx.draw_networkx_edges(graph, positions, edge_color="#34495e",
+                           width=2.5, alpha=0.6, arrows=True,
+                           arrowsize=20, arrowstyle="->",
+                           connectionstyle="arc3,rad=0.1", ax=ax)
+    nx.draw_networkx_labels(graph, positions, {n: str(n) for n in graph.nodes()}, font_size=10,
+                            font_weight="bold", font_color="white", ax=ax)
+    if opts["edge_labels"]:
+        edge_labels = nx.get_edge_attributes(graph, "label")
+        if edge_labels:
+            nx.draw_networkx_edge_labels(graph, positions, edge_labels, font_size=8,
+                                         bbox=dict(boxstyle="round,pad=0.3",
+                                                   facecolor="white", alpha=0.8), ax=ax)
+
+    # One legend entry per node type, in first-seen order
+    legend = {}
+    for _, attrs in graph.nodes(data=True):
+        if "type" in attrs:
+            legend.setdefault(attrs["type"], attrs.get("color", DEFAULT_COLOR))
+    if legend:
+        ax.legend(handles=[Line2D([0], [0], marker="o", color="w", markerfacecolor=color,
+                                  markersize=10, label=label) for label, color in legend.items()],
+                  loc="upper right", fontsize=10)
+
+    ax.set_facecolor("#f8f9fa")
+    ax.axis("off")
+    fig.tight_layout()
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    fig.savefig(output_path, format=opts["format"], dpi=opts["dpi"],
+                bbox_inches="tight", facecolor="white")
+
+
+def render_graph(graph, output_path: str, *, fast: bool = False, force: bool = False,
+                 cache_dir: str = DEFAULT_CACHE_DIR, **options) -> RenderResult:
+    """Render `graph` to `output_path` unless the file is already current.
+
+    Options: `title`, `format` (png/svg/pdf, default from the file extension),
+    `dpi`, `figsize`, `layout` (spring layout kwargs) and `edge_labels`.
+    """
+    start = time.perf_counter()
+    opts = _resolve_options(output_path, fast, options)
+    fingerprint = graph_fingerprint(graph, opts)
+    if not force and is_current(output_path, fingerprint, cache_dir):
+        return RenderResult(output_path, fingerprint, skipped=True,
+                            seconds=time.perf_counter() - start)
+
+    positions, layout_cached = compute_layout(graph, opts["layout"], cache_dir)
+    _draw(graph, positions, output_path, opts)
+    _record(output_path, fingerprint, cache_dir)
+    return RenderResult(output_path, fingerprint, skipped=False, layout_cached=layout_cached,
+                        seconds=time.perf_counter() - start)
+
+
+def _render_job(job: RenderJob, fast: bool, force: bool, cache_dir: str) -> RenderResult:
+    return render_graph(job.graph, job.output_path, fast=fast, force=force,
+                        cache_dir=cache_dir, **job.options)
+
+
+def render_many(jobs: Sequence[RenderJob], *, fast: bool = False, force: bool = False,
+                cache_dir: str = DEFAULT_CACHE_DIR, max_workers: Optional[int] = None) -> List[RenderResult]:
+    """Render several graphs, in parallel processes, skipping current outputs.
+
+    Results are returned in the order of `jobs`.
+    """
+    results: List[Optional[RenderResult]] = [None] * len(jobs)
+    stale = []
+    for i, job in enumerate(jobs):
+        opts = _resolve_options(job.output_path, fast, job.options)
+        fingerprint = graph_fingerprint(job.graph, opts)
+        if not force and is_current(job.output_path, fingerprint, cache_dir):
+            results[i] = RenderResult(job.output_path, fingerprint, skipped=True)
+        else:
+            stale.append(i)
+
+    if len(stale) == 1:
+        results[stale[0]] = _render_job(jobs[stale[0]], fast, force, cache_dir)
+    elif stale:
+        workers = min(max_workers or os.cpu_count() or 1, len(stale))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {i: pool.submit(_render_job, jobs[i], fast, force, cache_dir) for i in stale}
+            for i, future in futures.items():
+                results[i] = future.result()
+    return results
@@ -0,0 +1,362 @@
+"""
+Router - Latency- and Cost-Aware Model Selection with Failover
+===============================================================
+
+Instead of pinning one model everywhere, each call site asks for a quality
+tier and the router picks a model from a configured pool:
+
+- Tiers are ordered `fast` < `standard` < `strong`; a call runs on a model of
+  its tier (e.g. reviewer-style routing checks on `fast`) and may fail over to
+  higher tiers
+- Within a tier the router prefers the lowest score: the model's recent
+  latency (EWMA) inflated by its error rate, plus a cost term
+- Timeouts, 5xx, rate-limit and connection errors fail over to the next
+  model, trying the other provider first; other errors (bad requests) are
+  raised as-is. A model that keeps failing sits out a cooldown period
+- Per-model counters: calls, errors, failovers, latency percentiles, tokens
+  and estimated cost
+- Latency and the async per-attempt timeout cover only the provider call:
+  when the call goes through `agents.scheduler`, the clock starts once the
+  scheduler admits it, so local rate-limit queueing never counts against a
+  model
+
+Usage:
+    router = get_router()
+    response = router.invoke("fast", lambda option: router.chat_model(option).invoke(messages))
+    router.print_stats()
+
+    LLM_MODEL_POOL=openai:gpt-4.1-nano=fast,openai:gpt-4o-mini=standard,anthropic:claude-3-5-haiku-latest=standard
+    LLM_ROUTER_COST_WEIGHT=0.1   # seconds of latency worth $1 per 1M tokens
+
+Only providers with an API key in the environment are used. With
+LLM_PROVIDER=fake every pool entry is served by the offline fake model (under
+its configured name), so routing and failover can be exercised offline.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from .pricing import message_cost, model_prices
+from .providers import get_chat_model, get_provider
+from .scheduler import Admission, track_admission
+from .stats import latency_summary
+
+T = TypeVar("T")
+
+TIERS = ("fast", "standard", "strong")
+PROVIDER_KEYS = {"openai": "OPENAI_API_KEY", "anthropic": "ANTHROPIC_API_KEY"}
+DEFAULT_POOL = (
+    "openai:gpt-4.1-nano=fast,"
+    "openai:gpt-4o-mini=standard,"
+    "anthropic:claude-3-5-haiku-latest=standard,"
+    "openai:gpt-4o=strong,"
+    "anthropic:claude-3-5-sonnet-latest=strong"
+)
+PRIOR_LATENCY = 1.0  # Seconds assumed for a model before it has been measured
+EWMA_ALPHA = 0.2
+COOLDOWN_AFTER_FAILURES = 3
+COOLDOWN_SECONDS = 30.0
+_RETRYABLE_NAMES = ("Timeout", "RateLimit", "APIConnection", "InternalServer",
+                    "ServiceUnavailable", "Overloaded", "APIStatus")
+
+
+@dataclass(frozen=True)
+class ModelOption:
+    """One model in the pool."""
+    provider: str
+    model: str
+    tier: str = "standard"
+
+    @property
+    def label(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+@dataclass
+class ModelHealth:
+    """Live statistics the router ranks a model by."""
+    latency: float = PRIOR_LATENCY  # EWMA of successful call latency
+    error_rate: float = 0.0  # EWMA of failures (1) and successes (0)
+    consecutive_failures: int = 0
+    last_failure: float = 0.0
+    cooldown_until: float = 0.0
+    counts: Counter = field(default_factory=Counter)
+    latencies: deque = field(default_factory=lambda: deque(maxlen=500))
+    cost_usd: float = 0.0
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for failures another model/provider may not have: timeouts, 5xx, 429, connection errors."""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return any(name in type(error).__name__ for name in _RETRYABLE_NAMES)
+
+
+def parse_pool(spec: str) -> List[ModelOption]:
+    """Parse `provider:model=tier,...` (tier defaults to standard)."""
+    options = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        target, _, tier = item.partition("=")
+        provider, _, model = target.partition(":")
+        if not model:
+            raise ValueError(f"Pool entry '{item}' must look like provider:model=tier")
+        tier = tier.strip() or "standard"
+        if tier not in TIERS:
+            raise ValueError(f"Unknown tier '{tier}' in '{item}'. Use one of {TIERS}")
+        options.append(ModelOption(provider.strip(), model.strip(), tier))
+    return options
+
+
+class ModelRouter:
+    """Picks a model per call and fails over across models and providers."""
+
+    def __init__(self, pool: Sequence[ModelOption], cost_weight: float = 0.1,
+                 timeout: Optional[float] = None):
+        if not pool:
+            raise ValueError("The model pool is empty")
+        self.pool = list(pool)
+        self.cost_weight = cost_weight
+        self.timeout = timeout  # Per-attempt limit for async calls
+        self.health: Dict[str, ModelHealth] = {option.label: ModelHealth() for option in self.pool}
+        self._models: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+    def score(self, option: ModelOption) -> float:
+        """Lower is better: expected latency given the error rate, plus weighted price."""
+        health = self.health[option.label]
+        input_price, output_price = model_prices(option.model)
+        # Old failures fade (half-life COOLDOWN_SECONDS) so a recovered model gets traffic again
+        error_rate = health.error_rate * 0.5 ** ((time.monotonic() - health.last_failure) / COOLDOWN_SECONDS)
+        expected_latency = health.latency / max(0.05, 1.0 - error_rate)
+        return expected_latency + self.cost_weight * (input_price + output_price) / 2
+
+    def candidates(self, tier: str = "standard") -> List[ModelOption]:
+        """Models that can serve `tier`, best first, alternating providers after the first."""
+        if tier not in TIERS:
+            raise ValueError(f"Unknown tier '{tier}'. Use one of {TIERS}")
+        floor = TIERS.index(tier)
+        now = time.monotonic()
+        with self._lock:
+            eligible = [o for o in self.pool if TIERS.index(o.tier) >= floor]
+            # Models of exactly the requested tier first, higher tiers as failover;
+            # cooling-down models go last rather than away, so there is always a candidate
+            ranked = sorted(eligible, key=lambda o: (self.health[o.label].cooldown_until > now,
+                                                     TIERS.index(o.tier) - floor, self.score(o)))
+        if not ranked:
+            raise ValueError(f"No model in the pool serves tier '{tier}' or above")
+
+        # Failover order: after each model, prefer the best model of another provider
+        ordered, remaining = [], list(ranked)
+        while remaining:
+            last = ordered[-1].provider if ordered else None
+            pick = next((o for o in remaining if o.provider != last), remaining[0])
+            ordered.append(pick)
+            remaining.remove(pick)
+        return ordered
+
+    def select(self, tier: str = "standard") -> ModelOption:
+        """The model the next call for `tier` would use."""
+        return self.candidates(tier)[0]
+
+    def expected_latency(self, tier: str = "standard") -> Optional[float]:
+        """Recent latency of the model `tier` would use.
+
+        Falls back to the average over all measured models, and None before any call.
+        """
+        health = self.health[self.select(tier).label]
+        if health.latencies:
+            return health.latency
+        measured = [h.latency for h in self.health.values() if h.latencies]
+        return sum(measured) / len(measured) if measured else None
+
+    @staticmethod
+    def backend(option: ModelOption) -> str:
+        """The provider that actually serves `option` (`fake` when running offline)."""
+        return "fake" if get_provider() == "fake" else option.provider
+
+    def chat_model(self, option: ModelOption, **kwargs: Any) -> Any:
+        """A shared chat model instance for `option` (built once per settings)."""
+        provider = self.backend(option)
+        key = (provider, option.model, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = get_chat_model(option.model, provider=provider, **kwargs)
+                self._models[key] = model
+            return model
+
+    # ------------------------------------------------------------------
+    # Outcomes
+    # ------------------------------------------------------------------
+    def record_success(self, option: ModelOption, seconds: float, response: Any = None) -> None:
+        # Agent middleware hands back a ModelResponse; its last message carries the usage
+        result = getattr(response, "result", None)
+        if isinstance(result, list) and result:
+            response = result[-1]
+        with self._lock:
+            health = self.health[option.label]
+            # The first measurement replaces the prior; later ones are smoothed
+            health.latency += (EWMA_ALPHA if health.latencies else 1.0) * (seconds - health.latency)
+            health.error_rate *= 1 - EWMA_ALPHA
+            health.consecutive_failures = 0
+            health.counts["calls"] += 1
+            health.latencies.append(seconds)
+            usage = getattr(response, "usage_metadata", None) or {}
+            health.counts["input_tokens"] += usage.get("input_tokens", 0)
+            health.counts["output_tokens"] += usage.get("output_tokens", 0)
+            health.cost_usd += message_cost(response, default_model=option.model) if response is not None else 0.0
+
+    def record_failure(self, option: ModelOption, error: BaseException) -> None:
+        with self._lock:
+            health = self.health[option.label]
+            health.error_rate += EWMA_ALPHA * (1.0 - health.error_rate)
+            health.consecutive_failures += 1
+            health.last_failure = time.monotonic()
+            health.counts["calls"] += 1
+            health.counts["errors"] += 1
+            health.counts[f"error:{type(error).__name__}"] += 1
+            if health.consecutive_failures >= COOLDOWN_AFTER_FAILURES:
+                health.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+    def invoke(self, tier: str, call: Callable[[ModelOption], T]) -> T:
+        """Run `call(option)` on the best model for `tier`, failing over on retryable errors."""
+        error: Optional[BaseException] = None
+        for attempt, option in enumerate(self.candidates(tier)):
+            if attempt:
+                self.health[option.label].counts["failover_to"] += 1
+            started = time.perf_counter()
+            try:
+                with track_admission() as admission:
+                    response = call(option)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                self.record_failure(option, e)
+                error = e
+                continue
+            self.record_success(option, time.perf_counter() - (admission.admitted_at or started), response)
+            return response
+        raise error
+
+    async def ainvoke(self, tier: str, call: Callable[[ModelOption], Awaitable[T]]) -> T:
+        """Async version of `invoke`; each attempt's provider call is bounded by `timeout`."""
+        error: Optional[BaseException] = None
+        for attempt, option in enumerate(self.candidates(tier)):
+            if attempt:
+                self.health[option.label].counts["failover_to"] += 1
+            started = time.perf_counter()
+            with track_admission() as admission:
+                attempt_task = asyncio.ensure_future(call(option))
+            try:
+                response = await self._bounded(attempt_task, started, admission)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                self.record_failure(option, e)
+                error = e
+                continue
+            self.record_success(option, time.perf_counter() - (admission.admitted_at or started), response)
+            return response
+        raise error
+
+    async def _bounded(self, task: "asyncio.Future[T]", started: float, admission: Admission) -> T:
+        """Await `task`, timing out `timeout` seconds after its scheduler admission (or its start).
+
+        While the call waits in the scheduler's queue the clock does not run.
+        """
+        try:
+            while True:
+                if self.timeout is None or admission.waiting:
+                    left = self.timeout
+                else:
+                    left = (admission.admitted_at or started) + self.timeout - time.perf_counter()
+                done, _ = await asyncio.wait({task}, timeout=left)
+                if done:
+                    return task.result()
+                if not admission.waiting and \
+                        time.perf_counter() >= (admission.admitted_at or started) + self.timeout:
+                    raise asyncio.TimeoutError()
+        finally:
+            if not task.done():
+                task.cancel()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model counters, latency summary and estimated cost (used models only)."""
+        with self._lock:
+            return {
+                label: {
+                    **health.counts,
+                    "latency": latency_summary(list(health.latencies)),
+                    "error_rate": round(health.error_rate, 3),
+                    "cost_usd": health.cost_usd,
+                }
+                for label, health in self.health.items()
+                if health.counts
+            }
+
+    def print_stats(self) -> None:
+        for label, s in self.stats().items():
+            latency = s["latency"]
+            print(f"   {label:<36} {s['calls']:>4} calls, {s.get('errors', 0)} errors, "
+                  f"{s.get('failover_to', 0)} failovers in, p50={latency['p50'] * 1000:.0f}ms "
+                  f"p95={latency['p95'] * 1000:.0f}ms, ~${s['cost_usd']:.4f}")
+
+
+def available_pool(options: Sequence[ModelOption]) -> List[ModelOption]:
+    """Drop models whose provider has no API key (all are usable with LLM_PROVIDER=fake)."""
+    if get_provider() == "fake":
+        return list(options)
+    usable = [o for o in options if os.getenv(PROVIDER_KEYS.get(o.provider, ""), "")]
+    # Nothing configured yet: keep the pool so the provider raises a clear auth error
+    return usable or list(options)
+
+
+def routing_middleware(router: ModelRouter, tier: str = "standard", **model_kwargs: Any):
+    """Agent middleware that routes each `create_agent` model call through `router`."""
+    from langchain.agents.middleware import AgentMiddleware
+
+    class RoutingMiddleware(AgentMiddleware):
+        def wrap_model_call(self, request, handler):
+            return router.invoke(tier, lambda option: handler(
+                request.override(model=router.chat_model(option, **model_kwargs))))
+
+        async def awrap_model_call(self, request, handler):
+            return await router.ainvoke(tier, lambda option: handler(
+                request.override(model=router.chat_model(option, **model_kwargs))))
+
+    return RoutingMiddleware()
+
+
+_shared: Optional[ModelRouter] = None
+_shared_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """The process-wide router, configured from LLM_MODEL_POOL / LLM_ROUTER_* env vars."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            timeout = os.getenv("LLM_ROUTER_TIMEOUT_SECONDS")
+            _shared = ModelRouter(
+                available_pool(parse_pool(os.getenv("LLM_MODEL_POOL") or DEFAULT_POOL)),
+                cost_weight=float(os.getenv("LLM_ROUTER_COST_WEIGHT", "0.1")),
+                timeout=float(timeout) if timeout else None,
+            )
+        return _shared
@@ -0,0 +1,512 @@
+"""
+Scheduler - Rate-Limit-Aware Admission for LLM Calls
+=====================================================
+
+Every agent shares the same provider deployment, so uncoordinated concurrent
+calls run into the provider's requests-per-minute (RPM) and tokens-per-minute
+(TPM) limits and then into retry storms. `RateLimitScheduler` sits in front of
+all model calls and decides when each one may start:
+
+- Token buckets per model for requests and (estimated) tokens; estimates are
+  corrected with the actual usage once a call returns
+- Priority classes: `interactive` calls always go before `batch` calls
+- Fair queuing: within a class, workflows take turns (round robin), so one
+  large batch cannot starve the others
+- Adaptive slowdown: rate-limit response headers (`x-ratelimit-*`,
+  `anthropic-ratelimit-*`, `retry-after`) pause a model until its window
+  resets; a 429 halves its rate, which then recovers step by step. Limits
+  reported in headers are adopted when none are configured
+
+Usage:
+    scheduler = get_scheduler()
+    with scheduler_scope(workflow="task-42", priority="batch"):
+        response = scheduler.call("gpt-4o-mini", lambda: llm.invoke(messages),
+                                  tokens=estimate_messages_tokens(messages))
+
+    LLM_RATE_LIMITS=gpt-4o-mini=500:200000,gpt-4o=500:30000   # model=RPM:TPM
+    LLM_RPM=500            # defaults for models not listed
+    LLM_TPM=200000
+
+Without configured limits calls pass straight through until a provider reports
+its limits (or throttles) in response headers.
+
+Callers that time model calls (the router) wrap them in `track_admission()`:
+the scheduler records when the call left its queue, so time spent waiting
+for local rate limits is not mistaken for a slow model.
+
+Header coverage: OpenAI models from `get_chat_model` (and OpenAI-compatible
+servers such as `agents.stub_server`) expose every response's headers in
+`response_metadata["headers"]`. `ChatAnthropic` does not, so Anthropic calls
+only adapt to 429s (`retry-after` on the error). The fake model sends none.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+PRIORITIES = ("interactive", "batch")
+DEFAULT_COMPLETION_TOKENS = 256
+# Pause a model when fewer than this fraction of its window's budget remains
+LOW_REMAINING_FRACTION = 0.02
+MIN_RATE_SCALE = 0.1
+RECOVERY_STEP = 0.05
+
+_workflow: contextvars.ContextVar = contextvars.ContextVar("scheduler_workflow", default="default")
+_priority: contextvars.ContextVar = contextvars.ContextVar("scheduler_priority", default="interactive")
+_admission: contextvars.ContextVar = contextvars.ContextVar("scheduler_admission", default=None)
+
+
+@contextlib.contextmanager
+def scheduler_scope(workflow: Optional[str] = None, priority: Optional[str] = None) -> Iterator[None]:
+    """Tag every model call made inside this block (threads and tasks included)."""
+    if priority is not None and priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{priority}'. Use one of {PRIORITIES}")
+    tokens = []
+    if workflow is not None:
+        tokens.append((_workflow, _workflow.set(str(workflow))))
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+@dataclass
+class Admission:
+    """When the call made inside `track_admission` was last let through, and how long it queued."""
+    admitted_at: Optional[float] = None  # time.perf_counter()
+    queued_seconds: float = 0.0
+    waiting: bool = False  # In the scheduler's queue right now
+
+
+@contextlib.contextmanager
+def track_admission() -> Iterator[Admission]:
+    """Record the scheduler admission of the model call made inside this block (tasks included)."""
+    admission = Admission()
+    token = _admission.set(admission)
+    try:
+        yield admission
+    finally:
+        _admission.reset(token)
+
+
+def _waiting(waiting: bool) -> None:
+    admission = _admission.get()
+    if admission is not None:
+        admission.waiting = waiting
+
+
+def _admitted(enqueued: float) -> None:
+    admission = _admission.get()
+    if admission is not None:
+        admission.waiting = False
+        admission.admitted_at = time.perf_counter()
+        admission.queued_seconds += admission.admitted_at - enqueued
+
+
+class TokenBucket:
+    """Refills at `per_minute / 60` units per second up to `capacity`."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float, scale: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60 * scale)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float, scale: float = 1.0) -> float:
+        """Seconds until `amount` (capped at the capacity) is available."""
+        self._refill(now, scale)
+        missing = min(amount, self.capacity) - self.level
+        return 0.0 if missing <= 0 else missing / (self.per_minute / 60 * scale)
+
+    def consume(self, amount: float) -> None:
+        self.level -= amount  # May go negative: later callers wait for the debt
+
+    def refund(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+@dataclass
+class ModelBudget:
+    """Scheduling state for one model."""
+    requests: Optional[TokenBucket] = None
+    tokens: Optional[TokenBucket] = None
+    scale: float = 1.0  # Adaptive multiplier on the refill rates
+    paused_until: float = 0.0
+    stats: Counter = field(default_factory=Counter)
+    wait_seconds: float = 0.0
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        waits = [self.paused_until - now]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(1, now, self.scale))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(tokens, now, self.scale))
+        return max(0.0, *waits)
+
+    def consume(self, tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.consume(1)
+        if self.tokens is not None:
+            self.tokens.consume(tokens)
+
+    def refund(self, tokens: int) -> None:
+        """Give back a reservation whose call never ran."""
+        if self.requests is not None:
+            self.requests.refund(1)
+        if self.tokens is not None:
+            self.tokens.refund(tokens)
+
+
+@dataclass
+class _Ticket:
+    model: str
+    tokens: int
+    priority: str
+    workflow: str
+    enqueued: float
+    grant: Callable[[], None]
+    granted: bool = False
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse reset values such as `1s`, `6m0s`, `59.2ms`, `20` or an ISO timestamp into seconds."""
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total, number, i = 0.0, "", 0
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    while i < len(value):
+        ch = value[i]
+        if ch.isdigit() or ch == ".":
+            number += ch
+            i += 1
+            continue
+        unit = "ms" if value.startswith("ms", i) else ch
+        if unit not in units or not number:
+            break
+        total += float(number) * units[unit]
+        number, i = "", i + len(unit)
+    else:
+        if not number:
+            return total
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+
+def _header(headers: Mapping[str, Any], *names: str) -> Optional[str]:
+    lowered = {str(k).lower(): v for k, v in headers.items()}
+    for name in names:
+        if name in lowered:
+            return lowered[name]
+    return None
+
+
+def _is_rate_limited(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+class RateLimitScheduler:
+    """Shared gate in front of every model call (thread- and asyncio-safe)."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default_limits: Optional[Tuple[Optional[float], Optional[float]]] = None,
+                 max_retries: int = 2):
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits or (None, None)
+        self.max_retries = max_retries
+        self._budgets: Dict[str, ModelBudget] = {}
+        # priority -> workflow -> queued tickets (workflow order is the round-robin order)
+        self._queues: Dict[str, "OrderedDict[str, deque]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._cond = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._seq = itertools.count()
+
+    # ------------------------------------------------------------------
+    # Budgets
+    # ------------------------------------------------------------------
+    def budget(self, model: str) -> ModelBudget:
+        """The scheduling state of `model` (created from the configured limits)."""
+        budget = self._budgets.get(model)
+        if budget is None:
+            rpm, tpm = self.limits.get(model, self.default_limits)
+            budget = ModelBudget(requests=TokenBucket(rpm) if rpm else None,
+                                 tokens=TokenBucket(tpm) if tpm else None)
+            self._budgets[model] = budget
+        return budget
+
+    def observe_headers(self, model: str, headers: Mapping[str, Any]) -> None:
+        """Adapt to the provider's view of our limits (called after every response)."""
+        if not headers:
+            return
+        with self._cond:
+            budget = self.budget(model)
+            now = time.monotonic()
+            for kind in ("requests", "tokens"):
+                limit = _header(headers, f"x-ratelimit-limit-{kind}", f"anthropic-ratelimit-{kind}-limit")
+                remaining = _header(headers, f"x-ratelimit-remaining-{kind}",
+                                    f"anthropic-ratelimit-{kind}-remaining")
+                reset = _header(headers, f"x-ratelimit-reset-{kind}", f"anthropic-ratelimit-{kind}-reset")
+                try:
+                    limit = float(limit) if limit is not None else None
+                    remaining = float(remaining) if remaining is not None else None
+                except ValueError:
+                    continue
+                # Adopt limits the provider reports when none were configured
+                if limit and getattr(budget, kind) is None:
+                    setattr(budget, kind, TokenBucket(limit))
+                if remaining is not None and limit and remaining <= limit * LOW_REMAINING_FRACTION:
+                    seconds = parse_duration(reset) if reset is not None else None
+                    if seconds:
+                        budget.paused_until = max(budget.paused_until, now + seconds)
+                        budget.stats["header_pauses"] += 1
+            self._cond.notify_all()
+
+    def _throttled(self, model: str, error: BaseException) -> None:
+        """A 429: pause for the advertised time and halve the rate."""
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = _header(headers, "retry-after-ms")
+        seconds = float(retry_after) / 1000 if retry_after else parse_duration(_header(headers, "retry-after") or "1")
+        with self._cond:
+            budget = self.budget(model)
+            budget.scale = max(MIN_RATE_SCALE, budget.scale / 2)
+            budget.paused_until = max(budget.paused_until, time.monotonic() + (seconds or 1.0))
+            budget.stats["throttled"] += 1
+            self._cond.notify_all()
+
+    def _settle(self, model: str, estimated: int, response: Any) -> None:
+        """Correct the token bucket with actual usage and let the rate recover."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        actual = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        metadata = getattr(response, "response_metadata", None) or {}
+        with self._cond:
+            budget = self.budget(model)
+            if actual and budget.tokens is not None:
+                budget.tokens.consume(actual - estimated)
+            budget.scale = min(1.0, budget.scale + RECOVERY_STEP)
+        self.observe_headers(model, metadata.get("headers") or {})
+
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+    def _enqueue(self, model: str, tokens: int, grant: Callable[[], None]) -> Optional[_Ticket]:
+        """Grant immediately (None) when nothing is queued and the budget allows; otherwise queue."""
+        priority, workflow = _priority.get(), _workflow.get()
+        with self._cond:
+            budget = self.budget(model)
+            budget.stats["calls"] += 1
+            nothing_queued = not any(self._queues[p] for p in PRIORITIES)
+            if nothing_queued and budget.wait_time(tokens, time.monotonic()) == 0:
+                budget.consume(tokens)
+                return None
+            budget.stats["queued"] += 1
+            ticket = _Ticket(model, tokens, priority, workflow, time.monotonic(), grant)
+            self._queues[priority].setdefault(workflow, deque()).append(ticket)
+            self._ensure_dispatcher()
+            self._cond.notify_all()
+            return ticket
+
+    def _cancel(self, ticket: _Ticket) -> None:
+        """Withdraw a ticket whose caller stopped waiting: dequeue it, or refund it if already granted."""
+        with self._cond:
+            budget = self.budget(ticket.model)
+            budget.stats["cancelled"] += 1
+            if ticket.granted:
+                budget.refund(ticket.tokens)
+                self._cond.notify_all()
+                return
+            queues = self._queues[ticket.priority]
+            queue = queues.get(ticket.workflow)
+            if queue is not None and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del queues[ticket.workflow]
+            self._cond.notify_all()
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="llm-scheduler", daemon=True)
+            self._dispatcher.start()
+
+    def _next_grant(self, now: float) -> Tuple[Optional[_Ticket], float]:
+        """Pick the next ticket to admit, or how long to wait before checking again."""
+        blocked, wait = set(), None
+        for priority in PRIORITIES:
+            queues = self._queues[priority]
+            for workflow in list(queues):
+                ticket = queues[workflow][0]
+                if ticket.model in blocked:
+                    continue  # An earlier (higher priority or fairer) call is waiting for this model
+                ticket_wait = self.budget(ticket.model).wait_time(ticket.tokens, now)
+                if ticket_wait == 0:
+                    queues[workflow].popleft()
+                    if queues[workflow]:
+                        queues.move_to_end(workflow)  # Round robin: this workflow goes last
+                    else:
+                        del queues[workflow]
+                    return ticket, 0.0
+                blocked.add(ticket.model)
+                wait = ticket_wait if wait is None else min(wait, ticket_wait)
+        return None, wait
+
+    def _dispatch_loop(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ticket, wait = self._next_grant(now)
+                if ticket is not None:
+                    budget = self.budget(ticket.model)
+                    budget.consume(ticket.tokens)
+                    budget.wait_seconds += now - ticket.enqueued
+                    ticket.granted = True
+                    try:
+                        ticket.grant()
+                    except Exception:
+                        # The waiter can no longer be woken (e.g. its loop closed): keep dispatching
+                        budget.refund(ticket.tokens)
+                        budget.stats["grant_errors"] += 1
+                    continue
+                if wait is None and not any(self._queues[p] for p in PRIORITIES):
+                    self._cond.wait(timeout=30)
+                    if not any(self._queues[p] for p in PRIORITIES):
+                        self._dispatcher = None
+                        return  # Idle: exit; the next queued call restarts it
+                else:
+                    self._cond.wait(timeout=wait)
+
+    def acquire(self, model: str, tokens: int) -> None:
+        """Block the calling thread until `model` may be called with ~`tokens` tokens."""
+        enqueued = time.perf_counter()
+        granted = threading.Event()
+        ticket = self._enqueue(model, tokens, granted.set)
+        if ticket is not None:
+            _waiting(True)
+            try:
+                granted.wait()
+            except BaseException:
+                _waiting(False)
+                self._cancel(ticket)
+                raise
+        _admitted(enqueued)
+
+    async def aacquire(self, model: str, tokens: int) -> None:
+        """Async version of `acquire` (waits without blocking the event loop)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant():
+            if future.done():
+                return  # Cancelled: `_cancel` refunds the reservation
+            # Raises RuntimeError once the loop is closed; the dispatcher then refunds the ticket
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        enqueued = time.perf_counter()
+        ticket = self._enqueue(model, tokens, grant)
+        if ticket is not None:
+            _waiting(True)
+            try:
+                await future
+            except BaseException:
+                _waiting(False)
+                self._cancel(ticket)  # Cancelled while queued: drop the ticket, or refund it if granted
+                raise
+        _admitted(enqueued)
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+    def call(self, model: str, fn: Callable[[], Any], tokens: int = DEFAULT_COMPLETION_TOKENS) -> Any:
+        """Run `fn()` once the budget allows, retrying provider throttling after its pause."""
+        for attempt in itertools.count():
+            self.acquire(model, tokens)
+            try:
+                response = fn()
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt >= self.max_retries:
+                    raise
+                self._throttled(model, e)
+                continue
+            self._settle(model, tokens, response)
+            return response
+
+    async def acall(self, model: str, afn: Callable[[], Any], tokens: int = DEFAULT_COMPLETION_TOKENS) -> Any:
+        """Async version of `call`; `afn()` returns an awaitable."""
+        for attempt in itertools.count():
+            await self.aacquire(model, tokens)
+            try:
+                response = await afn()
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt >= self.max_retries:
+                    raise
+                self._throttled(model, e)
+                continue
+            self._settle(model, tokens, response)
+            return response
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model call, queueing and throttling counts plus the current rate scale."""
+        with self._cond:
+            return {
+                model: {
+                    **budget.stats,
+                    "avg_wait_ms": budget.wait_seconds / budget.stats["queued"] * 1000
+                    if budget.stats["queued"] else 0.0,
+                    "rate_scale": round(budget.scale, 2),
+                }
+                for model, budget in self._budgets.items()
+            }
+
+    def queue_depth(self) -> Dict[str, int]:
+        with self._cond:
+            return {p: sum(len(q) for q in self._queues[p].values()) for p in PRIORITIES}
+
+
+def model_name(llm: Any) -> str:
+    """The model identifier a chat model instance calls."""
+    return str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__)
+
+
+def _parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, values = item.partition("=")
+        rpm, _, tpm = values.partition(":")
+        limits[model.strip()] = (float(rpm) if rpm else None, float(tpm) if tpm else None)
+    return limits
+
+
+_shared: Optional[RateLimitScheduler] = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """The process-wide scheduler, configured from LLM_RATE_LIMITS / LLM_RPM / LLM_TPM."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            rpm, tpm = os.getenv("LLM_RPM"), os.getenv("LLM_TPM")
+            _shared = RateLimitScheduler(
+                limits=_parse_limits(os.getenv("LLM_RATE_LIMITS", "")),
+                default_limits=(float(rpm) if rpm else None, float(tpm) if tpm else None),
+            )
+        return _shared
@@ -0,0 +1,397 @@
+"""
+Service - Serve a Compiled Graph over HTTP
+===========================================
+
+An aiohttp application that runs a compiled LangGraph workflow for remote
+callers:
+
+- `POST /invoke`  `{"task": "...", "thread_id": "..."?}` -> final result as JSON
+- `POST /stream`  same body -> Server-Sent Events: `token` events labelled
+  by node as the agents generate them, then one `done` event with the result
+- `POST /batch`   `{"tasks": [{"id": ..., "task": ...}, ...]}` -> per-task results
+- `GET /metrics`  in-flight and queued work, latency histograms, tokens/second
+- `GET /healthz`  liveness
+
+Admission control keeps the process healthy under load:
+
+- At most `max_in_flight` workflows run at once; up to `max_queue` more wait.
+  Admission reserves a request's place before anything is awaited, so a burst
+  of requests is counted as queued straight away
+- Each client (the `X-Client-Id` header, else the remote address) may have at
+  most `per_client` requests running or queued
+- A `/batch` counts as `min(len(tasks), per_client)` requests and runs that
+  many of its tasks at a time, so it cannot get around either limit
+- Past either limit the request is rejected right away with `429` and a
+  `Retry-After` estimated from recent latencies
+- Model calls are tagged for the shared rate-limit scheduler with the client
+  as their workflow (fair queuing between clients); `/batch` runs at `batch`
+  priority so it yields to `/invoke` and `/stream`
+
+Usage:
+    app = create_app(graph, build_state, max_in_flight=32, per_client=4)
+    web.run_app(app, port=8080)
+
+aiohttp is imported only by this module.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Callable, Dict, Optional
+
+from aiohttp import web
+
+from .batch import default_summarize
+from .scheduler import get_scheduler, scheduler_scope
+from .stats import latency_summary
+from .streaming import astream_tokens
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+# Window for the tokens-per-second rate
+RATE_WINDOW_SECONDS = 60.0
+
+
+class Rejected(Exception):
+    """Raised by the limiter when a request cannot be admitted."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Metrics:
+    """Counters, latency histograms and a sliding token rate."""
+
+    def __init__(self, window: int = 1000):
+        self.requests: Counter = Counter()  # (endpoint, status) -> count
+        self.rejected: Counter = Counter()  # reason -> count
+        self.histograms: Dict[str, list] = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+        self.recent: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self.tokens_total = 0
+        self._token_events: deque = deque()  # (time, tokens)
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        self.recent[endpoint].append(seconds)
+        buckets = self.histograms[endpoint]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+
+    def add_tokens(self, tokens: int) -> None:
+        if tokens:
+            self.tokens_total += tokens
+            self._token_events.append((time.monotonic(), tokens))
+
+    def tokens_per_second(self) -> float:
+        cutoff = time.monotonic() - RATE_WINDOW_SECONDS
+        while self._token_events and self._token_events[0][0] < cutoff:
+            self._token_events.popleft()
+        return sum(t for _, t in self._token_events) / RATE_WINDOW_SECONDS
+
+    def mean_latency(self) -> float:
+        values = [v for recent in self.recent.values() for v in recent]
+        return sum(values) / len(values) if values else 1.0
+
+
+class Reservation:
+    """Places admitted for one request; `waiting` of them are not running a workflow."""
+
+    def __init__(self, client: str, count: int):
+        self.client = client
+        self.count = count
+        self.waiting = count
+        self.released = False
+
+
+class Limiter:
+    """Global in-flight limit with a bounded wait queue, plus per-client caps.
+
+    Admission reserves its places right away: until they take a run slot they
+    count as queued, so requests admitted together cannot overshoot the queue.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, per_client: int, metrics: Metrics):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.per_client = per_client
+        self.metrics = metrics
+        self.in_flight = 0
+        self.queued = 0
+        self.per_client_active: Counter = Counter()
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: queued work divided across the slots."""
+        waves = (self.queued + 1) / self.max_in_flight
+        return max(1, math.ceil(waves * self.metrics.mean_latency()))
+
+    def admit(self, client: str, count: int = 1) -> Reservation:
+        """Reserve `count` places for `client` or raise `Rejected` (does not wait).
+
+        Always pair with `release`, on every exit path.
+        """
+        if self.per_client_active[client] + count > self.per_client:
+            raise Rejected("client_limit", self.retry_after())
+        if self.in_flight + self.queued + count > self.max_in_flight + self.max_queue:
+            raise Rejected("saturated", self.retry_after())
+        self.per_client_active[client] += count
+        self.queued += count
+        return Reservation(client, count)
+
+    def release(self, reservation: Reservation) -> None:
+        """Give back a reservation's places (its running slots are released by `slot`)."""
+        self.queued -= reservation.waiting
+        reservation.waiting = 0
+        reservation.released = True
+        self.per_client_active[reservation.client] -= reservation.count
+        if self.per_client_active[reservation.client] <= 0:
+            del self.per_client_active[reservation.client]
+
+    def slot(self, reservation: Reservation) -> "_Slot":
+        """Async context manager that runs one of `reservation`'s places in a global run slot."""
+        return _Slot(self, reservation)
+
+
+class _Slot:
+    def __init__(self, limiter: Limiter, reservation: Reservation):
+        self.limiter = limiter
+        self.reservation = reservation
+
+    async def __aenter__(self):
+        await self.limiter._slots.acquire()
+        self._move(-1)
+
+    async def __aexit__(self, *exc):
+        if self.reservation.released:
+            self.limiter.in_flight -= 1  # A cancelled run finishing after its request gave its places back
+        else:
+            self._move(+1)
+        self.limiter._slots.release()
+
+    def _move(self, waiting: int) -> None:
+        """Move a place between waiting (queued) and running (in flight)."""
+        self.reservation.waiting += waiting
+        self.limiter.queued += waiting
+        self.limiter.in_flight -= waiting
+
+
+def _client_id(request: web.Request) -> str:
+    return request.headers.get("X-Client-Id") or request.remote or "unknown"
+
+
+def _output_tokens(final_state: Dict[str, Any], input_count: int) -> int:
+    """Output tokens reported by the models for messages added during the run."""
+    messages = final_state.get("messages", [])[input_count:]
+    return sum((getattr(m, "usage_metadata", None) or {}).get("output_tokens", 0) for m in messages)
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+def create_app(
+    graph,
+    build_state: Callable[[Dict[str, Any]], Dict[str, Any]],
+    *,
+    summarize: Callable[[Dict[str, Any]], Dict[str, Any]] = default_summarize,
+    config: Optional[Dict[str, Any]] = None,
+    max_in_flight: int = 32,
+    max_queue: int = 64,
+    per_client: int = 8,
+    max_batch: int = 100,
+) -> web.Application:
+    """Build the aiohttp app serving `graph`.
+
+    `build_state(task)` turns a request body (`{"task": ..., ...}`) into the
+    graph input; `summarize(final_state)` shapes the response. Requests with a
+    `thread_id` run under that thread (useful with a checkpointer).
+    """
+    metrics = Metrics()
+    limiter = Limiter(max_in_flight, max_queue, per_client, metrics)
+
+    def run_config(body: Dict[str, Any]) -> Dict[str, Any]:
+        run = dict(config or {})
+        if body.get("thread_id"):
+            run["configurable"] = {**run.get("configurable", {}), "thread_id": str(body["thread_id"])}
+        return run
+
+    def reject(endpoint: str, error: Rejected) -> web.Response:
+        metrics.rejected[error.reason] += 1
+        metrics.requests[(endpoint, 429)] += 1
+        return web.json_response({"error": error.reason, "retry_after": error.retry_after},
+                                 status=429, headers={"Retry-After": str(error.retry_after)})
+
+    async def read_task(request: web.Request) -> Dict[str, Any]:
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise web.HTTPBadRequest(text="Request body must be JSON")
+        if not isinstance(body, dict) or not isinstance(body.get("task"), str):
+            raise web.HTTPBadRequest(text='Expected {"task": "..."}')
+        return body
+
+    async def run_one(body: Dict[str, Any], reservation: Reservation,
+                      priority: str = "interactive") -> Dict[str, Any]:
+        """Run one task in a global slot and return its summarized result."""
+        state = build_state(body)
+        client = reservation.client
+        async with limiter.slot(reservation):
+            started = time.perf_counter()
+            with scheduler_scope(workflow=client, priority=priority):
+                final_state = await graph.ainvoke(state, config=run_config(body))
+            latency = time.perf_counter() - started
+        metrics.add_tokens(_output_tokens(final_state, len(state.get("messages", []))))
+        return {**summarize(final_state), "latency": latency}
+
+    async def invoke(request: web.Request) -> web.Response:
+        body = await read_task(request)
+        try:
+            reservation = limiter.admit(_client_id(request))
+        except Rejected as e:
+            return reject("invoke", e)
+        started = time.perf_counter()
+        try:
+            result = await run_one(body, reservation)
+        except Exception as e:
+            metrics.requests[("invoke", 500)] += 1
+            return web.json_response({"error": f"{type(e).__name__}: {e}"}, status=500)
+        finally:
+            limiter.release(reservation)
+        metrics.observe("invoke", time.perf_counter() - started)
+        metrics.requests[("invoke", 200)] += 1
+        return web.json_response({"id": body.get("id"), **result})
+
+    async def stream(request: web.Request) -> web.StreamResponse:
+        body = await read_task(request)
+        client = _client_id(request)
+        try:
+            reservation = limiter.admit(client)
+        except Rejected as e:
+            return reject("stream", e)
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream",
+                                               "Cache-Control": "no-cache"})
+        started = time.perf_counter()
+        status = 200
+        task = None
+        try:
+            await response.prepare(request)
+            queue: asyncio.Queue = asyncio.Queue()
+            state = build_state(body)
+
+            async def produce():
+                async with limiter.slot(reservation):
+                    with scheduler_scope(workflow=client, priority="interactive"):
+                        return await astream_tokens(graph, state, config=run_config(body),
+                                                    on_token=lambda node, text: queue.put_nowait((node, text)))
+
+            task = asyncio.ensure_future(produce())
+            task.add_done_callback(lambda _: queue.put_nowait(None))
+            while (item := await queue.get()) is not None:
+                await response.write(_sse("token", {"node": item[0], "text": item[1]}))
+            try:
+                report = task.result()
+                metrics.add_tokens(sum(report.tokens.values()))
+                done = {**summarize(report.final_state), "latency": report.total_time,
+                        "ttft": {node: times[0] for node, times in report.ttft.items() if times}}
+                await response.write(_sse("done", {"id": body.get("id"), **done}))
+            except Exception as e:
+                status = 500
+                await response.write(_sse("error", {"error": f"{type(e).__name__}: {e}"}))
+            await response.write_eof()
+        except ConnectionResetError:
+            status = 499  # The client went away mid-stream
+        finally:
+            if task is not None and not task.done():
+                task.cancel()
+            limiter.release(reservation)
+        metrics.observe("stream", time.perf_counter() - started)
+        metrics.requests[("stream", status)] += 1
+        return response
+
+    async def batch(request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise web.HTTPBadRequest(text="Request body must be JSON")
+        tasks = body.get("tasks") if isinstance(body, dict) else None
+        if not isinstance(tasks, list) or not all(isinstance(t, dict) and isinstance(t.get("task"), str)
+                                                  for t in tasks):
+            raise web.HTTPBadRequest(text='Expected {"tasks": [{"id": ..., "task": "..."}, ...]}')
+        if len(tasks) > max_batch:
+            raise web.HTTPRequestEntityTooLarge(max_size=max_batch, actual_size=len(tasks))
+
+        # A batch takes up to `per_client` of its client's places and runs that
+        # many tasks at a time, so it never queues more than it was admitted for
+        width = max(1, min(len(tasks), per_client))
+        try:
+            reservation = limiter.admit(_client_id(request), width)
+        except Rejected as e:
+            return reject("batch", e)
+        started = time.perf_counter()
+        places = asyncio.Semaphore(width)
+
+        async def run_task(task: Dict[str, Any]) -> Dict[str, Any]:
+            async with places:
+                try:
+                    return {"id": task.get("id"), "ok": True, **await run_one(task, reservation, priority="batch")}
+                except Exception as e:
+                    return {"id": task.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        try:
+            results = await asyncio.gather(*(run_task(t) for t in tasks))
+        finally:
+            limiter.release(reservation)
+        wall_time = time.perf_counter() - started
+        metrics.observe("batch", wall_time)
+        metrics.requests[("batch", 200)] += 1
+        return web.json_response({"results": results, "wall_time": wall_time,
+                                  "succeeded": sum(r["ok"] for r in results)})
+
+    async def metrics_view(request: web.Request) -> web.Response:
+        latency = {}
+        for endpoint, recent in metrics.recent.items():
+            latency[endpoint] = {
+                **latency_summary(list(recent)),
+                "histogram": {("+Inf" if math.isinf(b) else str(b)): count
+                              for b, count in zip(LATENCY_BUCKETS, metrics.histograms[endpoint])},
+            }
+        return web.json_response({
+            "in_flight": limiter.in_flight,
+            "queue_depth": limiter.queued,
+            "max_in_flight": limiter.max_in_flight,
+            "max_queue": limiter.max_queue,
+            "clients_active": dict(limiter.per_client_active),
+            "requests": {f"{endpoint}:{status}": n for (endpoint, status), n in metrics.requests.items()},
+            "rejected": dict(metrics.rejected),
+            "latency_seconds": latency,
+            "tokens_total": metrics.tokens_total,
+            "tokens_per_second": metrics.tokens_per_second(),
+            "llm_queue_depth": get_scheduler().queue_depth(),
+            "llm_models": get_scheduler().stats(),
+        })
+
+    async def healthz(request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app["metrics"] = metrics
+    app["limiter"] = limiter
+    app.router.add_post("/invoke", invoke)
+    app.router.add_post("/stream", stream)
+    app.router.add_post("/batch", batch)
+    app.router.add_get("/metrics", metrics_view)
+    app.router.add_get("/healthz", healthz)
+    return app
+
+
+def serve(graph, build_state, host: str = "127.0.0.1", port: int = 8080, **options) -> None:
+    """Run the service until interrupted."""
+    print(f"🌐 Serving the workflow on http://{host}:{port} "
+          f"(POST /invoke, /stream, /batch; GET /metrics)")
+    web.run_app(create_app(graph, build_state, **options), host=host, port=port, print=None)
@@ -0,0 +1,47 @@
+"""
+Stats - Small Helpers for Latency Reporting
+============================================
+
+Percentiles and summaries shared by the batch runner, benchmarks and services.
+Pure Python so it can be imported anywhere without extra dependencies.
+"""
+
+import math
+from typing import Dict, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the `pct` percentile (0-100) of `values` using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[int(rank)]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(values: Sequence[float]) -> Dict[str, float]:
+    """Summarize latencies (seconds) as count/mean/p50/p95/p99/max."""
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def format_latency_summary(summary: Dict[str, float]) -> str:
+    """One-line, human friendly rendering of `latency_summary` (in ms)."""
+    return (
+        f"p50={summary['p50'] * 1000:.1f}ms "
+        f"p95={summary['p95'] * 1000:.1f}ms "
+        f"p99={summary['p99'] * 1000:.1f}ms "
+        f"max={summary['max'] * 1000:.1f}ms"
+    )
@@ -0,0 +1,136 @@
+"""
+Streaming - Forward Agent Tokens as They Arrive
+================================================
+
+Instead of waiting for `graph.invoke` to return, drive the compiled graph with
+`astream_events` and forward every model token the moment it is generated,
+labelled with the graph node that produced it. The full final state is still
+returned, together with time-to-first-token (TTFT) for each node.
+
+    report = stream_tokens(graph, initial_state)   # prints tokens live
+    report.final_state["messages"]
+    report.print_ttft()
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+NODE_TAG_PREFIX = "graph:step:"
+
+TokenCallback = Callable[[str, str], None]  # (node name, token text)
+
+
+@dataclass
+class StreamReport:
+    """What a streamed run produced and how quickly each node started talking."""
+    final_state: Dict[str, Any] = field(default_factory=dict)
+    ttft: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    tokens: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    total_time: float = 0.0
+
+    def print_ttft(self) -> None:
+        print("⚡ Time to first token per node:")
+        if not self.ttft:
+            print("   (no tokens streamed)")
+        for node, values in self.ttft.items():
+            shown = ", ".join(f"{v * 1000:.0f}ms" for v in values)
+            print(f"   {node:<12} {shown}  ({self.tokens[node]} chunks)")
+        print(f"   total run: {self.total_time * 1000:.0f}ms")
+
+
+class ConsolePrinter:
+    """Default token callback: print tokens inline with a header per node."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.current = None
+
+    def __call__(self, node: str, token: str) -> None:
+        if node != self.current:
+            self.stream.write(f"\n   💬 [{node}] ")
+            self.current = node
+        self.stream.write(token)
+        self.stream.flush()
+
+
+def _token_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    # Content blocks (e.g. Anthropic): join the text parts
+    return "".join(b.get("text", "") for b in content if isinstance(b, dict))
+
+
+async def astream_tokens(
+    graph,
+    initial_state: Dict[str, Any],
+    config: Optional[Dict[str, Any]] = None,
+    on_token: Optional[TokenCallback] = None,
+) -> StreamReport:
+    """Run `graph`, forwarding model tokens to `on_token(node, text)` as they arrive."""
+    on_token = on_token or ConsolePrinter()
+    report = StreamReport()
+    node_started: Dict[str, float] = {}  # node run id -> start time
+    active: Dict[str, Optional[float]] = {}  # node name -> start of the activation awaiting its first token
+
+    started = time.perf_counter()
+    async for event in graph.astream_events(initial_state, config=config, version="v2"):
+        kind = event["event"]
+        node = event.get("metadata", {}).get("langgraph_node")
+
+        if kind == "on_chain_start" and any(t.startswith(NODE_TAG_PREFIX) for t in event.get("tags", ())):
+            node_started[event["run_id"]] = time.perf_counter()
+            active[event["name"]] = node_started[event["run_id"]]
+
+        elif kind == "on_chat_model_stream" and node:
+            chunk = event["data"]["chunk"]
+            text = _token_text(chunk)
+            if not text and not getattr(chunk, "tool_call_chunks", None):
+                continue
+            # A tool call is the node's first output too, so it counts for TTFT
+            if active.get(node) is not None:
+                report.ttft[node].append(time.perf_counter() - active[node])
+                active[node] = None
+            report.tokens[node] += 1
+            if text:
+                on_token(node, text)
+
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # The root graph run finished: its output is the final state
+            report.final_state = event["data"].get("output") or {}
+
+    report.total_time = time.perf_counter() - started
+    return report
+
+
+def stream_tokens(graph, initial_state, config=None, on_token=None) -> StreamReport:
+    """Synchronous wrapper around `astream_tokens`.
+
+    Works both from scripts and from inside an already running event loop
+    (e.g. a Jupyter cell), where it runs the stream on a helper thread.
+    """
+    coro = astream_tokens(graph, initial_state, config=config, on_token=on_token)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: Dict[str, Any] = {}
+
+    def run() -> None:
+        try:
+            result["report"] = asyncio.run(coro)
+        except BaseException as e:  # Re-raised in the caller's thread
+            result["error"] = e
+
+    thread = threading.Thread(target=run, name="stream_tokens")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["report"]
@@ -0,0 +1,273 @@
+"""
+Stub Server - Local OpenAI-Compatible Chat Completions
+=======================================================
+
+Load tests against `FakeChatModel` skip everything between the graph and the
+provider: the HTTP client, connection pooling, retries, JSON serialization
+and SSE parsing. This aiohttp app speaks enough of the OpenAI API for
+`ChatOpenAI` to run unchanged against it:
+
+- `POST /v1/chat/completions`: plain and `stream=true` (SSE) replies, with
+  tool calls when the request binds tools. Replies come from `FakeChatModel`,
+  so they are deterministic and have realistic lengths and token usage
+- Latency: time to first token from a configurable distribution, then a
+  per-token generation delay
+- Error injection: a fraction of requests fail with 500 (after the latency
+  they would have taken)
+- Rate limits: requests beyond `rpm`, plus a random fraction, get 429 with
+  `Retry-After` and `x-ratelimit-*` headers, as the real API sends them
+- `GET /v1/models`, and `GET /stats` with request, error and 429 counts
+
+Usage:
+    serve_stub(port=8765, config=StubConfig.from_env())
+
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub \\
+    python python/examples/03_langgraph_real_multi_agent.py
+
+    STUB_LATENCY_MS=300 STUB_LATENCY_DISTRIBUTION=lognormal STUB_LATENCY_SPREAD=0.5
+    STUB_TOKENS_PER_SECOND=80 STUB_COMPLETION_TOKENS=60
+    STUB_ERROR_RATE=0.01 STUB_RATE_LIMIT_RATE=0.02 STUB_RPM=600
+
+aiohttp is imported only by this module and `agents.service`.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from .fake_llm import FakeChatModel
+from .scheduler import TokenBucket
+
+
+@dataclass
+class StubConfig:
+    """How the stub behaves. Rates are fractions of requests (0-1)."""
+    latency_ms: float = 300.0  # Time to first token (median for lognormal)
+    latency_distribution: str = "constant"  # constant, uniform, normal or lognormal
+    latency_spread: float = 0.0
+    tokens_per_second: float = 0.0  # Generation speed after the first token (0 = instant)
+    completion_tokens: int = 60
+    error_rate: float = 0.0  # Answered with 500
+    rate_limit_rate: float = 0.0  # Answered with 429 at random
+    rpm: float = 0.0  # Requests per minute before 429s (0 = unlimited)
+    seed: int = 0  # For the injected errors
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "StubConfig":
+        """Build a config from STUB_* environment variables (e.g. STUB_LATENCY_MS)."""
+        values = {}
+        for f in fields(cls):
+            var = f"STUB_{f.name.upper()}"
+            if f.name in overrides:
+                values[f.name] = overrides[f.name]
+            elif os.getenv(var):
+                values[f.name] = type(f.default)(os.environ[var])
+        return cls(**values)
+
+
+def to_messages(payload: List[Dict[str, Any]]) -> List[BaseMessage]:
+    """Turn OpenAI-format request messages into LangChain messages."""
+    messages: List[BaseMessage] = []
+    for item in payload:
+        content = item.get("content") or ""
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        role = item.get("role")
+        if role == "tool":
+            messages.append(ToolMessage(content=content, tool_call_id=item.get("tool_call_id", "")))
+        elif role == "assistant":
+            messages.append(AIMessage(content=content))
+        elif role in ("system", "developer"):
+            messages.append(SystemMessage(content=content))
+        else:
+            messages.append(HumanMessage(content=content))
+    return messages
+
+
+def _tool_calls(reply: AIMessage) -> List[Dict[str, Any]]:
+    return [
+        {"index": i, "id": call["id"], "type": "function",
+         "function": {"name": call["name"], "arguments": json.dumps(call["args"])}}
+        for i, call in enumerate(reply.tool_calls)
+    ]
+
+
+def _usage(reply: AIMessage) -> Dict[str, int]:
+    usage = reply.usage_metadata or {}
+    return {
+        "prompt_tokens": usage.get("input_tokens", 0),
+        "completion_tokens": usage.get("output_tokens", 0),
+        "total_tokens": usage.get("total_tokens", 0),
+    }
+
+
+def _error(status: int, message: str, kind: str, code: Optional[str] = None, headers=None) -> web.Response:
+    body = {"error": {"message": message, "type": kind, "param": None, "code": code}}
+    return web.json_response(body, status=status, headers=headers)
+
+
+def create_stub_app(config: Optional[StubConfig] = None) -> web.Application:
+    """Build the aiohttp app serving OpenAI-style chat completions."""
+    config = config or StubConfig.from_env()
+    counts: Counter = Counter()
+    models: Dict[tuple, FakeChatModel] = {}
+    rng = random.Random(config.seed)
+    bucket = TokenBucket(config.rpm) if config.rpm else None
+    state = {"in_flight": 0, "peak_in_flight": 0}
+
+    def model_for(name: str, seed: int) -> FakeChatModel:
+        key = (name, seed)
+        if key not in models:
+            models[key] = FakeChatModel(
+                model=name, seed=seed, latency_ms=config.latency_ms,
+                latency_distribution=config.latency_distribution, latency_spread=config.latency_spread,
+                tokens_per_second=config.tokens_per_second, completion_tokens=config.completion_tokens,
+            )
+        return models[key]
+
+    def rate_limit_headers(now: float) -> Dict[str, str]:
+        if bucket is None:
+            return {}
+        reset = bucket.wait_time(bucket.capacity, now)
+        return {
+            "x-ratelimit-limit-requests": str(int(config.rpm)),
+            "x-ratelimit-remaining-requests": str(max(0, int(bucket.level))),
+            "x-ratelimit-reset-requests": f"{reset:.3f}s",
+        }
+
+    def throttle(now: float) -> Optional[float]:
+        """Seconds the caller should wait when this request is rate limited, else None."""
+        if bucket is not None:
+            wait = bucket.wait_time(1, now)
+            if wait > 0:
+                return wait
+            bucket.consume(1)
+        if config.rate_limit_rate and rng.random() < config.rate_limit_rate:
+            return 1.0
+        return None
+
+    def chunk(base: Dict[str, Any], delta: Dict[str, Any], finish_reason: Optional[str] = None) -> bytes:
+        body = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason,
+                                     "logprobs": None}]}
+        return f"data: {json.dumps(body)}\n\n".encode()
+
+    async def stream_reply(request: web.Request, model: FakeChatModel, reply: AIMessage,
+                           base: Dict[str, Any], include_usage: bool, headers: Dict[str, str]):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream",
+                                               "Cache-Control": "no-cache", **headers})
+        await response.prepare(request)
+        token_delay = 1.0 / model.tokens_per_second if model.tokens_per_second > 0 else 0.0
+        await response.write(chunk(base, {"role": "assistant", "content": ""}))
+        if reply.tool_calls:
+            await response.write(chunk(base, {"tool_calls": _tool_calls(reply)}))
+        else:
+            words = reply.content.split(" ")
+            for i, word in enumerate(words):
+                if i and token_delay:
+                    await asyncio.sleep(token_delay)
+                await response.write(chunk(base, {"content": word if i == len(words) - 1 else word + " "}))
+        await response.write(chunk(base, {}, reply.response_metadata["finish_reason"]))
+        if include_usage:
+            usage = {**base, "choices": [], "usage": _usage(reply)}
+            await response.write(f"data: {json.dumps(usage)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def completions(request: web.Request) -> web.StreamResponse:
+        counts["requests"] += 1
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            counts["bad_requests"] += 1
+            return _error(400, "Request body must be JSON", "invalid_request_error")
+        if not isinstance(body, dict) or not isinstance(body.get("messages"), list) or not body["messages"]:
+            counts["bad_requests"] += 1
+            return _error(400, "'messages' must be a non-empty list", "invalid_request_error")
+
+        now = time.monotonic()
+        wait = throttle(now)
+        if wait is not None:
+            counts["rate_limited"] += 1
+            return _error(429, f"Rate limit reached for requests. Please try again in {wait:.3f}s.",
+                          "requests", "rate_limit_exceeded",
+                          headers={"Retry-After": str(max(1, math.ceil(wait))),
+                                   "retry-after-ms": str(int(wait * 1000)), **rate_limit_headers(now)})
+
+        model = model_for(str(body.get("model", "gpt-4o-mini")), int(body.get("seed") or 42))
+        reply = model.respond(to_messages(body["messages"]), body.get("tools"))
+        stream = bool(body.get("stream"))
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "created": int(time.time()), "model": model.model,
+                "object": "chat.completion.chunk" if stream else "chat.completion"}
+
+        state["in_flight"] += 1
+        state["peak_in_flight"] = max(state["peak_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(model.sample_latency())
+            if config.error_rate and rng.random() < config.error_rate:
+                counts["server_errors"] += 1
+                return _error(500, "The server had an error while processing your request.", "server_error")
+
+            headers = rate_limit_headers(time.monotonic())
+            counts["completion_tokens"] += _usage(reply)["completion_tokens"]
+            if stream:
+                counts["streamed"] += 1
+                include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+                try:
+                    return await stream_reply(request, model, reply, base, include_usage, headers)
+                except ConnectionResetError:
+                    counts["disconnected"] += 1  # The client went away mid-stream
+                    raise
+
+            completion = _usage(reply)["completion_tokens"]
+            if model.tokens_per_second > 0:
+                await asyncio.sleep(completion / model.tokens_per_second)
+            message: Dict[str, Any] = {"role": "assistant", "content": reply.content or None, "refusal": None}
+            if reply.tool_calls:
+                message["tool_calls"] = [{k: v for k, v in call.items() if k != "index"}
+                                         for call in _tool_calls(reply)]
+            counts["completed"] += 1
+            return web.json_response({
+                **base,
+                "choices": [{"index": 0, "message": message, "logprobs": None,
+                             "finish_reason": reply.response_metadata["finish_reason"]}],
+                "usage": _usage(reply),
+            }, headers=headers)
+        finally:
+            state["in_flight"] -= 1
+
+    async def list_models(request: web.Request) -> web.Response:
+        names = sorted({name for name, _ in models} | {"gpt-4o-mini"})
+        return web.json_response({"object": "list", "data": [
+            {"id": name, "object": "model", "created": 0, "owned_by": "stub"} for name in names
+        ]})
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response({**counts, **state})
+
+    app = web.Application()
+    app["counts"] = counts
+    app.router.add_post("/v1/chat/completions", completions)
+    app.router.add_get("/v1/models", list_models)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def serve_stub(host: str = "127.0.0.1", port: int = 8765, config: Optional[StubConfig] = None) -> None:
+    """Run the stub until interrupted."""
+    config = config or StubConfig.from_env()
+    print(f"🧪 OpenAI-compatible stub on http://{host}:{port}/v1 "
+          f"(latency {config.latency_ms:.0f}ms {config.latency_distribution}, "
+          f"errors {config.error_rate:.1%}, 429s {config.rate_limit_rate:.1%}, "
+          f"rpm {config.rpm or 'unlimited'})", flush=True)
+    web.run_app(create_stub_app(config), host=host, port=port, print=None)
@@ -0,0 +1,46 @@
+"""
+Tokens - Cheap, Dependency-Free Token Estimates
+================================================
+
+A rough "4 characters per token" estimate is good enough for budgeting,
+scheduling and cost estimates without pulling in a tokenizer.
+"""
+
+import json
+from typing import Any, Sequence
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4  # Role markers and separators per chat message
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in `text`."""
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    # Multimodal content: a list of strings and/or {"type": "text", "text": ...} blocks
+    parts = []
+    for block in content or []:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict):
+            parts.append(str(block.get("text", "")))
+    return "".join(parts)
+
+
+def estimate_message_tokens(message: Any) -> int:
+    """Estimate tokens for one chat message, including any tool calls it makes."""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(_content_text(getattr(message, "content", message)))
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(call.get("name", "")) + estimate_tokens(json.dumps(call.get("args", {})))
+    return tokens
+
+
+def estimate_messages_tokens(messages: Sequence[Any]) -> int:
+    """Estimate the prompt size of a list of chat messages."""
+    return sum(estimate_message_tokens(m) for m in messages)
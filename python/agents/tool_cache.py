@@ -0,0 +1,321 @@
+"""
+Tool Cache - TTL Memoization for Expensive Tools
+=================================================
+
+Search, retrieval and scoring tools are slow and often called again with the
+same arguments by different workflows. `ToolCache` memoizes tool results:
+
+- Keys are the tool name plus its arguments, normalized (sorted keys,
+  whitespace collapsed) so trivially different calls still hit
+- Each tool has its own TTL; entries live in an in-memory LRU and, when a
+  `disk_path` is set, in a SQLite tier shared across processes and restarts
+- Concurrent identical calls are merged: one caller runs the tool, the others
+  wait for its result (in threads and on the event loop alike)
+- Hits, misses and merged calls are counted per tool
+
+Layer it on top of `@tool`:
+
+    tool_cache = ToolCache(disk_path="python/.cache/tool_cache.sqlite")
+
+    @cached_tool(ttl_seconds=3600, cache=tool_cache)
+    @tool
+    def research_tool(query: str) -> str:
+        ...
+
+    TOOL_CACHE_PATH=python/.cache/tool_cache.sqlite   # disk tier for get_tool_cache()
+    TOOL_CACHE_MAX_ENTRIES=1024
+
+Errors are never cached: every waiter sees the exception and the next call
+tries again. Cancellation is never shared: an async call keeps running for
+the callers merged into it when the one that started it is cancelled, and
+if a tool run is interrupted anyway, a waiting caller takes over.
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from langchain_core.tools import BaseTool
+
+_WHITESPACE = re.compile(r"\s+")
+_MISSING = object()
+_ABANDONED = object()  # Set on an in-flight future whose run was interrupted
+
+
+def _normalize_args(value: Any) -> Any:
+    """Canonical form of tool arguments: trimmed strings, sorted mappings."""
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize_args(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_args(v) for v in value]
+    return value
+
+
+def make_key(tool_name: str, args: Dict[str, Any]) -> str:
+    """Stable cache key for one tool call."""
+    payload = json.dumps([tool_name, _normalize_args(args)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ToolCache:
+    """In-memory LRU of tool results with an optional SQLite tier."""
+
+    def __init__(self, max_entries: int = 1024, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        # key -> (tool name, expiry time or None, value)
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float], Any]]" = OrderedDict()
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()  # Running `acall` tool tasks (kept referenced until done)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Counter] = defaultdict(Counter)
+        self._conn = None
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache ("
+                " key TEXT PRIMARY KEY, tool TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def _lookup(self, tool_name: str, key: str) -> Any:
+        """Return the cached value or `_MISSING` (caller holds the lock)."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            _, expires_at, value = entry
+            if expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                self._counts[tool_name]["hits"] += 1
+                return value
+            del self._memory[key]
+
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, expires_at = json.loads(row[0]), row[1]
+                if expires_at is None or expires_at > now:
+                    self._remember(tool_name, key, expires_at, value)
+                    self._counts[tool_name]["disk_hits"] += 1
+                    return value
+                self._conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+        return _MISSING
+
+    def _remember(self, tool_name: str, key: str, expires_at: Optional[float], value: Any) -> None:
+        self._memory[key] = (tool_name, expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, tool_name: str, key: str, value: Any, ttl_seconds: Optional[float]) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds is not None else None
+        with self._lock:
+            self._remember(tool_name, key, expires_at, value)
+            if self._conn is not None:
+                try:
+                    encoded = json.dumps(value)
+                except (TypeError, ValueError):
+                    return  # Not JSON-serializable: keep it in memory only
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?, ?)",
+                    (key, tool_name, encoded, expires_at),
+                )
+
+    def _claim(self, tool_name: str, key: str) -> Tuple[Any, Optional[concurrent.futures.Future], bool]:
+        """Return (cached value, in-flight future, whether this caller must run the tool)."""
+        with self._lock:
+            value = self._lookup(tool_name, key)
+            if value is not _MISSING:
+                return value, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counts[tool_name]["merged"] += 1
+                return _MISSING, future, False
+            self._counts[tool_name]["misses"] += 1
+            future = concurrent.futures.Future()
+            # A running future cannot be cancelled, so a cancelled waiter never cancels it for the others
+            future.set_running_or_notify_cancel()
+            self._inflight[key] = future
+            return _MISSING, future, True
+
+    def _settle(self, tool_name: str, key: str, future: concurrent.futures.Future,
+                ttl_seconds: Optional[float], value: Any = _MISSING, error: Exception = None) -> None:
+        if error is None:
+            self._store(tool_name, key, value, ttl_seconds)
+        with self._lock:
+            self._inflight.pop(key, None)
+            if error is not None:
+                self._counts[tool_name]["errors"] += 1
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+    def _abandon(self, key: str, future: concurrent.futures.Future) -> None:
+        """Release a run that was interrupted (cancelled, KeyboardInterrupt); waiters retry."""
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(_ABANDONED)
+
+    async def _arun(self, tool_name: str, key: str, future: concurrent.futures.Future,
+                    afn: Callable[[], Any], ttl_seconds: Optional[float]) -> None:
+        try:
+            value = await afn()
+        except Exception as e:
+            self._settle(tool_name, key, future, ttl_seconds, error=e)
+            return
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._settle(tool_name, key, future, ttl_seconds, value)
+
+    # ------------------------------------------------------------------
+    # Memoized calls
+    # ------------------------------------------------------------------
+    def call(self, tool_name: str, args: Dict[str, Any], fn: Callable[[], Any],
+             ttl_seconds: Optional[float] = None) -> Any:
+        """Return the cached result for this call, running `fn()` on a miss."""
+        key = make_key(tool_name, args)
+        while True:
+            value, future, leader = self._claim(tool_name, key)
+            if value is not _MISSING:
+                return value
+            if leader:
+                break
+            value = future.result()
+            if value is not _ABANDONED:
+                return value
+        try:
+            value = fn()
+        except Exception as e:
+            self._settle(tool_name, key, future, ttl_seconds, error=e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._settle(tool_name, key, future, ttl_seconds, value)
+        return value
+
+    async def acall(self, tool_name: str, args: Dict[str, Any], afn: Callable[[], Any],
+                    ttl_seconds: Optional[float] = None) -> Any:
+        """Async version of `call`; `afn()` returns an awaitable.
+
+        The tool runs in its own task, so cancelling the caller that started
+        it does not cancel it for the callers merged into it.
+        """
+        key = make_key(tool_name, args)
+        while True:
+            value, future, leader = self._claim(tool_name, key)
+            if value is not _MISSING:
+                return value
+            if leader:
+                task = asyncio.ensure_future(self._arun(tool_name, key, future, afn, ttl_seconds))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            value = await asyncio.wrap_future(future)
+            if value is not _ABANDONED:
+                return value
+            if leader:
+                raise asyncio.CancelledError()
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        """Drop cached results (for one tool, or all of them)."""
+        with self._lock:
+            if tool_name is None:
+                self._memory.clear()
+                if self._conn is not None:
+                    self._conn.execute("DELETE FROM tool_cache")
+                return
+            for key in [k for k, entry in self._memory.items() if entry[0] == tool_name]:
+                del self._memory[key]
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM tool_cache WHERE tool = ?", (tool_name,))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-tool counters plus hit rate (memory and disk hits over all lookups)."""
+        with self._lock:
+            report = {}
+            for tool_name, counts in self._counts.items():
+                hits = counts["hits"] + counts["disk_hits"] + counts["merged"]
+                lookups = hits + counts["misses"]
+                report[tool_name] = {
+                    "hits": counts["hits"],
+                    "disk_hits": counts["disk_hits"],
+                    "merged": counts["merged"],
+                    "misses": counts["misses"],
+                    "errors": counts["errors"],
+                    "hit_rate": hits / lookups if lookups else 0.0,
+                }
+            return report
+
+    def print_stats(self) -> None:
+        """Print one line of hit-rate statistics per tool."""
+        for tool_name, s in sorted(self.stats().items()):
+            print(f"   {tool_name:<16} {s['hit_rate']:>6.1%} hit rate "
+                  f"({s['hits']} memory, {s['disk_hits']} disk, {s['merged']} merged, {s['misses']} misses)")
+
+
+def get_tool_cache() -> ToolCache:
+    """Return a cache configured by TOOL_CACHE_* env vars (memory-only by default)."""
+    max_entries = os.getenv("TOOL_CACHE_MAX_ENTRIES")
+    return ToolCache(
+        max_entries=int(max_entries) if max_entries else 1024,
+        disk_path=os.getenv("TOOL_CACHE_PATH") or None,
+    )
+
+
+def cached_tool(ttl_seconds: Optional[float] = None, cache: Optional[ToolCache] = None):
+    """Decorator that memoizes a LangChain tool's results in `cache`.
+
+    Apply it above `@tool`. The returned tool keeps the original name,
+    description and argument schema, so models see no difference.
+    """
+    def decorate(base: BaseTool) -> BaseTool:
+        store = cache if cache is not None else _default_cache()
+        func, coroutine = getattr(base, "func", None), getattr(base, "coroutine", None)
+        if func is None and coroutine is None:
+            raise TypeError(f"cached_tool needs a function-based tool, got {type(base).__name__}")
+
+        def run(**kwargs):
+            if func is None:
+                return store.call(base.name, kwargs, lambda: asyncio.run(coroutine(**kwargs)), ttl_seconds)
+            return store.call(base.name, kwargs, lambda: func(**kwargs), ttl_seconds)
+
+        async def arun(**kwargs):
+            if coroutine is None:
+                return await store.acall(base.name, kwargs,
+                                         lambda: asyncio.to_thread(func, **kwargs), ttl_seconds)
+            return await store.acall(base.name, kwargs, lambda: coroutine(**kwargs), ttl_seconds)
+
+        return base.model_copy(update={"func": run, "coroutine": arun})
+
+    return decorate
+
+
+_shared_cache: Optional[ToolCache] = None
+_shared_lock = threading.Lock()
+
+
+def _default_cache() -> ToolCache:
+    """The process-wide cache used when `cached_tool` is not given one."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = get_tool_cache()
+        return _shared_cache
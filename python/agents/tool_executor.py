@@ -0,0 +1,159 @@
+"""
+Tool Executor - Run a Turn's Tool Calls Concurrently
+=====================================================
+
+When a model asks for several tools in one `AIMessage`, `ConcurrentToolNode`
+dispatches them all at once, so a turn with N slow I/O-bound calls takes about
+as long as the slowest call rather than the sum of all of them:
+
+- Sync tools run on a bounded, shared thread pool
+- Async tools (`@tool async def ...`) are awaited natively on `ainvoke`
+- Each tool can have its own timeout and concurrency limit
+- Failures and timeouts come back as error `ToolMessage`s, so the model can
+  react instead of the whole graph failing
+
+It is a drop-in replacement for LangGraph's `ToolNode` in a `StateGraph`:
+
+    workflow.add_node("tools", ConcurrentToolNode(tools, max_workers=8, timeout=30))
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+
+class ConcurrentToolNode(RunnableLambda):
+    """Graph node that executes every tool call in the last AIMessage concurrently."""
+
+    def __init__(
+        self,
+        tools: Sequence[Any],
+        max_workers: int = 8,
+        timeout: Optional[float] = None,
+        tool_timeouts: Optional[Dict[str, float]] = None,
+        tool_concurrency: Optional[Dict[str, int]] = None,
+        name: str = "tools",
+    ):
+        self.tools_by_name = {t.name: t for t in tools}
+        self.timeout = timeout
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.tool_concurrency = dict(tool_concurrency or {})
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._thread_limits = {
+            tool: threading.BoundedSemaphore(limit) for tool, limit in self.tool_concurrency.items()
+        }
+        # asyncio primitives belong to one event loop, so keep a set per loop
+        self._async_limits: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        super().__init__(self._run, afunc=self._arun, name=name)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _tool_calls(state: Any) -> List[Dict[str, Any]]:
+        messages = state["messages"] if isinstance(state, dict) else state
+        last = messages[-1] if messages else None
+        if not isinstance(last, AIMessage):
+            raise ValueError("ConcurrentToolNode expects the last message to be an AIMessage")
+        return list(last.tool_calls)
+
+    def _timeout_for(self, name: str) -> Optional[float]:
+        return self.tool_timeouts.get(name, self.timeout)
+
+    @staticmethod
+    def _error(call: Dict[str, Any], message: str) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {message}", name=call["name"], tool_call_id=call["id"], status="error"
+        )
+
+    @staticmethod
+    def _as_tool_call(call: Dict[str, Any]) -> Dict[str, Any]:
+        # Invoking a tool with a full ToolCall makes it return a ToolMessage
+        return {"name": call["name"], "args": call["args"], "id": call["id"], "type": "tool_call"}
+
+    def _async_limit(self, name: str) -> Optional[asyncio.Semaphore]:
+        if name not in self.tool_concurrency:
+            return None
+        limits = self._async_limits.setdefault(asyncio.get_running_loop(), {})
+        if name not in limits:
+            limits[name] = asyncio.Semaphore(self.tool_concurrency[name])
+        return limits[name]
+
+    # ------------------------------------------------------------------
+    # Sync path: bounded thread pool
+    # ------------------------------------------------------------------
+    def _invoke_sync(self, tool: Any, call: Dict[str, Any], config: RunnableConfig) -> ToolMessage:
+        limit = self._thread_limits.get(call["name"])
+        if limit is None:
+            return self._call_tool(tool, call, config)
+        with limit:
+            return self._call_tool(tool, call, config)
+
+    def _call_tool(self, tool: Any, call: Dict[str, Any], config: RunnableConfig) -> ToolMessage:
+        if getattr(tool, "func", None) is None and getattr(tool, "coroutine", None) is not None:
+            # Async-only tool on the sync path: run it on this worker thread's own loop
+            return asyncio.run(tool.ainvoke(self._as_tool_call(call), config))
+        return tool.invoke(self._as_tool_call(call), config)
+
+    def _run(self, state: Any, config: RunnableConfig) -> Dict[str, List[ToolMessage]]:
+        calls = self._tool_calls(state)
+        started = time.monotonic()
+        futures = {}
+        for call in calls:
+            tool = self.tools_by_name.get(call["name"])
+            if tool is not None:
+                futures[call["id"]] = self._executor.submit(self._invoke_sync, tool, call, config)
+
+        messages = []
+        for call in calls:
+            future = futures.get(call["id"])
+            if future is None:
+                messages.append(self._error(call, f"unknown tool '{call['name']}'"))
+                continue
+            # Timeouts count from dispatch, not from when we got round to waiting
+            timeout = self._timeout_for(call["name"])
+            remaining = None if timeout is None else max(0.0, started + timeout - time.monotonic())
+            try:
+                messages.append(future.result(timeout=remaining))
+            except FutureTimeout:
+                future.cancel()
+                messages.append(self._error(call, f"'{call['name']}' timed out"))
+            except Exception as e:
+                messages.append(self._error(call, f"{type(e).__name__}: {e}"))
+        return {"messages": messages}
+
+    # ------------------------------------------------------------------
+    # Async path: native coroutines, sync tools on the same pool
+    # ------------------------------------------------------------------
+    async def _ainvoke_one(self, call: Dict[str, Any], config: RunnableConfig) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._error(call, f"unknown tool '{call['name']}'")
+
+        async def execute() -> ToolMessage:
+            if getattr(tool, "coroutine", None) is not None:
+                return await tool.ainvoke(self._as_tool_call(call), config)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._invoke_sync, tool, call, config)
+
+        limit = self._async_limit(call["name"])
+        try:
+            if limit is None:
+                return await asyncio.wait_for(execute(), self._timeout_for(call["name"]))
+            async with limit:
+                return await asyncio.wait_for(execute(), self._timeout_for(call["name"]))
+        except asyncio.TimeoutError:
+            return self._error(call, f"'{call['name']}' timed out")
+        except Exception as e:
+            return self._error(call, f"{type(e).__name__}: {e}")
+
+    async def _arun(self, state: Any, config: RunnableConfig) -> Dict[str, List[ToolMessage]]:
+        calls = self._tool_calls(state)
+        messages = await asyncio.gather(*(self._ainvoke_one(call, config) for call in calls))
+        return {"messages": list(messages)}
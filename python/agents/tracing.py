@@ -0,0 +1,273 @@
+"""
+Tracing - Per-Node Latency, Token and Cost Instrumentation
+===========================================================
+
+`Tracer` is a LangChain callback handler, so one instance instruments every
+graph node, model call and tool in a run without changing the node code:
+
+    tracer = Tracer(export_path="python/visualizations/traces.jsonl")
+    graph.invoke(state, config={"callbacks": [tracer]})
+    tracer.print_summary()
+
+For each span it records wall time, queue time (for a node: time since the
+previous node finished; for a model call: time spent in the node before the
+call started), prompt/completion tokens, estimated cost, retries and errors.
+Spans are written as JSON lines using OpenTelemetry field names
+(`trace_id`, `span_id`, `start_time_unix_nano`, `gen_ai.usage.*` attributes),
+buffered per run and flushed once when the run finishes. The handler runs
+inline and only does dictionary bookkeeping, so it is cheap enough to leave on.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .pricing import estimate_cost
+
+NODE_TAG_PREFIX = "graph:step:"
+
+
+@dataclass
+class Span:
+    """One timed unit of work: a workflow run, graph node, model call or tool call."""
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    name: str
+    kind: str  # "workflow", "node", "llm" or "tool"
+    start_ns: int
+    started: float  # perf_counter at start
+    duration: float = 0.0
+    queue_time: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    parent: Optional["Span"] = field(default=None, repr=False)
+
+    def to_otel(self) -> Dict[str, Any]:
+        """Render in OpenTelemetry's JSON span shape."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": "SPAN_KIND_CLIENT" if self.kind in ("llm", "tool") else "SPAN_KIND_INTERNAL",
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.start_ns + int(self.duration * 1e9),
+            "attributes": {"span.type": self.kind, "queue_time_s": self.queue_time, **self.attributes},
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error
+            else {"code": "STATUS_CODE_OK"},
+        }
+
+
+class Tracer(BaseCallbackHandler):
+    """Callback handler that turns graph runs into spans and per-run summaries."""
+
+    # Run in the caller's thread/event loop instead of a thread pool
+    run_inline = True
+
+    def __init__(self, export_path: Optional[str] = None, keep_runs: int = 100):
+        self.export_path = export_path
+        self.keep_runs = keep_runs
+        self.runs: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self.last_trace_id: Optional[str] = None
+        self._open: Dict[UUID, Span] = {}
+        self._owner: Dict[UUID, Optional[UUID]] = {}  # run id -> nearest traced ancestor
+        self._finished: Dict[str, List[Span]] = defaultdict(list)
+        self._last_node_end: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Span bookkeeping
+    # ------------------------------------------------------------------
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, kind: str) -> Span:
+        parent = self._open.get(self._owner.get(parent_run_id)) if parent_run_id else None
+        span = Span(
+            trace_id=parent.trace_id if parent else run_id.hex,
+            span_id=f"{run_id.int & (2 ** 64 - 1):016x}",
+            parent_span_id=parent.span_id if parent else None,
+            name=name,
+            kind=kind,
+            start_ns=time.time_ns(),
+            started=time.perf_counter(),
+            parent=parent,
+        )
+        with self._lock:
+            self._open[run_id] = span
+            self._owner[run_id] = run_id
+        return span
+
+    def _passthrough(self, run_id: UUID, parent_run_id: Optional[UUID]) -> None:
+        # Untraced runs (e.g. routing functions) map to their nearest traced ancestor
+        self._owner[run_id] = self._owner.get(parent_run_id)
+
+    @staticmethod
+    def _node_of(span: Span) -> Optional[Span]:
+        return span.parent if span.parent is not None and span.parent.kind == "node" else None
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        with self._lock:
+            self._owner.pop(run_id, None)
+            span = self._open.pop(run_id, None)
+            if span is None:
+                return None
+            span.duration = time.perf_counter() - span.started
+            span.parent = None
+            if error is not None:
+                span.error = f"{type(error).__name__}: {error}"
+            self._finished[span.trace_id].append(span)
+            if span.kind == "node":
+                self._last_node_end[span.trace_id] = time.perf_counter()
+        if span.kind == "workflow":
+            self._finish_trace(span.trace_id)
+        return span
+
+    def _finish_trace(self, trace_id: str) -> None:
+        with self._lock:
+            spans = self._finished.pop(trace_id, [])
+            self._last_node_end.pop(trace_id, None)
+            self.runs[trace_id] = spans
+            self.last_trace_id = trace_id
+            while len(self.runs) > self.keep_runs:
+                self.runs.popitem(last=False)
+        if self.export_path and spans:
+            lines = "".join(json.dumps(s.to_otel(), default=str) + "\n" for s in spans)
+            os.makedirs(os.path.dirname(self.export_path) or ".", exist_ok=True)
+            with self._lock, open(self.export_path, "a") as f:
+                f.write(lines)
+
+    # ------------------------------------------------------------------
+    # Chains: the workflow itself and its nodes
+    # ------------------------------------------------------------------
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "chain")
+        if parent_run_id is None:
+            span = self._start(run_id, None, name, "workflow")
+            self._last_node_end[span.trace_id] = span.started
+        elif any(tag.startswith(NODE_TAG_PREFIX) for tag in tags or ()):
+            span = self._start(run_id, parent_run_id, name, "node")
+            span.queue_time = max(0.0, span.started - self._last_node_end.get(span.trace_id, span.started))
+        else:
+            self._passthrough(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    # ------------------------------------------------------------------
+    # Model calls
+    # ------------------------------------------------------------------
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        model = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name", "llm")
+        span = self._start(run_id, parent_run_id, f"llm:{model}", "llm")
+        span.attributes["gen_ai.request.model"] = model
+        node = self._node_of(span)
+        if node is not None:
+            span.queue_time = span.started - node.started
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self.on_chat_model_start(serialized, [], run_id=run_id, parent_run_id=parent_run_id,
+                                 metadata=metadata, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        span = self._open.get(run_id)
+        if span is not None:
+            self._record_usage(span, response)
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        span = self._open.get(self._owner.get(run_id))
+        if span is not None:
+            span.attributes["retries"] = span.attributes.get("retries", 0) + 1
+            node = self._node_of(span)
+            if node is not None:
+                node.attributes["retries"] = node.attributes.get("retries", 0) + 1
+
+    def _record_usage(self, span: Span, response) -> None:
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+        cost = estimate_cost(span.attributes.get("gen_ai.request.model"), input_tokens, output_tokens)
+        span.attributes.update({
+            "gen_ai.usage.input_tokens": input_tokens,
+            "gen_ai.usage.output_tokens": output_tokens,
+            "cost_usd": cost,
+        })
+        # Roll model usage up into the node that made the call
+        node = self._node_of(span)
+        if node is not None:
+            for key, value in (("gen_ai.usage.input_tokens", input_tokens),
+                               ("gen_ai.usage.output_tokens", output_tokens),
+                               ("cost_usd", cost)):
+                node.attributes[key] = node.attributes.get(key, 0) + value
+
+    # ------------------------------------------------------------------
+    # Tools
+    # ------------------------------------------------------------------
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._start(run_id, parent_run_id, f"tool:{name}", "tool")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def summary(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per node/tool totals for one run (defaults to the most recent)."""
+        spans = self.runs.get(trace_id or self.last_trace_id, [])
+        rows: Dict[str, Dict[str, Any]] = OrderedDict()
+        for span in sorted(spans, key=lambda s: s.start_ns):
+            if span.kind not in ("node", "tool", "workflow"):
+                continue
+            row = rows.setdefault(span.name, {
+                "name": span.name, "kind": span.kind, "calls": 0, "wall_s": 0.0, "queue_s": 0.0,
+                "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "retries": 0, "errors": 0,
+            })
+            row["calls"] += 1
+            row["wall_s"] += span.duration
+            row["queue_s"] += span.queue_time
+            row["retries"] += span.attributes.get("retries", 0)
+            row["errors"] += 1 if span.error else 0
+            if span.kind != "workflow":
+                row["input_tokens"] += span.attributes.get("gen_ai.usage.input_tokens", 0)
+                row["output_tokens"] += span.attributes.get("gen_ai.usage.output_tokens", 0)
+                row["cost_usd"] += span.attributes.get("cost_usd", 0.0)
+        # Put the workflow total last, with token and cost totals across nodes
+        total = next((r for r in rows.values() if r["kind"] == "workflow"), None)
+        if total is not None:
+            del rows[total["name"]]
+            for key in ("input_tokens", "output_tokens", "cost_usd"):
+                total[key] = sum(r[key] for r in rows.values() if r["kind"] == "node")
+            rows[total["name"]] = total
+        return list(rows.values())
+
+    def print_summary(self, trace_id: Optional[str] = None) -> None:
+        rows = self.summary(trace_id)
+        if not rows:
+            print("ℹ️  No traced runs yet")
+            return
+        print(f"{'span':<22}{'calls':>6}{'wall ms':>10}{'queue ms':>10}"
+              f"{'in tok':>8}{'out tok':>8}{'cost $':>10}{'retries':>8}")
+        for row in rows:
+            print(f"{row['name'][:21]:<22}{row['calls']:>6}{row['wall_s'] * 1000:>10.1f}"
+                  f"{row['queue_s'] * 1000:>10.1f}{row['input_tokens']:>8}{row['output_tokens']:>8}"
+                  f"{row['cost_usd']:>10.5f}{row['retries']:>8}")
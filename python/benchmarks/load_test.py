@@ -0,0 +1,346 @@
+"""
+Load Test: the 03 Workflow over HTTP against a Local OpenAI Stub
+=================================================================
+
+Drives the 03 multi-agent workflow at a target request rate with the real
+`ChatOpenAI` client (connection pool, retries, JSON and SSE parsing) talking
+to the OpenAI-compatible stub in `agents.stub_server`, so the client side of
+the stack is exercised without calling - or paying for - the real API:
+
+- Open-loop arrivals (constant or Poisson) at `--rps` for `--duration`
+  seconds: workflows start on schedule whether or not earlier ones have
+  finished, so an overloaded client shows up as latency instead of hiding it
+- Reports achieved throughput, latency percentiles, error rates by type, the
+  stub's view (HTTP requests, injected 500s and 429s - which the client
+  retries) and client resource use: CPU time, peak RSS, threads, open file
+  descriptors and event-loop lag
+
+The stub runs in a subprocess, so its CPU isn't counted as the client's,
+unless `--base-url` points at one that is already running.
+
+Usage:
+    python python/benchmarks/load_test.py --rps 5 --duration 30
+    python python/benchmarks/load_test.py --rps 20 --stub-error-rate 0.02 --stub-rpm 600
+    python python/benchmarks/load_test.py --mode pipelined --stub-tokens-per-second 80
+    python python/benchmarks/load_test.py --serve-stub --port 8765   # only run the stub
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter
+from datetime import datetime, timezone
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+# Make the shared `agents` package (python/agents) importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from agents.stats import format_latency_summary, latency_summary
+
+# Only OpenAI models: every call must go to the stub, never to another provider
+STUB_POOL = "openai:gpt-4.1-nano=fast,openai:gpt-4o-mini=standard,openai:gpt-4o=strong"
+# Load-test flag -> StubConfig field
+STUB_FLAGS = {
+    "stub_latency_ms": "latency_ms",
+    "stub_latency_distribution": "latency_distribution",
+    "stub_latency_spread": "latency_spread",
+    "stub_tokens_per_second": "tokens_per_second",
+    "stub_completion_tokens": "completion_tokens",
+    "stub_error_rate": "error_rate",
+    "stub_rate_limit_rate": "rate_limit_rate",
+    "stub_rpm": "rpm",
+}
+
+
+def stub_overrides(args) -> dict:
+    """StubConfig fields set on the command line (the rest come from STUB_* env vars)."""
+    return {field: getattr(args, flag) for flag, field in STUB_FLAGS.items() if getattr(args, flag) is not None}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_json(url: str, timeout: float = 2.0) -> dict:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def start_stub(args) -> tuple:
+    """Start the stub in a subprocess and wait until it answers; returns (process, base URL)."""
+    port = args.port or free_port()
+    command = [sys.executable, os.path.abspath(__file__), "--serve-stub", "--port", str(port)]
+    for flag in STUB_FLAGS:
+        value = getattr(args, flag)
+        if value is not None:
+            command += [f"--{flag.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}/v1"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Stub server exited with status {process.returncode}")
+        try:
+            get_json(f"{base_url}/models")
+            return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Stub server did not start within 15s")
+
+
+def stub_stats(base_url: str) -> Counter:
+    try:
+        return Counter(get_json(base_url.rsplit("/v1", 1)[0] + "/stats"))
+    except OSError:
+        return Counter()
+
+
+def open_fds() -> int:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return 0
+
+
+class ResourceSampler:
+    """Samples client threads, open file descriptors and event-loop lag while the load runs."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.loop_lag = []
+        self.peak_threads = threading.active_count()
+        self.peak_fds = open_fds()
+        self._usage = resource.getrusage(resource.RUSAGE_SELF) if resource else None
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.loop_lag.append(max(0.0, loop.time() - expected))
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_fds = max(self.peak_fds, open_fds())
+
+    def report(self, wall_time: float) -> dict:
+        lag = latency_summary(self.loop_lag)
+        report = {
+            "peak_threads": self.peak_threads,
+            "peak_open_fds": self.peak_fds,
+            "loop_lag_p95_ms": lag["p95"] * 1000,
+            "loop_lag_max_ms": lag["max"] * 1000,
+        }
+        if self._usage is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            cpu = (usage.ru_utime - self._usage.ru_utime) + (usage.ru_stime - self._usage.ru_stime)
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+            report.update({"cpu_seconds": cpu, "cpu_percent": cpu / wall_time * 100 if wall_time else 0.0,
+                           "peak_rss_mb": rss_mb})
+        return report
+
+
+async def run_load(graph, build_state, rps: float, duration: float, arrival: str = "constant",
+                   max_in_flight: int = 256, drain_timeout: float = 120.0) -> dict:
+    """Start workflows at `rps` for `duration` seconds (open loop) and collect the outcomes."""
+    latencies, failed_latencies = [], []
+    errors: Counter = Counter()
+    in_flight = set()
+    skipped = 0
+    rng = random.Random(0)
+    sampler = ResourceSampler()
+    sampling = asyncio.ensure_future(sampler.run())
+
+    async def one(index: int) -> None:
+        started = time.perf_counter()
+        try:
+            await graph.ainvoke(build_state({"id": str(index), "task": f"Summarize topic #{index}"}))
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            errors[type(e).__name__] += 1
+            failed_latencies.append(time.perf_counter() - started)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    offset, index = 0.0, 0  # Seconds after `started` when the next workflow is due
+    while offset < duration:
+        delay = started + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            skipped += 1
+        else:
+            task = asyncio.ensure_future(one(index))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        index += 1
+        offset = offset + rng.expovariate(rps) if arrival == "poisson" else index / rps
+
+    # Let the stragglers finish; whatever is still running after the drain timeout counts as timed out
+    timed_out = 0
+    if in_flight:
+        _, pending = await asyncio.wait(set(in_flight), timeout=drain_timeout)
+        timed_out = len(pending)
+        for task in pending:
+            task.cancel()
+    wall_time = loop.time() - started
+    sampling.cancel()
+
+    return {
+        "started": index - skipped,
+        "skipped": skipped,
+        "succeeded": len(latencies),
+        "failed": sum(errors.values()),
+        "timed_out": timed_out,
+        "errors": dict(errors),
+        "wall_time": wall_time,
+        "throughput": len(latencies) / wall_time if wall_time else 0.0,
+        "latency": latency_summary(latencies),
+        "failed_latency": latency_summary(failed_latencies),
+        "client": sampler.report(wall_time),
+    }
+
+
+def print_report(report: dict) -> None:
+    load, stub, client = report["load"], report["stub"], report["load"]["client"]
+    meta = report["meta"]
+    started = max(1, load["started"])
+    print(f"\n📈 Load test: 03 workflow ({meta['mode']}) against {meta['base_url']}")
+    print(f"   offered   {meta['rps']:.1f} workflows/s for {meta['duration']:.0f}s "
+          f"({load['started']} started, {load['skipped']} skipped at max in flight)")
+    print(f"   achieved  {load['throughput']:.2f} workflows/s ({load['succeeded']} ok, {load['failed']} failed, "
+          f"{load['timed_out']} timed out) in {load['wall_time']:.1f}s")
+    print(f"   latency   mean={load['latency']['mean'] * 1000:.0f}ms {format_latency_summary(load['latency'])}")
+    for name, count in sorted(load["errors"].items(), key=lambda item: -item[1]):
+        print(f"   error     {name}: {count} ({count / started:.1%} of workflows)")
+    requests = stub.get("requests", 0)
+    print(f"🧪 Stub: {requests} HTTP requests ({requests / started:.1f} per workflow), "
+          f"{stub.get('server_errors', 0)} x 500 and {stub.get('rate_limited', 0)} x 429 "
+          f"({(stub.get('server_errors', 0) + stub.get('rate_limited', 0)) / max(1, requests):.1%}, "
+          f"retried by the client), {stub.get('streamed', 0)} streamed, peak {stub.get('peak_in_flight', 0)} in flight")
+    line = "🖥️  Client: "
+    if "cpu_seconds" in client:
+        line += (f"CPU {client['cpu_seconds']:.1f}s ({client['cpu_percent']:.0f}% of a core), "
+                 f"peak RSS {client['peak_rss_mb']:.0f}MB, ")
+    line += (f"up to {client['peak_threads']} threads and {client['peak_open_fds']} open fds, "
+             f"event-loop lag p95 {client['loop_lag_p95_ms']:.1f}ms (max {client['loop_lag_max_ms']:.1f}ms)")
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the 03 workflow against a local OpenAI-compatible stub")
+    parser.add_argument("--rps", type=float, default=5.0, help="Target workflows started per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep starting workflows")
+    parser.add_argument("--arrival", choices=("constant", "poisson"), default="constant",
+                        help="Spacing between workflow starts")
+    parser.add_argument("--max-in-flight", type=int, default=256,
+                        help="Skip arrivals while this many workflows are running")
+    parser.add_argument("--drain-timeout", type=float, default=120.0,
+                        help="Seconds to wait for running workflows after the last arrival")
+    parser.add_argument("--mode", choices=("sequential", "pipelined"), default=None,
+                        help="Workflow variant (default: PIPELINE_MODE)")
+    parser.add_argument("--base-url", help="Use an already running stub (e.g. http://127.0.0.1:8765/v1)")
+    parser.add_argument("--pool", default=STUB_POOL, help="LLM_MODEL_POOL for the run (OpenAI models only)")
+    parser.add_argument("--output", default="python/benchmarks/results/load_test.json",
+                        help="Where to write the JSON report")
+    parser.add_argument("--serve-stub", action="store_true", help="Only run the stub server")
+    parser.add_argument("--host", default="127.0.0.1", help="Stub address (with --serve-stub)")
+    parser.add_argument("--port", type=int, default=None, help="Stub port (default: 8765 / a free port)")
+    stub = parser.add_argument_group("stub behaviour (default: STUB_* env vars)")
+    stub.add_argument("--stub-latency-ms", type=float, help="Time to first token")
+    stub.add_argument("--stub-latency-distribution", choices=("constant", "uniform", "normal", "lognormal"))
+    stub.add_argument("--stub-latency-spread", type=float, help="ms for uniform/normal, sigma for lognormal")
+    stub.add_argument("--stub-tokens-per-second", type=float, help="Generation speed after the first token")
+    stub.add_argument("--stub-completion-tokens", type=int, help="Mean reply length in tokens")
+    stub.add_argument("--stub-error-rate", type=float, help="Fraction of requests answered with 500")
+    stub.add_argument("--stub-rate-limit-rate", type=float, help="Fraction of requests answered with 429")
+    stub.add_argument("--stub-rpm", type=float, help="Requests per minute before the stub answers 429")
+    args = parser.parse_args()
+
+    from agents.stub_server import StubConfig, serve_stub
+
+    if args.serve_stub:
+        serve_stub(args.host, args.port or 8765, StubConfig.from_env(**stub_overrides(args)))
+        return
+
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        process, base_url = start_stub(args)
+    try:
+        # Point the real OpenAI client at the stub before the workflow builds its models
+        os.environ["LLM_PROVIDER"] = "openai"
+        os.environ["OPENAI_BASE_URL"] = base_url
+        os.environ["OPENAI_API_KEY"] = "sk-stub"
+        os.environ["LLM_MODEL_POOL"] = args.pool
+        os.environ.pop("OPENAI_API_BASE", None)  # Would take precedence over OPENAI_BASE_URL
+        os.environ.pop("LLM_CACHE_PATH", None)  # Cached replies would never reach the stub
+
+        from agents.loader import load_example
+        workflow = load_example("03_langgraph_real_multi_agent")
+        mode = args.mode or workflow.pipeline_mode()
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph = workflow.get_multi_agent_graph(mode=mode)
+
+        print(f"⏳ Starting ~{args.rps * args.duration:.0f} workflows ({args.rps:g}/s for {args.duration:g}s, "
+              f"{args.arrival} arrivals, {mode}) against {base_url}...")
+
+        async def measure():
+            # One untimed workflow first, so client setup and imports aren't measured as load
+            await graph.ainvoke(workflow.build_initial_state({"id": "warmup", "task": "Warm up"}))
+            before = stub_stats(base_url)
+            load = await run_load(graph, workflow.build_initial_state, args.rps, args.duration,
+                                  args.arrival, args.max_in_flight, args.drain_timeout)
+            return before, load
+
+        # The agents print progress per node; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            before, load = asyncio.run(measure())
+        after = stub_stats(base_url)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    counts = ("requests", "completed", "streamed", "server_errors", "rate_limited", "disconnected", "bad_requests")
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "base_url": base_url,
+            "mode": mode,
+            "rps": args.rps,
+            "duration": args.duration,
+            "arrival": args.arrival,
+            "stub": stub_overrides(args),
+        },
+        "load": load,
+        "stub": {**{key: after[key] - before[key] for key in counts}, "peak_in_flight": after["peak_in_flight"]},
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\n📄 Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
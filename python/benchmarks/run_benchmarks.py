@@ -0,0 +1,268 @@
+"""
+Benchmarks: Graph Build, Routing and Execution
+===============================================
+
+Measures the 03 multi-agent workflow piece by piece, fully offline (the
+FakeChatModel stands in for the real LLM):
+
+- compile:   `create_multi_agent_graph()` build + compile time
+- routing:   per-call overhead of `routing_logic`
+- tool_node: per-step overhead of `ToolNode` vs `ConcurrentToolNode`, plus a
+             fan-out turn with several slow tool calls
+- reducer:   cost of the `operator.add` message merge as history grows,
+             next to the token-budgeted `windowed_add` reducer
+- workflow:  end-to-end latency and throughput at several concurrency levels
+
+Results are written as JSON. Pass `--baseline` to compare against an earlier
+run; the script exits with status 1 if any metric regressed past `--threshold`.
+
+Usage:
+    python python/benchmarks/run_benchmarks.py --output bench.json
+    python python/benchmarks/run_benchmarks.py --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import operator
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+# Make the shared `agents` package (python/agents) importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from agents.batch import arun_batch
+from agents.loader import load_example
+from agents.stats import latency_summary
+
+# Metrics where a bigger number is better; everything else is a time (lower is better)
+HIGHER_IS_BETTER = ("throughput",)
+# Tail metrics (p99/max) of sub-millisecond operations are too noisy to gate on
+COMPARED_METRICS = ("mean", "p50", "p95", "throughput", "grow_total")
+# Ignore micro-benchmark differences smaller than this many microseconds
+MIN_DELTA_US = 1.0
+
+
+def timed(fn, repeat: int) -> dict:
+    """Run `fn` `repeat` times and summarize the per-call time in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    summary = latency_summary(samples)
+    return {f"{k}_us": v * 1e6 for k, v in summary.items() if k != "count"}
+
+
+def bench_compile(workflow, repeat: int) -> dict:
+    # The builder prints progress; keep the benchmark output readable
+    def build():
+        with contextlib.redirect_stdout(io.StringIO()):
+            workflow.create_multi_agent_graph()
+    return timed(build, repeat)
+
+
+def bench_routing(workflow, repeat: int) -> dict:
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    to_tools = {"messages": [HumanMessage(content="task"), AIMessage(
+        content="", tool_calls=[{"name": "research_tool", "args": {"query": "q"}, "id": "call_1"}]
+    )], "next_agent": "writer"}
+    to_agent = {"messages": [HumanMessage(content="task"), AIMessage(content="done")],
+                "next_agent": "reviewer"}
+
+    results = {}
+    for label, state in (("to_tools", to_tools), ("to_agent", to_agent)):
+        for key, value in timed(lambda: workflow.routing_logic(state), repeat).items():
+            results[f"{label}.{key}"] = value
+    return results
+
+
+def bench_tool_node(workflow, repeat: int) -> dict:
+    import time as _time
+    from langchain_core.messages import AIMessage
+    from langchain_core.tools import tool
+    from langgraph.graph import END, StateGraph
+    from langgraph.prebuilt import ToolNode
+    from agents.tool_executor import ConcurrentToolNode
+
+    def single_step(node):
+        # Tool nodes need a graph runtime, so run each as the only step of a tiny graph
+        graph = StateGraph(workflow.AgentState)
+        graph.add_node("tools", node)
+        graph.set_entry_point("tools")
+        graph.add_edge("tools", END)
+        return graph.compile()
+
+    tools = [workflow.research_tool, workflow.write_tool, workflow.review_tool]
+    state = {"messages": [AIMessage(content="", tool_calls=[
+        {"name": "research_tool", "args": {"query": "multi-agent systems"}, "id": "call_1"},
+    ])], "next_agent": "reviewer"}
+
+    results = {}
+    for label, node in (("toolnode", ToolNode(tools)), ("concurrent", ConcurrentToolNode(tools))):
+        step = single_step(node)
+        for key, value in timed(lambda: step.invoke(state), repeat).items():
+            results[f"{label}.{key}"] = value
+
+    # Fan-out: one turn with four slow (20ms) I/O-bound calls
+    @tool
+    def slow_lookup(query: str) -> str:
+        """Simulated slow I/O-bound lookup."""
+        _time.sleep(0.02)
+        return query
+
+    fan_out = {"messages": [AIMessage(content="", tool_calls=[
+        {"name": "slow_lookup", "args": {"query": f"q{i}"}, "id": f"call_{i}"} for i in range(4)
+    ])], "next_agent": "reviewer"}
+    step = single_step(ConcurrentToolNode([slow_lookup], max_workers=4))
+    results["fan_out_4x20ms.mean_ms"] = timed(lambda: step.invoke(fan_out), 10)["mean_us"] / 1000
+    return results
+
+
+def bench_reducer(workflow, sizes, repeat: int) -> dict:
+    from langchain_core.messages import AIMessage
+    from agents.history import windowed_add
+
+    windowed = windowed_add(workflow.STATE_TOKEN_BUDGET)
+
+    results = {}
+    update = [AIMessage(content="new turn")]
+    for size in sizes:
+        history = [AIMessage(content=f"turn {i}") for i in range(size)]
+        for key, value in timed(lambda: operator.add(history, update), repeat).items():
+            results[f"history_{size}.{key}"] = value
+
+        # Total cost of growing the history one turn at a time (quadratic in size)
+        def grow():
+            merged = []
+            for message in history:
+                merged = operator.add(merged, [message])
+        results[f"history_{size}.grow_total_us"] = timed(grow, 5)["p50_us"]
+
+        # Same growth through the token-budgeted reducer the 03 graph uses
+        def grow_windowed():
+            merged = []
+            for message in history:
+                merged = windowed(merged, [message])
+        results[f"windowed_{size}.grow_total_us"] = timed(grow_windowed, 5)["p50_us"]
+    return results
+
+
+def bench_workflow(workflow, concurrency_levels, tasks_per_level: int) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph = workflow.create_multi_agent_graph()
+
+    results = {}
+    for concurrency in concurrency_levels:
+        tasks = ({"id": str(i), "task": f"Summarize topic #{i}"} for i in range(tasks_per_level))
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = asyncio.run(arun_batch(
+                graph, tasks, workflow.build_initial_state, concurrency=concurrency
+            ))
+        summary = latency_summary(report.latencies)
+        prefix = f"concurrency_{concurrency}"
+        results[f"{prefix}.throughput"] = report.throughput
+        results[f"{prefix}.failed"] = report.failed
+        for key in ("mean", "p50", "p95", "p99"):
+            results[f"{prefix}.{key}_ms"] = summary[key] * 1000
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Return (metric, baseline, current, change) for every regressed metric."""
+    regressions = []
+    for suite, metrics in current["results"].items():
+        for name, value in metrics.items():
+            old = baseline.get("results", {}).get(suite, {}).get(name)
+            metric = name.split(".")[-1]
+            if not old or not metric.startswith(COMPARED_METRICS):
+                continue
+            if metric.endswith("_us") and abs(value - old) < MIN_DELTA_US:
+                continue
+            change = (value - old) / old
+            if metric.startswith(HIGHER_IS_BETTER):
+                change = -change
+            if change > threshold:
+                regressions.append((f"{suite}.{name}", old, value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the 03 multi-agent graph offline")
+    parser.add_argument("--output", default="python/benchmarks/results/latest.json",
+                        help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (default: 0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations for micro-benchmarks")
+    parser.add_argument("--latency-ms", type=float, default=20.0,
+                        help="Fake LLM time-to-first-token for workflow runs")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64],
+                        help="Concurrency levels for the workflow benchmark")
+    parser.add_argument("--tasks", type=int, default=64, help="Workflows per concurrency level")
+    args = parser.parse_args()
+
+    # Benchmarks always run offline against the fake model
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    workflow = load_example("03_langgraph_real_multi_agent")
+
+    print("⏱️  Running benchmarks (offline, fake LLM)...")
+    results = {}
+    suites = [
+        ("compile", lambda: bench_compile(workflow, max(1, args.repeat // 10))),
+        ("routing", lambda: bench_routing(workflow, args.repeat * 10)),
+        ("tool_node", lambda: bench_tool_node(workflow, args.repeat)),
+        ("reducer", lambda: bench_reducer(workflow, [10, 100, 1000, 5000], args.repeat)),
+        ("workflow", lambda: bench_workflow(workflow, args.concurrency, args.tasks)),
+    ]
+    for name, run in suites:
+        started = time.perf_counter()
+        results[name] = run()
+        print(f"   ✅ {name:<10} ({time.perf_counter() - started:.2f}s)")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fake_latency_ms": args.latency_ms,
+        },
+        "results": results,
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to: {args.output}")
+
+    print("\n📊 Summary")
+    print(f"   compile:   {results['compile']['mean_us'] / 1000:.2f} ms")
+    print(f"   routing:   {results['routing']['to_agent.mean_us']:.2f} µs")
+    print(f"   tool_node: {results['tool_node']['toolnode.mean_us']:.1f} µs "
+          f"(concurrent: {results['tool_node']['concurrent.mean_us']:.1f} µs, "
+          f"4x20ms fan-out: {results['tool_node']['fan_out_4x20ms.mean_ms']:.1f} ms)")
+    for concurrency in args.concurrency:
+        prefix = f"concurrency_{concurrency}"
+        print(f"   workflow x{concurrency:<3} {results['workflow'][prefix + '.throughput']:.1f} tasks/s, "
+              f"p95 {results['workflow'][prefix + '.p95_ms']:.1f} ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.baseline}:")
+            for metric, old, new, change in regressions:
+                print(f"   {metric}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+            sys.exit(1)
+        print(f"\n✅ No regressions vs {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,14 @@ Based on: https://docs.langchain.com/oss/python/langchain/overview
 """
 
 import os
+import sys
 from dotenv import load_dotenv
 from langchain.agents import create_agent
-from langchain_openai import ChatOpenAI
+
+# Make the shared `agents` package (python/agents) importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from agents.providers import get_provider
+from agents.router import get_router, routing_middleware
 
 # Load environment variables
 load_dotenv('python/.env')
@@ -30,15 +35,20 @@ def main():
     
     # Create the agent
     # According to docs: https://docs.langchain.com/oss/python/langchain/overview
+    # The router picks a standard-tier model per call (cheapest healthy one first)
+    # and fails over to the other provider on errors; LLM_PROVIDER=fake runs offline
+    router = get_router()
+    tools = [get_weather]
     agent = create_agent(
-        model="gpt-4o-mini",  # Using a cost-effective model for learning
-        tools=[get_weather],
+        model=router.chat_model(router.select("standard")),
+        tools=tools,
         system_prompt="You are a helpful assistant with access to weather information.",
+        middleware=[routing_middleware(router, "standard")],
     )
     
     print("\n📊 Agent Created Successfully!")
-    print(f"   Model: gpt-4o-mini")
-    print(f"   Tools: {[t.name for t in agent.tools]}")
+    print(f"   Model: {router.select('standard').label} (provider: {get_provider()})")
+    print(f"   Tools: {[t.__name__ for t in tools]}")
     
     # Run the agent
     print("\n" + "=" * 60)
@@ -51,6 +61,8 @@ def main():
     print("=" * 60)
     print("\n✅ Response received!")
     print(f"\n{response['messages'][-1].content}")
+    print("\n🧭 Model routing:")
+    router.print_stats()
     print("\n" + "=" * 60)
     print("\n🎉 First agent demo complete!")
     print("\n💡 Next: Check out '02_multi_agent_graph.py' to see agents working together")
@@ -11,108 +11,97 @@ Based on LangGraph patterns: https://blog.langchain.com/langgraph-multi-agent-wo
 """
 
 import os
-import matplotlib.pyplot as plt
+import sys
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from langchain_anthropic import ChatAnthropic
-from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
-import networkx as nx
-from typing import Annotated, Literal
-import operator
+from langchain_core.messages import HumanMessage
+
+# Make the shared `agents` package (python/agents) importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from agents.dag import TaskGraph
+from agents.quality_gate import QualityGate
+from agents.router import get_router
+from agents.scheduler import DEFAULT_COMPLETION_TOKENS, get_scheduler
+from agents.tokens import estimate_messages_tokens
 
 # Load environment variables
 load_dotenv('python/.env')
 
-def plot_agent_graph():
+# The workflow, shared by the diagram and the scheduler.
+# Each edge is (from, to, label, is_dependency): dependency edges carry data the
+# receiving agent must wait for; the others are hand-offs that don't block
+# (the Researcher's assignment is fixed, so it can start alongside the Supervisor).
+AGENTS = {
+    'Supervisor': {'color': '#FF6B6B', 'type': 'Orchestrator'},
+    'Researcher': {'color': '#4ECDC4', 'type': 'Specialist'},
+    'Writer': {'color': '#95E1D3', 'type': 'Specialist'},
+    'Quality': {'color': '#F38181', 'type': 'Specialist'},
+}
+
+WORKFLOW_EDGES = [
+    ('Supervisor', 'Researcher', 'Research Task', False),
+    ('Supervisor', 'Writer', 'Write Content', True),
+    ('Researcher', 'Writer', 'Findings', True),
+    ('Writer', 'Quality', 'Draft Review', True),
+    ('Quality', 'Supervisor', 'Final Check', False),
+]
+
+def workflow_dependencies():
+    """Map each agent to the agents whose output it must wait for."""
+    deps = {agent: [] for agent in AGENTS}
+    for source, target, _, is_dependency in WORKFLOW_EDGES:
+        if is_dependency:
+            deps[target].append(source)
+    return deps
+
+def plot_agent_graph(fast: bool = False, force: bool = False):
     """
     Visualize the multi-agent workflow as a graph.
     This is where the visual learning happens!
+    
+    The diagram is only redrawn when the workflow (or the render options)
+    changed; `fast=True` writes a quick SVG instead of a 300-dpi PNG.
     """
+    # Plotting libraries are only needed here, so the simulation starts fast
+    import networkx as nx
+    from agents.render import render_graph
+    
     # Create a directed graph
     G = nx.DiGraph()
     
-    # Define agents as nodes
-    agents = {
-        'Supervisor': {'color': '#FF6B6B', 'type': 'Orchestrator'},
-        'Researcher': {'color': '#4ECDC4', 'type': 'Specialist'},
-        'Writer': {'color': '#95E1D3', 'type': 'Specialist'},
-        'Quality': {'color': '#F38181', 'type': 'Specialist'},
-    }
-    
-    # Add nodes
-    for agent, attrs in agents.items():
+    # Define agents as nodes (color and type drive the fill and the legend)
+    for agent, attrs in AGENTS.items():
         G.add_node(agent, **attrs)
     
     # Define workflow edges
     # Supervisor coordinates all agents
-    G.add_edge('Supervisor', 'Researcher', label='Research Task')
-    G.add_edge('Supervisor', 'Writer', label='Write Content')
-    G.add_edge('Researcher', 'Writer', label='Findings')
-    G.add_edge('Writer', 'Quality', label='Draft Review')
-    G.add_edge('Quality', 'Supervisor', label='Final Check')
-    
-    # Create visualization
-    fig, ax = plt.subplots(figsize=(14, 10))
-    fig.suptitle('Multi-Agent Workflow Architecture', fontsize=16, fontweight='bold')
-    
-    # Use a circular layout for better visualization
-    pos = nx.spring_layout(G, k=3, iterations=50, seed=42)
-    
-    # Draw nodes with colors
-    node_colors = [agents[node]['color'] for node in G.nodes()]
-    nx.draw_networkx_nodes(G, pos, node_color=node_colors, 
-                          node_size=3000, alpha=0.9, 
-                          ax=ax, edgecolors='white', linewidths=2)
-    
-    # Draw edges
-    nx.draw_networkx_edges(G, pos, edge_color='#34495e', 
-                          width=2.5, alpha=0.6, arrows=True, 
-                          arrowsize=20, arrowstyle='->', 
-                          connectionstyle='arc3,rad=0.1', ax=ax)
-    
-    # Add labels
-    labels = {node: node for node in G.nodes()}
-    nx.draw_networkx_labels(G, pos, labels, font_size=10, 
-                           font_weight='bold', font_color='white', ax=ax)
-    
-    # Add edge labels
-    edge_labels = nx.get_edge_attributes(G, 'label')
-    nx.draw_networkx_edge_labels(G, pos, edge_labels, font_size=8, 
-                                bbox=dict(boxstyle='round,pad=0.3', 
-                                         facecolor='white', alpha=0.8), ax=ax)
-    
-    # Add legend
-    legend_elements = [
-        plt.Line2D([0], [0], marker='o', color='w', 
-                   markerfacecolor='#FF6B6B', markersize=10, label='Orchestrator'),
-        plt.Line2D([0], [0], marker='o', color='w', 
-                   markerfacecolor='#4ECDC4', markersize=10, label='Specialist'),
-    ]
-    ax.legend(handles=legend_elements, loc='upper right', fontsize=10)
-    
-    ax.set_facecolor('#f8f9fa')
-    ax.axis('off')
-    plt.tight_layout()
-    
-    # Save the visualization
-    output_path = 'python/visualizations/02_multi_agent_graph.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"\n✅ Graph visualization saved to: {output_path}")
+    for source, target, label, _ in WORKFLOW_EDGES:
+        G.add_edge(source, target, label=label)
+    
+    # Render (spring layout k=3, 50 iterations - cached per graph structure)
+    output_path = 'python/visualizations/02_multi_agent_graph.' + ('svg' if fast else 'png')
+    result = render_graph(G, output_path, title='Multi-Agent Workflow Architecture',
+                          fast=fast, force=force)
+    if result.skipped:
+        print(f"\n✅ Graph visualization is up to date: {output_path}")
+    else:
+        print(f"\n✅ Graph visualization saved to: {output_path} ({result.seconds:.2f}s)")
     
     return G
 
 class MockAgent:
     """Mock agent for demonstration purposes."""
-    def __init__(self, name, role):
+    def __init__(self, name, role, tier="standard"):
         self.name = name
         self.role = role
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        self.tier = tier  # Quality tier; the router picks a model at or above it
     
     def process(self, task):
-        """Process a task and return result."""
-        response = self.llm.invoke([HumanMessage(content=f"Role: {self.role}\nTask: {task}")])
+        """Process a task and return result (routed, and admitted by the rate-limit scheduler)."""
+        router, scheduler = get_router(), get_scheduler()
+        messages = [HumanMessage(content=f"Role: {self.role}\nTask: {task}")]
+        tokens = estimate_messages_tokens(messages) + DEFAULT_COMPLETION_TOKENS
+        response = router.invoke(self.tier, lambda option: scheduler.call(
+            option.model, lambda: router.chat_model(option, temperature=0).invoke(messages), tokens=tokens))
         return response.content
 
 def simulate_multi_agent_workflow():
@@ -125,37 +114,67 @@ def simulate_multi_agent_workflow():
     print("=" * 60)
     
     # Create agents
-    supervisor = MockAgent("Supervisor", "Coordinate research and writing")
+    # Coordination and the pass/fail quality check are fine on a fast, cheap model
+    supervisor = MockAgent("Supervisor", "Coordinate research and writing", tier="fast")
     researcher = MockAgent("Researcher", "Find relevant information")
     writer = MockAgent("Writer", "Create written content")
     
-    # Simulate workflow
-    print("\n1️⃣ Supervisor receives task: 'Research AI trends'")
-    supervisor_response = supervisor.process("Coordinate: Research AI trends and write summary")
-    print(f"   👉 Supervisor: {supervisor_response[:100]}...")
-    
-    print("\n2️⃣ Researcher performs search")
-    research_results = researcher.process("Find latest AI trends in 2025")
-    print(f"   👉 Researcher: {research_results[:100]}...")
-    
-    print("\n3️⃣ Writer creates summary")
-    summary = writer.process(f"Write a summary based on: {research_results[:200]}")
-    print(f"   👉 Writer: {summary[:100]}...")
-    
-    print("\n4️⃣ Quality check (simulated)")
-    quality_check = supervisor.process(f"Review this summary: {summary[:200]}")
-    print(f"   👉 Supervisor: Quality check complete")
+    # One step per agent in the workflow graph; each gets its dependencies' results
+    def coordinate(deps):
+        response = supervisor.process("Coordinate: Research AI trends and write summary")
+        print(f"   👉 Supervisor: {response[:100]}...")
+        return response
+    
+    def research(deps):
+        results = researcher.process("Find latest AI trends in 2025")
+        print(f"   👉 Researcher: {results[:100]}...")
+        return results
+    
+    def write(deps):
+        summary = writer.process(f"Write a summary based on: {deps['Researcher'][:200]}")
+        print(f"   👉 Writer: {summary[:100]}...")
+        return summary
+    
+    # With QUALITY_GATE=on, clearly broken summaries are rejected locally; the rest get an LLM review
+    quality_gate = QualityGate.from_env(expected_review_seconds=lambda: get_router().expected_latency(supervisor.tier))
+    
+    def quality_check(deps):
+        review = quality_gate.review(
+            deps['Writer'],
+            lambda: supervisor.process(f"Review this summary: {deps['Writer'][:200]}"),
+            on_skip=lambda result: result.feedback(),
+        )
+        print(f"   👉 Supervisor: Quality check complete")
+        return review
+    
+    steps = {'Supervisor': coordinate, 'Researcher': research, 'Writer': write, 'Quality': quality_check}
+    dag = TaskGraph()
+    for agent, depends_on in workflow_dependencies().items():
+        dag.add_task(agent, steps[agent], depends_on=depends_on)
+    
+    # Independent agents run at the same time; the rest start as soon as
+    # everything they depend on has finished
+    print("\n1️⃣ Supervisor coordinates while the Researcher searches (in parallel)")
+    print("2️⃣ Writer starts once both are done, then 3️⃣ Quality check\n")
+    report = dag.run()
+    
+    print()
+    report.print_timing()
+    print("\n🧭 Model routing:")
+    get_router().print_stats()
+    print("🚧 Quality gate:")
+    quality_gate.print_stats()
     
     print("\n✅ Multi-agent workflow complete!")
     print("=" * 60)
 
-def main():
+def main(fast_render: bool = False, force_render: bool = False):
     """Run the multi-agent demonstration."""
     print("🚀 Multi-Agent Workflow with Visual Learning\n")
     
     # Step 1: Create and visualize the graph
     print("📊 Step 1: Creating workflow visualization...")
-    graph = plot_agent_graph()
+    graph = plot_agent_graph(fast=fast_render, force=force_render)
     print(f"   Nodes: {graph.number_of_nodes()}")
     print(f"   Edges: {graph.number_of_edges()}")
     
@@ -175,5 +194,13 @@ def main():
     print("📚 Docs: https://docs.langchain.com/oss/python/langchain/multi-agent")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fast-render", action="store_true",
+                        help="Write a quick SVG diagram instead of a 300-dpi PNG")
+    parser.add_argument("--force-render", action="store_true",
+                        help="Redraw the diagram even if it is up to date")
+    args = parser.parse_args()
+    main(fast_render=args.fast_render, force_render=args.force_render)
 
@@ -13,26 +13,91 @@ Based on:
 - LangGraph multi-agent: https://blog.langchain.com/langgraph-multi-agent-workflows
 """
 
+import argparse
+import asyncio
+import operator
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableLambda
 from typing import Annotated, Sequence, TypedDict, Union
-import operator
+
+# Make the shared `agents` package (python/agents) importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from agents.batch import default_summarize, load_tasks, run_batch
+from agents.cache import get_response_cache
+from agents.checkpoint import get_checkpointer, next_nodes, thread_config
+from agents.graph_render import compare_renderers, render_workflow, write_svg
+from agents.hedging import Hedger, HedgePolicy, request_key
+from agents.history import select_window, windowed_add
+from agents.pipeline import PIPELINED, SectionPipeline, acompare_modes, pipeline_mode, print_comparison
+from agents.pool import AgentPool
+from agents.pricing import estimate_cost
+from agents.providers import get_chat_model
+from agents.quality_gate import QualityGate
+from agents.registry import GraphRegistry
+from agents.router import get_router
+from agents.scheduler import DEFAULT_COMPLETION_TOKENS, get_scheduler, scheduler_scope
+from agents.streaming import StreamReport, astream_tokens, stream_tokens
+from agents.tokens import estimate_messages_tokens
+from agents.tool_cache import cached_tool, get_tool_cache
+from agents.tool_executor import ConcurrentToolNode
+from agents.tracing import Tracer
 
 # Load environment variables
 load_dotenv('python/.env')
 
+# Token budgets (estimated tokens). The stored history is capped at
+# STATE_TOKEN_BUDGET, and each agent sees at most its own budget of the most
+# recent turns. The original task is always kept; older turns are summarized.
+STATE_TOKEN_BUDGET = 16_000
+NODE_TOKEN_BUDGETS = {
+    "research": 2_000,
+    "writer": 4_000,
+    "reviewer": 3_000,
+}
+
+# Quality tier each node needs. The model router picks the best model at or
+# above it from the pool (LLM_MODEL_POOL) by live latency, errors and cost;
+# the reviewer's pass/route decision is fine on a cheap, fast model.
+NODE_TIERS = {
+    "research": "standard",
+    "writer": "standard",
+    "reviewer": "fast",
+}
+
+# Tail-latency control. Each node's model call has a deadline (seconds) that
+# bounds the whole call, fallbacks included: the model gets the first 75% of it
+# (HEDGE_FALLBACK_FRACTION), then the node answers from an earlier identical
+# request or from a model of the FALLBACK_TIER. With HEDGE_PERCENTILE set, a
+# call slower than that percentile of its node's recent calls is duplicated
+# and the first reply wins.
+NODE_DEADLINES = {
+    "research": 60,
+    "writer": 120,
+    "reviewer": 60,
+}
+FALLBACK_TIER = "fast"
+
 # Define the state for our multi-agent workflow
 class AgentState(TypedDict):
     """State shared between agents in the workflow."""
-    messages: Annotated[Sequence[Union[HumanMessage, AIMessage, ToolMessage]], operator.add]
+    messages: Annotated[Sequence[Union[HumanMessage, AIMessage, ToolMessage]], windowed_add(STATE_TOKEN_BUDGET)]
     next_agent: str  # Which agent should act next
+    sender: str  # The agent that produced the latest message (tool results go back to it)
+    llm_calls: Annotated[int, operator.add]  # Model calls made by the agents in this run
+
+# Tool results are memoized by normalized arguments (in memory, plus on disk
+# when TOOL_CACHE_PATH is set), so repeated lookups across workflows are free
+# and concurrent identical calls run once
+tool_cache = get_tool_cache()
 
 # Define tools for our agents
+@cached_tool(ttl_seconds=3600, cache=tool_cache)
 @tool
 def research_tool(query: str) -> str:
     """Perform research on a given query.
@@ -47,6 +112,7 @@ def research_tool(query: str) -> str:
     return f"Research findings on: {query}. Key insights include [placeholder data]. " \
            "This demonstrates how tools can be used by agents in workflows."
 
+@cached_tool(ttl_seconds=600, cache=tool_cache)
 @tool
 def write_tool(topic: str, context: str) -> str:
     """Write content about a topic based on provided context.
@@ -60,6 +126,7 @@ def write_tool(topic: str, context: str) -> str:
     """
     return f"Content written about: {topic}. Incorporating context: {context[:100]}..."
 
+@cached_tool(ttl_seconds=600, cache=tool_cache)
 @tool
 def review_tool(content: str) -> str:
     """Review and provide feedback on content.
@@ -72,88 +139,283 @@ def review_tool(content: str) -> str:
     """
     return f"Review complete. Feedback: Content is well-structured and informative."
 
-def create_research_agent() -> ChatOpenAI:
+# Persistent response cache (enabled with LLM_CACHE_PATH). Only the
+# deterministic agents (temperature 0, fixed seed) opt in - the creative
+# writer always gets a fresh completion.
+response_cache = get_response_cache()
+
+def create_research_agent(model: str = "gpt-4o-mini", provider: str = None) -> BaseChatModel:
     """Create the research agent."""
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
+    llm = get_chat_model(
+        model=model,
+        provider=provider,
         temperature=0,
-        model_kwargs={"seed": 42}
+        model_kwargs={"seed": 42},
+        cache=response_cache
     )
     return llm
 
-def create_writer_agent() -> ChatOpenAI:
+def create_writer_agent(model: str = "gpt-4o-mini", provider: str = None) -> BaseChatModel:
     """Create the writer agent."""
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
+    llm = get_chat_model(
+        model=model,
+        provider=provider,
         temperature=0.7,  # More creative for writing
-        model_kwargs={"seed": 42}
+        model_kwargs={"seed": 42},
+        cache=False  # Never serve cached completions for creative output
     )
     return llm
 
-def create_reviewer_agent() -> ChatOpenAI:
+def create_reviewer_agent(model: str = "gpt-4o-mini", provider: str = None) -> BaseChatModel:
     """Create the reviewer agent."""
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
+    llm = get_chat_model(
+        model=model,
+        provider=provider,
         temperature=0,
-        model_kwargs={"seed": 42}
+        model_kwargs={"seed": 42},
+        cache=response_cache
     )
     return llm
 
-def research_node(state: AgentState) -> AgentState:
-    """Node: Research agent performs research."""
-    print("   🔍 Research agent: Gathering information...")
+# Each agent (model + tool binding) is built once per process and shared by
+# every graph step, thread and async task instead of being rebuilt per call
+agent_pool = AgentPool()
+agent_pool.register("research", create_research_agent, tools=[research_tool])
+agent_pool.register("writer", create_writer_agent, tools=[write_tool])
+agent_pool.register("reviewer", create_reviewer_agent, tools=[review_tool])
+
+def agent_context(name: str, messages):
+    """The slice of history agent `name` gets to see, within its token budget."""
+    return select_window(messages, NODE_TOKEN_BUDGETS.get(name), summarize=True)
+
+# Every model call goes through the shared scheduler, which keeps all agents
+# (and all concurrent workflows) within the provider's rate limits
+scheduler = get_scheduler()
+
+hedger = Hedger(HedgePolicy.from_env())
+router = get_router()
+
+def routed_agent(name: str, option, tools: bool = True):
+    """Agent `name` on the router's `option`, with its tools bound unless `tools=False`."""
+    agent = agent_pool.get(name, model=option.model, provider=router.backend(option))
+    return agent.bound if tools else agent.llm
+
+def scheduled_calls(name: str, context, tier: str = None, tools: bool = True):
+    """Sync and async routed calls of agent `name`, admitted by the scheduler.
+
+    The router picks the model for the node's tier (or `tier`) per attempt
+    and fails over to another model/provider on timeouts and server errors.
+    """
+    tier = tier or NODE_TIERS[name]
+    tokens = estimate_messages_tokens(context) + DEFAULT_COMPLETION_TOKENS
     
-    llm = create_research_agent()
+    def call(duplicate: bool) -> AIMessage:
+        # A hedge duplicate runs without callbacks so its tokens aren't streamed twice
+        config = {"callbacks": []} if duplicate else None
+        return router.invoke(tier, lambda option: scheduler.call(
+            option.model, lambda: routed_agent(name, option, tools).invoke(context, config=config), tokens=tokens))
     
-    # Get the last human message
-    last_message = state["messages"][-1]
-    query = last_message.content if hasattr(last_message, 'content') else str(last_message)
+    async def acall(duplicate: bool) -> AIMessage:
+        config = {"callbacks": []} if duplicate else None
+        return await router.ainvoke(tier, lambda option: scheduler.acall(
+            option.model, lambda: routed_agent(name, option, tools).ainvoke(context, config=config), tokens=tokens))
     
-    # Bind tools to the LLM
-    agent_with_tools = llm.bind_tools([research_tool])
+    return call, acall, estimate_cost(router.select(tier).model, tokens - DEFAULT_COMPLETION_TOKENS, 0)
+
+def call_agent(name: str, messages, tools: bool = True) -> AIMessage:
+    """Invoke agent `name` (tools already bound, unless `tools=False`) on `messages`."""
+    context = agent_context(name, messages)
+    call, _, cost = scheduled_calls(name, context, tools=tools)
+    fallback, _, _ = scheduled_calls(name, context, tier=FALLBACK_TIER, tools=tools)
+    # Tool-less calls (pipelined sections) are shorter, so they get their own latency history
+    key = name if tools else f"{name}:text"
+    return hedger.call(key, call, fallbacks=[fallback], request_key=request_key(context),
+                       deadline=NODE_DEADLINES.get(name), estimated_cost=cost)
+
+async def acall_agent(name: str, messages, tools: bool = True) -> AIMessage:
+    """Async version of `call_agent` - awaits the model without blocking a thread."""
+    context = agent_context(name, messages)
+    _, acall, cost = scheduled_calls(name, context, tools=tools)
+    _, afallback, _ = scheduled_calls(name, context, tier=FALLBACK_TIER, tools=tools)
+    key = name if tools else f"{name}:text"
+    return await hedger.acall(key, acall, fallbacks=[afallback], request_key=request_key(context),
+                              deadline=NODE_DEADLINES.get(name), estimated_cost=cost)
+
+def stream_agent(name: str, messages, stage) -> tuple:
+    """Stream agent `name`'s reply, running `stage(index, section)` on each finished section.
+
+    Returns `(reply, pipeline)`. Each router attempt gets a fresh pipeline, so
+    work started on a failed attempt's partial output is dropped. Streams are
+    not hedged; the router's per-attempt timeout still applies.
+    """
+    context = agent_context(name, messages)
+    tier = NODE_TIERS[name]
+    tokens = estimate_messages_tokens(context) + DEFAULT_COMPLETION_TOKENS
+    pipelines = []
+    
+    def attempt(option):
+        for pipeline in pipelines:
+            pipeline.cancel()
+        pipelines.append(SectionPipeline(stage))
+        return pipelines[-1].consume(routed_agent(name, option).stream(context))
+    
+    reply = router.invoke(tier, lambda option: scheduler.call(option.model, lambda: attempt(option), tokens=tokens))
+    return reply, pipelines[-1]
+
+async def astream_agent(name: str, messages, stage) -> tuple:
+    """Async version of `stream_agent`; `stage` is a coroutine function."""
+    context = agent_context(name, messages)
+    tier = NODE_TIERS[name]
+    tokens = estimate_messages_tokens(context) + DEFAULT_COMPLETION_TOKENS
+    pipelines = []
+    
+    async def attempt(option):
+        for pipeline in pipelines:
+            pipeline.cancel()
+        pipelines.append(SectionPipeline(stage))
+        return await pipelines[-1].aconsume(routed_agent(name, option).astream(context))
+    
+    reply = await router.ainvoke(tier, lambda option: scheduler.acall(option.model, lambda: attempt(option), tokens=tokens))
+    return reply, pipelines[-1]
+
+# With QUALITY_GATE=on, drafts that clearly fail cheap local checks are
+# rejected without the reviewer LLM (configure with QUALITY_GATE_*)
+quality_gate = QualityGate.from_env(expected_review_seconds=lambda: router.expected_latency(NODE_TIERS["reviewer"]))
+
+def latest_draft(messages) -> str:
+    """The most recent text answer in `messages` (the writer's draft)."""
+    for message in reversed(messages):
+        if isinstance(message, AIMessage) and message.content and not message.tool_calls:
+            return message.content
+    return ""
+
+def gate_decision(result) -> AIMessage:
+    """The reviewer's message when the quality gate decided on its own."""
+    return AIMessage(content=result.feedback(), name="quality_gate")
+
+def research_node(state: AgentState) -> AgentState:
+    """Node: Research agent performs research."""
+    print("   🔍 Research agent: Gathering information...")
     
     # Call the agent
-    response = agent_with_tools.invoke(state["messages"])
+    response = call_agent("research", state["messages"])
     
     return {
         "messages": [response],
-        "next_agent": "writer"
+        "next_agent": "writer",
+        "sender": "research",
+        "llm_calls": 1
     }
 
 def writer_node(state: AgentState) -> AgentState:
     """Node: Writer agent creates content."""
     print("   ✍️  Writer agent: Creating content...")
     
-    llm = create_writer_agent()
-    
-    # Bind tools to the LLM
-    agent_with_tools = llm.bind_tools([write_tool])
-    
     # Call the agent
-    response = agent_with_tools.invoke(state["messages"])
+    response = call_agent("writer", state["messages"])
     
     return {
         "messages": [response],
-        "next_agent": "reviewer"
+        "next_agent": "reviewer",
+        "sender": "writer",
+        "llm_calls": 1
     }
 
 def reviewer_node(state: AgentState) -> AgentState:
     """Node: Reviewer agent reviews content."""
     print("   📋 Reviewer agent: Reviewing content...")
     
-    llm = create_reviewer_agent()
-    
-    # Bind tools to the LLM
-    agent_with_tools = llm.bind_tools([review_tool])
-    
-    # Call the agent
-    response = agent_with_tools.invoke(state["messages"])
+    # A fresh draft is screened by the local quality gate first (when enabled);
+    # the reviewer LLM sees every draft it doesn't reject (and finishes reviews it has started)
+    if state.get("sender") == "writer":
+        response = quality_gate.review(latest_draft(state["messages"]),
+                                       lambda: call_agent("reviewer", state["messages"]),
+                                       on_skip=gate_decision)
+    else:
+        response = call_agent("reviewer", state["messages"])
     
     return {
         "messages": [response],
-        "next_agent": END
+        "next_agent": END,
+        "sender": "reviewer",
+        "llm_calls": 0 if response.name == "quality_gate" else 1
+    }
+
+# Async versions of the nodes. They are used automatically when the compiled
+# graph is driven with `ainvoke`/`astream`, so one event loop can run many
+# workflows concurrently instead of parking a thread per LLM round-trip.
+async def aresearch_node(state: AgentState) -> AgentState:
+    """Node (async): Research agent performs research."""
+    print("   🔍 Research agent: Gathering information...")
+    response = await acall_agent("research", state["messages"])
+    return {"messages": [response], "next_agent": "writer", "sender": "research", "llm_calls": 1}
+
+async def awriter_node(state: AgentState) -> AgentState:
+    """Node (async): Writer agent creates content."""
+    print("   ✍️  Writer agent: Creating content...")
+    response = await acall_agent("writer", state["messages"])
+    return {"messages": [response], "next_agent": "reviewer", "sender": "writer", "llm_calls": 1}
+
+async def areviewer_node(state: AgentState) -> AgentState:
+    """Node (async): Reviewer agent reviews content."""
+    print("   📋 Reviewer agent: Reviewing content...")
+    if state.get("sender") == "writer":
+        response = await quality_gate.areview(latest_draft(state["messages"]),
+                                              lambda: acall_agent("reviewer", state["messages"]),
+                                              on_skip=gate_decision)
+    else:
+        response = await acall_agent("reviewer", state["messages"])
+    llm_calls = 0 if response.name == "quality_gate" else 1
+    return {"messages": [response], "next_agent": END, "sender": "reviewer", "llm_calls": llm_calls}
+
+# Pipelined mode (--pipelined / PIPELINE_MODE=pipelined): the research reply
+# is streamed and the writer drafts each finished section of it while the
+# rest is still being generated, instead of waiting for the whole reply.
+# Sections are plain text, so the section writers run without tools.
+def section_prompt(index: int, section: str) -> HumanMessage:
+    """The writer's instruction for one section of the research findings."""
+    return HumanMessage(content=f"Write part {index + 1} of the answer, covering these research "
+                                f"findings. Do not repeat other parts.\n\n{section}")
+
+def pipelined_update(reply: AIMessage, pipeline: SectionPipeline, sections) -> AgentState:
+    """The state update of a pipelined research step: the findings plus the assembled draft."""
+    pipeline.report().print_summary()
+    draft = AIMessage(content="\n\n".join(section.content for section in sections), name="writer")
+    return {
+        "messages": [reply, draft],
+        "next_agent": "reviewer",
+        "sender": "writer",
+        "llm_calls": 1 + len(sections)
     }
 
+def pipelined_research_node(state: AgentState) -> AgentState:
+    """Node: Research agent streams findings; writer calls start on each finished section."""
+    print("   🔍 Research agent: Gathering information (pipelined into the writer)...")
+    messages = state["messages"]
+    reply, pipeline = stream_agent(
+        "research", messages,
+        lambda index, section: call_agent("writer", [*messages, section_prompt(index, section)], tools=False))
+    
+    # A tool call (or an empty reply) goes through the normal route instead
+    if reply.tool_calls or not pipeline.sections:
+        pipeline.cancel()
+        return {"messages": [reply], "next_agent": "writer", "sender": "research", "llm_calls": 1}
+    return pipelined_update(reply, pipeline, pipeline.results())
+
+async def apipelined_research_node(state: AgentState) -> AgentState:
+    """Node (async): Research agent streams findings; writer tasks start on each finished section."""
+    print("   🔍 Research agent: Gathering information (pipelined into the writer)...")
+    messages = state["messages"]
+    
+    async def write_section(index: int, section: str) -> AIMessage:
+        return await acall_agent("writer", [*messages, section_prompt(index, section)], tools=False)
+    
+    reply, pipeline = await astream_agent("research", messages, write_section)
+    if reply.tool_calls or not pipeline.sections:
+        pipeline.cancel()
+        return {"messages": [reply], "next_agent": "writer", "sender": "research", "llm_calls": 1}
+    return pipelined_update(reply, pipeline, await pipeline.aresults())
+
 def routing_logic(state: AgentState) -> str:
     """Routing logic: Determines which agent acts next."""
     # Check the last message to see if we need to execute tools
@@ -170,59 +432,77 @@ def routing_logic(state: AgentState) -> str:
     
     return next_agent
 
-def create_multi_agent_graph() -> StateGraph:
-    """Create the multi-agent workflow graph."""
+def tool_return_logic(state: AgentState) -> str:
+    """Routing logic after tools: results go back to the agent that asked for them."""
+    return state["sender"]
+
+# The workflow's configuration: the tools the tools node executes, and where
+# each agent may hand off to (routing_logic picks one of these per step)
+TOOLS = [research_tool, write_tool, review_tool]
+ROUTES = {
+    "research": ["tools", "writer", END],
+    "writer": ["tools", "reviewer", END],
+    "reviewer": ["tools", END],
+}
+# Pipelined research hands the assembled draft straight to the reviewer
+PIPELINED_ROUTES = {**ROUTES, "research": ["tools", "writer", "reviewer", END]}
+
+def create_multi_agent_graph(checkpointer=None, tools=None, routes=None, pipelined: bool = False) -> StateGraph:
+    """Create the multi-agent workflow graph.
+
+    Pass a checkpointer (see `agents.checkpoint`) to persist state after every
+    node so a failed or interrupted run can be resumed by thread ID. Long-lived
+    processes should use `get_multi_agent_graph()`, which compiles once.
+    With `pipelined=True` the writer starts on streamed research sections.
+    """
     print("🔧 Building LangGraph workflow...")
+    tools = TOOLS if tools is None else tools
+    routes = (PIPELINED_ROUTES if pipelined else ROUTES) if routes is None else routes
     
     # Initialize the graph
     workflow = StateGraph(AgentState)
     
-    # Add nodes for each agent
-    workflow.add_node("research", research_node)
-    workflow.add_node("writer", writer_node)
-    workflow.add_node("reviewer", reviewer_node)
+    # Add nodes for each agent. Each node has a sync and an async
+    # implementation: `invoke` uses the first, `ainvoke`/`astream` the second.
+    if pipelined:
+        workflow.add_node("research", RunnableLambda(pipelined_research_node, afunc=apipelined_research_node,
+                                                     name="research"))
+    else:
+        workflow.add_node("research", RunnableLambda(research_node, afunc=aresearch_node, name="research"))
+    workflow.add_node("writer", RunnableLambda(writer_node, afunc=awriter_node, name="writer"))
+    workflow.add_node("reviewer", RunnableLambda(reviewer_node, afunc=areviewer_node, name="reviewer"))
     
     # Add a tools node to execute tool calls
-    tools = [research_tool, write_tool, review_tool]
-    workflow.add_node("tools", ToolNode(tools))
+    # (several calls in one AIMessage run concurrently, each bounded by a timeout)
+    workflow.add_node("tools", ConcurrentToolNode(tools, max_workers=8, timeout=30))
     
     # Set entry point
     workflow.set_entry_point("research")
     
     # Add conditional edges based on routing logic
-    workflow.add_conditional_edges(
-        "research",
-        routing_logic,
-        {
-            "tools": "tools",
-            "writer": "writer",
-            END: END
-        }
-    )
+    for agent, targets in routes.items():
+        workflow.add_conditional_edges(agent, routing_logic, {target: target for target in targets})
     
-    workflow.add_conditional_edges(
-        "writer",
-        routing_logic,
-        {
-            "tools": "tools",
-            "reviewer": "reviewer",
-            END: END
-        }
-    )
-    
-    workflow.add_conditional_edges(
-        "reviewer",
-        routing_logic,
-        {
-            "tools": "tools",
-            END: END
-        }
-    )
+    # After executing tools, return to the calling agent (recorded in `sender`)
+    callers = [agent for agent, targets in routes.items() if "tools" in targets]
+    workflow.add_conditional_edges("tools", tool_return_logic, {agent: agent for agent in callers})
     
-    # After executing tools, return to the calling agent
-    workflow.add_edge("tools", "reviewer")
-    
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+# Compiled graphs are cached per configuration (tools, routing table,
+# checkpointer) and shared by every run in this process. The models are not
+# part of the key: nodes fetch them from `agent_pool` at call time.
+graph_registry = GraphRegistry()
+graph_registry.register("multi_agent", create_multi_agent_graph)
+
+def get_multi_agent_graph(checkpointer=None, mode: str = None):
+    """Return the shared compiled workflow, building and validating it on first use.
+
+    `mode` is "sequential" or "pipelined" (default: PIPELINE_MODE).
+    """
+    pipelined = (mode or pipeline_mode()) == PIPELINED
+    return graph_registry.get("multi_agent", checkpointer=checkpointer, tools=TOOLS,
+                              routes=PIPELINED_ROUTES if pipelined else ROUTES, pipelined=pipelined)
 
 def visualize_graph(graph: StateGraph):
     """Visualize the LangGraph workflow."""
@@ -244,25 +524,160 @@ def visualize_graph(graph: StateGraph):
     except Exception as e:
         print(f"⚠️  Could not generate Mermaid diagram: {e}")
     
-    # Try to get PNG visualization if available
+    # SVG is always drawn locally (instant, no network needed)
     try:
-        graph_png = graph.get_graph().draw_mermaid_png()
-        output_path = "python/visualizations/03_langgraph_workflow.png"
-        os.makedirs("python/visualizations", exist_ok=True)
-        with open(output_path, "wb") as f:
-            f.write(graph_png)
-        print(f"✅ Saved PNG diagram to: {output_path}")
+        svg_path = write_svg(graph.get_graph(), "python/visualizations/03_langgraph_workflow.svg")
+        print(f"✅ Saved SVG diagram to: {svg_path}")
+    except Exception as e:
+        print(f"⚠️  Could not generate SVG diagram: {e}")
+    
+    # PNG comes from the Mermaid service when it is reachable, otherwise it is
+    # drawn locally (GRAPH_RENDERER=local|remote forces one or the other)
+    try:
+        result = render_workflow(graph.get_graph(), "python/visualizations/03_langgraph_workflow.png")
+        print(f"✅ Saved PNG diagram to: {result.path} ({result.renderer} renderer, {result.seconds:.2f}s)")
+        if result.fallback_reason:
+            print(f"   Rendered locally because {result.fallback_reason}")
     except Exception as e:
         print(f"⚠️  Could not generate PNG diagram: {e}")
         print("   This is okay - you can still view the Mermaid diagram online!")
 
-def main():
-    """Run the real LangGraph multi-agent demonstration."""
+def compare_graph_renderers(graph, repeat: int = 3):
+    """Print how long each way of drawing the workflow diagram takes."""
+    timings = compare_renderers(graph.get_graph(), "python/visualizations", repeat=repeat)
+    print(f"⏱️  Diagram rendering (best of {repeat}):")
+    for name, seconds in timings.items():
+        shown = f"{seconds * 1000:8.1f} ms" if seconds is not None else "     unavailable (no network)"
+        print(f"   {name:<11} {shown}")
+
+# Per-node latency/token/cost spans for every run, exported as JSON lines
+tracer = Tracer(export_path=os.getenv("TRACE_EXPORT_PATH", "python/visualizations/03_traces.jsonl"))
+
+def traced_config(config: dict = None) -> dict:
+    """Add the tracer to a run config (keeping any callbacks already there)."""
+    config = dict(config or {})
+    config["callbacks"] = [*(config.get("callbacks") or []), tracer]
+    return config
+
+async def arun_workflow(graph, initial_state: AgentState, config: dict = None) -> AgentState:
+    """Run the workflow on the event loop using the async node implementations."""
+    return await graph.ainvoke(initial_state, config=traced_config(config))
+
+async def astream_workflow(graph, initial_state: AgentState, config: dict = None):
+    """Yield each node's state update as the async workflow progresses."""
+    async for update in graph.astream(initial_state, config=traced_config(config), stream_mode="updates"):
+        yield update
+
+def run_workflow(graph, initial_state: AgentState, config: dict = None) -> AgentState:
+    """Synchronous wrapper around `arun_workflow` for scripts and `main()`."""
+    return asyncio.run(arun_workflow(graph, initial_state, config))
+
+async def astream_workflow_tokens(graph, initial_state: AgentState, config: dict = None,
+                                  on_token=None) -> StreamReport:
+    """Run the workflow, forwarding each agent's tokens as they are generated."""
+    return await astream_tokens(graph, initial_state, config=traced_config(config), on_token=on_token)
+
+def stream_workflow(graph, initial_state: AgentState, config: dict = None, on_token=None) -> StreamReport:
+    """Synchronous wrapper around `astream_workflow_tokens` (prints tokens by default)."""
+    return stream_tokens(graph, initial_state, config=traced_config(config), on_token=on_token)
+
+def build_initial_state(task: dict) -> AgentState:
+    """Turn a batch task (`{"id": ..., "task": "..."}`) into the graph's input state."""
+    return {
+        "messages": [HumanMessage(content=task["task"])],
+        "next_agent": "writer"
+    }
+
+def summarize_workflow(final_state: AgentState) -> dict:
+    """Per-task result line: the final output plus how many model calls it took."""
+    return {**default_summarize(final_state), "llm_calls": final_state.get("llm_calls", 0)}
+
+def run_batch_file(tasks_path: str, output_path: str, concurrency: int = 8, mode: str = None):
+    """Run every task in a JSONL file through one compiled graph."""
+    print(f"📦 Running batch from {tasks_path} (concurrency={concurrency}, {mode or pipeline_mode()})")
+    graph = get_multi_agent_graph(mode=mode)
+    llm_calls = []
+    
+    def summarize(final_state):
+        result = summarize_workflow(final_state)
+        llm_calls.append(result["llm_calls"])
+        return result
+    
+    report = run_batch(
+        graph,
+        load_tasks(tasks_path),
+        build_initial_state,
+        concurrency=concurrency,
+        output_path=output_path,
+        summarize=summarize,
+        config=traced_config(),
+        # Batch calls yield to interactive ones; each task is its own workflow for fair queuing
+        task_scope=lambda task: scheduler_scope(workflow=f"batch-{task.get('id')}", priority="batch"),
+    )
+    print(f"\n✅ Results written to: {output_path}")
+    report.print_summary()
+    if llm_calls:
+        print(f"🔢 LLM calls per task: {sum(llm_calls) / len(llm_calls):.2f} "
+              f"(min {min(llm_calls)}, max {max(llm_calls)})")
+    print(f"🚦 Scheduler: {scheduler.stats()}")
+    print("🪁 Hedging and deadlines:")
+    hedger.print_stats()
+    print("🧭 Model routing:")
+    router.print_stats()
+    print("🚧 Quality gate:")
+    quality_gate.print_stats()
+    if tool_cache.stats():
+        print("🧰 Tool cache:")
+        tool_cache.print_stats()
+    return report
+
+def serve_workflow(host: str = "127.0.0.1", port: int = 8080, mode: str = None):
+    """Serve the shared compiled workflow over HTTP (see `agents.service`)."""
+    from agents.service import serve
+    
+    serve(
+        get_multi_agent_graph(mode=mode),
+        build_initial_state,
+        summarize=summarize_workflow,
+        host=host,
+        port=port,
+        max_in_flight=int(os.getenv("SERVICE_MAX_IN_FLIGHT", "32")),
+        max_queue=int(os.getenv("SERVICE_MAX_QUEUE", "64")),
+        per_client=int(os.getenv("SERVICE_PER_CLIENT", "8")),
+    )
+
+def compare_pipeline_modes(repeat: int = 3):
+    """Time the demo task end to end in sequential and pipelined mode."""
+    initial_state = build_initial_state({"task": "Research and create a summary about multi-agent AI systems."})
+    
+    async def run(mode: str):
+        return await get_multi_agent_graph(mode=mode).ainvoke(initial_state)
+    
+    async def compare():
+        # One untimed run per mode first, so model setup and tool caching don't count
+        for mode in ("sequential", PIPELINED):
+            await run(mode)
+        return await acompare_modes(run, repeat=repeat)
+    
+    summaries = asyncio.run(compare())
+    print(f"\n⏱️  End-to-end latency, sequential vs pipelined ({repeat} runs each):")
+    print_comparison(summaries)
+    return summaries
+
+def main(stream: bool = True, thread_id: str = None, resume: bool = False, mode: str = None):
+    """Run the real LangGraph multi-agent demonstration.
+
+    With a `thread_id` every step is checkpointed to disk; `resume=True`
+    continues that thread from its last completed node instead of starting over.
+    `mode="pipelined"` starts the writer on the research output as it streams.
+    """
     print("🚀 Real LangGraph Multi-Agent Workflow\n")
     print("=" * 60)
     
-    # Create the graph
-    graph = create_multi_agent_graph()
+    # Create the graph (checkpointed when the run has a thread ID)
+    checkpointer = get_checkpointer() if thread_id else None
+    graph = get_multi_agent_graph(checkpointer=checkpointer, mode=mode)
+    config = thread_config(thread_id) if thread_id else None
     
     # Visualize the graph
     visualize_graph(graph)
@@ -277,11 +692,28 @@ def main():
         "next_agent": "writer"
     }
     
-    print("\n📝 Task: Research and create a summary about multi-agent AI systems")
+    if resume:
+        pending = next_nodes(graph, thread_id)
+        if not pending:
+            print(f"\n⚠️  Thread '{thread_id}' has no unfinished steps - starting a new run")
+        else:
+            # A None input tells LangGraph to continue from the saved checkpoint
+            print(f"\n⏯️  Resuming thread '{thread_id}' at: {', '.join(pending)}")
+            initial_state = None
+    
+    if initial_state is not None:
+        print("\n📝 Task: Research and create a summary about multi-agent AI systems")
     print("\n🔄 Agent collaboration starting...\n")
     
-    # Execute the workflow
-    final_state = graph.invoke(initial_state)
+    # Execute the workflow (async nodes, driven from this sync entry point),
+    # streaming each agent's tokens to the console as they arrive
+    if stream:
+        report = stream_workflow(graph, initial_state, config)
+        final_state = report.final_state
+        print("\n")
+        report.print_ttft()
+    else:
+        final_state = run_workflow(graph, initial_state, config)
     
     print("\n" + "=" * 60)
     print("✅ Workflow complete!")
@@ -300,6 +732,33 @@ def main():
         elif isinstance(msg, ToolMessage):
             print(f"\n🔧 Tool Result: {msg.content[:150]}...")
     
+    print(f"\n🔢 LLM calls in this workflow: {final_state.get('llm_calls', 0)}")
+    print("\n⏱️  Where the time and money went:")
+    tracer.print_summary()
+    if tracer.export_path:
+        print(f"   Spans exported to: {tracer.export_path}")
+    
+    if tool_cache.stats():
+        print("\n🧰 Tool cache:")
+        tool_cache.print_stats()
+    
+    if checkpointer is not None:
+        print(f"\n💾 Checkpoints ({checkpointer.path}): {checkpointer.storage_stats()}")
+    
+    print(f"\n🚦 Scheduler: {scheduler.stats()}")
+    print("🪁 Hedging and deadlines:")
+    hedger.print_stats()
+    print("🧭 Model routing:")
+    router.print_stats()
+    print("🚧 Quality gate:")
+    quality_gate.print_stats()
+    print(f"♻️  Agent builds this process: {agent_pool.stats()}")
+    print(f"♻️  Graph builds this process: {graph_registry.stats()}")
+    if response_cache is not None:
+        stats = response_cache.stats()
+        print(f"💾 Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"~${stats['cost_saved_usd']:.4f} saved")
+    
     print("\n" + "=" * 60)
     print("🎓 Learning Summary")
     print("=" * 60)
@@ -307,7 +766,7 @@ def main():
     print("   • How to create a REAL LangGraph multi-agent workflow")
     print("   • Building StateGraph with multiple nodes")
     print("   • Implementing routing logic between agents")
-    print("   • Using ToolNode for tool execution")
+    print("   • Executing tool calls concurrently in a tools node")
     print("   • Visualizing workflows with Mermaid diagrams")
     print("\n💡 Next steps:")
     print("   1. Modify the agents' prompts and tools")
@@ -320,5 +779,43 @@ def main():
     print("   • Multi-Agent Guide: https://blog.langchain.com/langgraph-multi-agent-workflows")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", metavar="TASKS_JSONL",
+                        help="Run every task in a JSONL file instead of the demo task")
+    parser.add_argument("--output", default="python/visualizations/03_batch_results.jsonl",
+                        help="Where to write per-task batch results (JSONL)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Maximum number of workflows in flight during a batch")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Wait for the full result instead of streaming tokens")
+    parser.add_argument("--thread-id",
+                        help="Checkpoint every step under this thread ID (see CHECKPOINT_PATH)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the --thread-id run from its last completed node")
+    parser.add_argument("--compare-renderers", action="store_true",
+                        help="Time the local and remote diagram renderers and exit")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Start the writer on research sections as they stream (default: PIPELINE_MODE)")
+    parser.add_argument("--compare-pipeline", type=int, metavar="RUNS", nargs="?", const=3,
+                        help="Time the demo task in sequential and pipelined mode and exit")
+    parser.add_argument("--serve", action="store_true",
+                        help="Serve the workflow over HTTP (/invoke, /stream, /batch, /metrics)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to serve on (with --serve)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to serve on (with --serve)")
+    args = parser.parse_args()
+    mode = PIPELINED if args.pipelined else None
+    
+    if args.serve:
+        serve_workflow(args.host, args.port, mode=mode)
+    elif args.compare_renderers:
+        compare_graph_renderers(get_multi_agent_graph())
+    elif args.compare_pipeline:
+        compare_pipeline_modes(args.compare_pipeline)
+    elif args.batch:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        run_batch_file(args.batch, args.output, args.concurrency, mode=mode)
+    else:
+        if args.resume and not args.thread_id:
+            parser.error("--resume requires --thread-id")
+        main(stream=not args.no_stream, thread_id=args.thread_id, resume=args.resume, mode=mode)
 
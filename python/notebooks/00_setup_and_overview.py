@@ -13,18 +13,18 @@ To convert to Jupyter notebook, run:
 
 import os
 import sys
+from importlib.metadata import PackageNotFoundError, version
 
 # Check Python version
 print(f"Python: {sys.version}\n")
 
-# Verify installations
+# Verify installations (versions come from package metadata, so this
+# doesn't pay for importing langchain/langgraph)
 print("Verifying installations...")
 try:
-    import langchain
-    import langgraph
-    print(f"✅ LangChain: {langchain.__version__}")
-    print(f"✅ LangGraph installed")
-except ImportError as e:
+    print(f"✅ LangChain: {version('langchain')}")
+    print(f"✅ LangGraph: {version('langgraph')}")
+except PackageNotFoundError as e:
     print(f"❌ Missing: {e}")
     sys.exit(1)
 
@@ -15,13 +15,14 @@ To use: Convert this .py file to a Jupyter notebook
 
 import os
 import sys
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 from dotenv import load_dotenv
 
 # Load environment
 load_dotenv('python/.env')
 
+# Make the shared `agents` package importable (the notebook runs from the repo root)
+sys.path.insert(0, os.path.abspath('python'))
+
 # Configuration
 OUTPUT_DIR = 'python/visualizations'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -41,17 +42,16 @@ print("=" * 60)
 # Check Python version
 print(f"✅ Python: {sys.version.split()[0]}")
 
-# Check imports
+# Check installed packages (read from package metadata - nothing heavy is imported yet)
+from importlib.metadata import PackageNotFoundError, version
+
 try:
-    from langchain_openai import ChatOpenAI
-    from langgraph.graph import StateGraph, END
-    import langchain
-    import langgraph
-    print(f"✅ LangChain: {langchain.__version__}")
-    print(f"✅ LangGraph: {langgraph.__version__}")
-except ImportError as e:
-    print(f"❌ Import error: {e}")
-    print("   Run: pip install langchain langgraph")
+    print(f"✅ LangChain: {version('langchain')}")
+    print(f"✅ LangGraph: {version('langgraph')}")
+    print(f"✅ LangChain OpenAI: {version('langchain-openai')}")
+except PackageNotFoundError as e:
+    print(f"❌ Missing package: {e}")
+    print("   Run: pip install langchain langgraph langchain-openai")
 
 # Check API key
 api_key = os.getenv('OPENAI_API_KEY')
@@ -73,6 +73,9 @@ Let's visualize the two main patterns for multi-agent systems:
 2. **Handoffs**: Agents pass control directly to each other
 """
 
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+
 def visualize_agent_patterns():
     """Visualize the two main multi-agent patterns."""
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
@@ -169,9 +172,14 @@ plt.show()
 Let's build a simple multi-agent system that demonstrates the concepts.
 """
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage
 from langgraph.graph import StateGraph, END
+from agents.cache import get_response_cache
+from agents.pipeline import PIPELINED, SectionPipeline, compare_modes, pipeline_mode, print_comparison
+from agents.quality_gate import QualityGate
+from agents.registry import GraphRegistry
+from agents.router import get_router
+from agents.streaming import stream_tokens
 from typing import TypedDict, Annotated, Sequence
 import operator
 
@@ -180,51 +188,118 @@ class SimpleState(TypedDict):
     messages: Annotated[Sequence[HumanMessage | AIMessage], operator.add]
     stage: str  # Current stage in the workflow
 
+# Each agent's quality tier and temperature. The model router picks a model
+# of that tier from the pool (LLM_MODEL_POOL) by live latency, errors and cost
+# - the reviewer only needs a fast, cheap one - and fails over across providers
+SIMPLE_MODELS = {
+    "research": {"tier": "standard", "temperature": 0},
+    "writer": {"tier": "standard", "temperature": 0.7},
+    "reviewer": {"tier": "fast", "temperature": 0},
+}
+
+# The reviewer's local quality gate, shared by every compiled variant
+quality_gate = QualityGate.from_env(
+    expected_review_seconds=lambda: get_router().expected_latency(SIMPLE_MODELS["reviewer"]["tier"]))
+
 # Create a simple 3-agent workflow
-def create_simple_workflow():
-    """Create a simple workflow with 3 agents."""
+def create_simple_workflow(models=SIMPLE_MODELS, pipelined=False):
+    """Create a simple workflow with 3 agents.
+
+    With `pipelined=True` the writer starts on each finished section of the
+    research reply while the rest of it is still streaming.
+    """
     print("🔧 Building simple 3-agent workflow...")
     
     # Create different agents with different personalities
-    research_agent = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    writer_agent = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-    reviewer_agent = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    # (set LLM_PROVIDER=fake in python/.env to run offline)
+    # The temperature-0 agents reuse cached answers when LLM_CACHE_PATH is set
+    response_cache = get_response_cache()
+    router = get_router()
+    def model_for(name):
+        settings = models[name]
+        cache = response_cache if settings["temperature"] == 0 else False
+        return lambda option: router.chat_model(option, temperature=settings["temperature"], cache=cache)
+    def make_agent(name):
+        model = model_for(name)
+        def invoke(messages):
+            return router.invoke(models[name]["tier"], lambda option: model(option).invoke(messages))
+        return invoke
+    research_agent = make_agent("research")
+    writer_agent = make_agent("writer")
+    reviewer_agent = make_agent("reviewer")
     
     # Define agent nodes
     def research_node(state: SimpleState) -> SimpleState:
         print("   🔍 Research Agent: Working...")
         prompt = "You are a research assistant. Analyze and summarize the topic."
-        response = research_agent.invoke([HumanMessage(content=prompt), state["messages"][-1]])
+        response = research_agent([HumanMessage(content=prompt), state["messages"][-1]])
         return {"messages": [response], "stage": "writer"}
     
     def writer_node(state: SimpleState) -> SimpleState:
         print("   ✍️  Writer Agent: Working...")
         prompt = "You are a content writer. Write engaging content based on the research."
-        response = writer_agent.invoke([HumanMessage(content=prompt), state["messages"][-1]])
+        response = writer_agent([HumanMessage(content=prompt), state["messages"][-1]])
         return {"messages": [response], "stage": "reviewer"}
     
+    def pipelined_research_node(state: SimpleState) -> SimpleState:
+        print("   🔍 Research Agent: Working (the writer starts on each finished section)...")
+        prompt = "You are a research assistant. Analyze and summarize the topic."
+        writer_prompt = "You are a content writer. Write engaging content based on this part of the research."
+        research_model = model_for("research")
+        pipelines = []
+        def attempt(option):
+            # A failed-over attempt starts again with a fresh pipeline
+            for pipeline in pipelines:
+                pipeline.cancel()
+            pipelines.append(SectionPipeline(lambda index, section: writer_agent(
+                [HumanMessage(content=writer_prompt), HumanMessage(content=section)])))
+            return pipelines[-1].consume(research_model(option).stream(
+                [HumanMessage(content=prompt), state["messages"][-1]]))
+        research = router.invoke(models["research"]["tier"], attempt)
+        sections = pipelines[-1].results()
+        pipelines[-1].report().print_summary()
+        draft = AIMessage(content="\n\n".join(section.content for section in sections))
+        return {"messages": [research, draft], "stage": "reviewer"}
+    
     def reviewer_node(state: SimpleState) -> SimpleState:
         print("   📋 Reviewer Agent: Working...")
         prompt = "You are a quality reviewer. Provide feedback on the content."
-        response = reviewer_agent.invoke([HumanMessage(content=prompt), state["messages"][-1]])
+        draft = state["messages"][-1]
+        # With QUALITY_GATE=on, clearly broken drafts are rejected locally; the rest reach the LLM
+        response = quality_gate.review(
+            draft.content,
+            lambda: reviewer_agent([HumanMessage(content=prompt), draft]),
+            on_skip=lambda result: AIMessage(content=result.feedback(), name="quality_gate"),
+        )
         return {"messages": [response], "stage": END}
     
     # Build the graph
     workflow = StateGraph(SimpleState)
-    workflow.add_node("research", research_node)
-    workflow.add_node("writer", writer_node)
+    workflow.add_node("research", pipelined_research_node if pipelined else research_node)
+    if not pipelined:
+        workflow.add_node("writer", writer_node)
     workflow.add_node("reviewer", reviewer_node)
     
-    # Define flow
+    # Define flow (pipelined research hands its assembled draft straight to review)
     workflow.set_entry_point("research")
-    workflow.add_edge("research", "writer")
-    workflow.add_edge("writer", "reviewer")
+    if pipelined:
+        workflow.add_edge("research", "reviewer")
+    else:
+        workflow.add_edge("research", "writer")
+        workflow.add_edge("writer", "reviewer")
     workflow.add_edge("reviewer", END)
     
     return workflow.compile()
 
+# Compile once per model configuration. Later cells (and your experiments)
+# call `graph_registry.get(...)` and reuse the same compiled graph; changing
+# SIMPLE_MODELS builds a new one, `graph_registry.invalidate()` forces it
+# (PIPELINE_MODE=pipelined picks the pipelined variant)
+graph_registry = GraphRegistry()
+graph_registry.register("simple", create_simple_workflow)
+
 print("\n🚀 Creating simple multi-agent workflow...")
-simple_workflow = create_simple_workflow()
+simple_workflow = graph_registry.get("simple", models=SIMPLE_MODELS, pipelined=pipeline_mode() == PIPELINED)
 
 # Visualize it
 print("\n📊 Visualizing workflow structure...")
@@ -266,8 +341,15 @@ initial_state = {
 print("\n📝 Task: Create a brief summary about multi-agent AI systems")
 print("\n🔄 Starting agent collaboration...\n")
 
-# Run the workflow
-final_state = simple_workflow.invoke(initial_state)
+# Run the workflow, streaming each agent's tokens as they are generated
+report = stream_tokens(simple_workflow, initial_state)
+final_state = report.final_state
+print("\n")
+report.print_ttft()
+print("\n🧭 Models the router picked:")
+get_router().print_stats()
+print("🚧 Reviewer quality gate:")
+quality_gate.print_stats()
 
 print("\n" + "=" * 60)
 print("✅ Workflow complete!")
@@ -283,7 +365,27 @@ for i, msg in enumerate(final_state["messages"], 1):
     print()
 
 # ============================================================================
-# CELL 5: Experiment and Customize
+# CELL 5: Pipelined vs Sequential
+# ============================================================================
+"""
+# ⏩ Pipelined vs Sequential
+
+In the workflow above the writer waits for the whole research reply. The
+pipelined variant streams the research and starts a writer call on each
+finished section. Let's time both end to end.
+"""
+
+def run_in_mode(mode):
+    graph = graph_registry.get("simple", models=SIMPLE_MODELS, pipelined=mode == PIPELINED)
+    return graph.invoke(initial_state)
+
+print("\n⏱️  Timing both modes (3 runs each)...\n")
+summaries = compare_modes(run_in_mode, repeat=3)
+print("\n⏱️  End-to-end latency:")
+print_comparison(summaries)
+
+# ============================================================================
+# CELL 6: Experiment and Customize
 # ============================================================================
 """
 # 🎨 Experiment and Customize
@@ -303,6 +405,7 @@ print("   • Multi-agent patterns (Tool Calling vs Handoffs)")
 print("   • Building LangGraph workflows")
 print("   • Visualizing agent architectures")
 print("   • Running agent collaborations")
+print("   • Pipelining agents on streamed output")
 print("\n💡 Next steps:")
 print("   • Run: python python/examples/03_langgraph_real_multi_agent.py")
 print("   • Explore LangSmith for debugging")
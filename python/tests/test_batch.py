@@ -0,0 +1,12 @@
+"""A bad task line fails that task only."""
+
+from agents.batch import load_tasks
+
+
+def test_non_object_lines_become_parse_errors(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text('{"id": "t1", "task": "ok"}\n42\n[1]\nnull\n"plain task"\n{not json\n')
+    tasks = list(load_tasks(str(path)))
+    assert [t["id"] for t in tasks] == ["t1", "2", "3", "4", "5", "6"]
+    assert [("parse_error" in t) for t in tasks] == [False, True, True, True, False, True]
+    assert tasks[4]["task"] == "plain task"
@@ -0,0 +1,80 @@
+"""A resumed run must see exactly the history that was checkpointed."""
+
+import operator
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.graph import END, StateGraph
+
+from agents.checkpoint import SQLiteCheckpointer, resume_run, thread_config
+from agents.history import windowed_add
+
+
+def build_graph(reducer, checkpointer, turns: int, interrupt: bool = False):
+    class State(TypedDict):
+        messages: Annotated[List[BaseMessage], reducer]
+        turn: int
+
+    def chat(state):
+        n = state.get("turn", 0) + 1
+        return {"turn": n, "messages": [AIMessage(content=f"step {n} " + "word " * 8)]}
+
+    def more(state):
+        return "chat" if state["turn"] < turns else END
+
+    workflow = StateGraph(State)
+    workflow.add_node("chat", chat)
+    workflow.set_entry_point("chat")
+    workflow.add_conditional_edges("chat", more)
+    return workflow.compile(checkpointer=checkpointer, interrupt_after=["chat"] if interrupt else None)
+
+
+def contents(messages) -> List[str]:
+    return [str(m.content) for m in messages]
+
+
+def run_and_reload(tmp_path, reducer, turns: int = 6):
+    """Every history a run went through, and the same checkpoints read back after a restart."""
+    path = str(tmp_path / "checkpoints.sqlite")
+    graph = build_graph(reducer, SQLiteCheckpointer(path), turns)
+    seen = [contents(values["messages"]) for values in graph.stream(
+        {"messages": [HumanMessage(content="Task: keep chatting")]}, thread_config("t"), stream_mode="values")]
+    # A fresh saver on the same file, as when resuming after a crash
+    reloaded = build_graph(reducer, SQLiteCheckpointer(path), turns)
+    history = [contents(state.values["messages"]) for state in reloaded.get_state_history(thread_config("t"))
+               if state.values.get("messages")]
+    return seen, history[::-1]
+
+
+def test_trimmed_history_resumes_unchanged(tmp_path):
+    seen, reloaded = run_and_reload(tmp_path, windowed_add(max_tokens=50, summarize=True, low_water=0.9))
+    assert any("summary" in text.lower() for text in seen[-1])  # The window was trimmed
+    assert reloaded == seen
+
+
+def test_resume_after_trim_continues_from_checkpoint(tmp_path):
+    reducer = windowed_add(max_tokens=50, summarize=True, low_water=0.9)
+    path = str(tmp_path / "checkpoints.sqlite")
+    graph = build_graph(reducer, SQLiteCheckpointer(path), turns=5, interrupt=True)
+    config = thread_config("t")
+    values = graph.invoke({"messages": [HumanMessage(content="Task: keep chatting")]}, config)
+    while graph.get_state(config).next:
+        # A process resuming this thread after a crash sees what the run saw
+        restarted = build_graph(reducer, SQLiteCheckpointer(path), turns=5, interrupt=True)
+        assert contents(restarted.get_state(config).values["messages"]) == contents(values["messages"])
+        values = resume_run(graph, "t")
+
+
+def test_append_only_history_is_stored_as_deltas(tmp_path):
+    seen, reloaded = run_and_reload(tmp_path, operator.add)
+    assert reloaded == seen
+    assert SQLiteCheckpointer(str(tmp_path / "checkpoints.sqlite")).storage_stats()["delta_blobs"] > 0
+
+
+def test_list_changed_in_the_middle_is_stored_in_full(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.sqlite"))
+    key = ("t", "", "messages")
+    h, a, b, c, summary = "h", "a", "b", "c", "summary"
+    assert saver._encode_blob(key, "1", [h, a, b])[0] == "full"
+    assert saver._encode_blob(key, "2", [h, a, b, c])[0] == "delta"
+    assert saver._encode_blob(key, "3", [h, summary, b, c, "d"])[0] == "full"
@@ -0,0 +1,98 @@
+"""Deadlines bound the whole call, and errors are not covered up by fallbacks."""
+
+import asyncio
+import time
+
+import pytest
+
+from agents.hedging import Hedger, HedgePolicy
+
+
+async def slow(duplicate):
+    await asyncio.sleep(10)
+
+
+def test_fallback_runs_within_the_node_deadline():
+    hedger = Hedger()
+    fallback_started = []
+
+    async def slow_fallback(duplicate):
+        fallback_started.append(time.perf_counter())
+        await asyncio.sleep(10)
+
+    async def scenario():
+        started = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            await hedger.acall("node", slow, fallbacks=[slow_fallback], deadline=0.2)
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(scenario())
+    assert elapsed < 0.3  # Not 2x the deadline
+    assert fallback_started
+
+
+def test_sync_fallback_runs_within_the_node_deadline():
+    hedger = Hedger()
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        hedger.call("node", lambda duplicate: time.sleep(0.5), deadline=0.2,
+                    fallbacks=[lambda duplicate: time.sleep(0.5)])
+    assert time.perf_counter() - started < 0.3
+
+
+def test_errors_are_raised_not_answered_from_the_cache():
+    hedger = Hedger()
+
+    async def ok(duplicate):
+        return "first answer"
+
+    async def broken(duplicate):
+        raise ValueError("bad request")
+
+    async def fallback(duplicate):
+        return "fallback"
+
+    async def scenario():
+        await hedger.acall("node", ok, request_key="k", deadline=1)
+        with pytest.raises(ValueError):
+            await hedger.acall("node", broken, fallbacks=[fallback], request_key="k", deadline=1)
+
+    asyncio.run(scenario())
+    with pytest.raises(ValueError):
+        hedger.call("node", lambda duplicate: (_ for _ in ()).throw(ValueError("bad")),
+                    fallbacks=[lambda duplicate: "fallback"], request_key="k", deadline=1)
+
+
+def test_timeouts_still_fall_back():
+    hedger = Hedger()
+
+    async def timed_out(duplicate):
+        raise asyncio.TimeoutError()
+
+    async def fallback(duplicate):
+        return "fallback"
+
+    assert asyncio.run(hedger.acall("node", timed_out, fallbacks=[fallback], deadline=1)) == "fallback"
+
+
+def test_cancelling_during_the_hedge_delay_cancels_the_primary():
+    hedger = Hedger(HedgePolicy(percentile=95, initial_delay=5))
+    cancelled = []
+
+    async def primary(duplicate):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(duplicate)
+            raise
+
+    async def scenario():
+        caller = asyncio.ensure_future(hedger.acall("node", primary))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.01)
+        assert cancelled == [False]
+
+    asyncio.run(scenario())
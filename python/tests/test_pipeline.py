@@ -0,0 +1,80 @@
+"""Section cut points, result order and context propagation of the pipeline."""
+
+import asyncio
+import contextvars
+import time
+
+from langchain_core.messages import AIMessageChunk
+
+from agents.pipeline import SectionPipeline, SectionSplitter
+
+scope: contextvars.ContextVar = contextvars.ContextVar("scope", default=None)
+
+
+def chunks(text: str, size: int = 7):
+    return [AIMessageChunk(content=text[i:i + size]) for i in range(0, len(text), size)]
+
+
+def words(n: int, start: int = 0) -> str:
+    return " ".join(f"w{i}" for i in range(start, start + n))
+
+
+def test_cuts_at_paragraph_breaks_once_long_enough():
+    splitter = SectionSplitter(max_words=10, min_words=3)
+    assert splitter.feed("Title\n\n") == []  # Too short: kept with what follows
+    assert splitter.feed(words(4) + ".\n\nNext") == ["Title\n\n" + words(4) + "."]
+    assert splitter.flush() == "Next"
+    assert splitter.flush() is None
+
+
+def test_cuts_long_paragraphs_at_a_sentence_end():
+    splitter = SectionSplitter(max_words=5)
+    text = words(6) + ". " + words(3) + " 3.5 more"
+    sections = [s for piece in [text[i:i + 4] for i in range(0, len(text), 4)] for s in splitter.feed(piece)]
+    assert sections == [words(6) + "."]
+    assert splitter.flush() == words(3) + " 3.5 more"  # "3." followed by "5" is not a sentence end
+
+
+def test_results_are_in_section_order():
+    text = "\n\n".join(words(4, start=10 * i) for i in range(5))
+
+    def stage(index, section):
+        time.sleep(0.05 - index * 0.01)  # Later sections finish first
+        return index, section
+
+    pipeline = SectionPipeline(stage, SectionSplitter(max_words=10, min_words=2))
+    message = pipeline.consume(chunks(text))
+    results = pipeline.results()
+    assert [index for index, _ in results] == list(range(5))
+    assert [section for _, section in results] == text.split("\n\n")
+    assert message.content == text
+    assert pipeline.report().sections == 5
+
+
+def test_async_results_are_in_section_order():
+    text = "\n\n".join(words(4, start=10 * i) for i in range(4))
+
+    async def stage(index, section):
+        await asyncio.sleep(0.04 - index * 0.01)
+        return index
+
+    async def stream():
+        for chunk in chunks(text):
+            yield chunk
+
+    async def scenario():
+        pipeline = SectionPipeline(stage, SectionSplitter(max_words=10, min_words=2))
+        await pipeline.aconsume(stream())
+        return await pipeline.aresults()
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3]
+
+
+def test_stage_threads_see_the_callers_context():
+    pipeline = SectionPipeline(lambda index, section: scope.get(), SectionSplitter(max_words=10, min_words=2))
+    token = scope.set("workflow-7")
+    try:
+        pipeline.consume(chunks(words(4) + "\n\n" + words(4)))
+    finally:
+        scope.reset(token)
+    assert pipeline.results() == ["workflow-7", "workflow-7"]
@@ -0,0 +1,50 @@
+"""The quality gate must never approve drafts it cannot judge."""
+
+from agents.fake_llm import FakeChatModel
+from agents.quality_gate import FAIL, QualityGate
+from langchain_core.messages import HumanMessage
+
+RECIPE = (
+    "Preheat the oven to 180 degrees. Whisk two eggs with a cup of sugar until pale and fluffy. "
+    "Fold in the flour and a pinch of salt, then pour the batter into a greased tin. Bake for "
+    "thirty minutes, or until a skewer comes out clean. Let the cake cool before slicing it."
+)
+ABSURD = (
+    "Multi-agent systems were invented by the ancient Romans in 1998 to coordinate chariot races. "
+    "Each agent is a small horse that lives inside the GPU and votes on the next token. Because the "
+    "moon is made of graphs, supervisors must always be placed on the dark side of the cluster."
+)
+
+
+def reviewed_by_llm(gate: QualityGate, draft: str) -> bool:
+    calls = []
+    gate.review(draft, lambda: calls.append(draft), on_skip=lambda result: result)
+    return bool(calls)
+
+
+def word_salad() -> str:
+    model = FakeChatModel(completion_tokens=80)
+    return model.respond([HumanMessage(content="Summarize multi-agent AI systems.")]).content
+
+
+def test_gate_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("QUALITY_GATE", raising=False)
+    gate = QualityGate.from_env()
+    assert not gate.enabled
+    assert reviewed_by_llm(gate, RECIPE)
+
+
+def test_fluent_but_bad_drafts_go_to_the_llm(monkeypatch):
+    monkeypatch.setenv("QUALITY_GATE", "on")
+    monkeypatch.delenv("QUALITY_GATE_PASS_THRESHOLD", raising=False)
+    gate = QualityGate.from_env()
+    for draft in (RECIPE, ABSURD, word_salad()):
+        assert reviewed_by_llm(gate, draft), draft[:40]
+    assert gate.stats()["skip_rate"] == 0.0
+
+
+def test_broken_drafts_are_rejected_locally():
+    gate = QualityGate()
+    assert gate.evaluate("Too short.").verdict == FAIL
+    assert gate.evaluate(RECIPE + " As an AI language model I cannot do that.").verdict == FAIL
+    assert not reviewed_by_llm(gate, "Too short.")
@@ -0,0 +1,55 @@
+"""Local rate-limit queueing is not counted against a model."""
+
+import asyncio
+import time
+
+import pytest
+
+from agents.router import ModelOption, ModelRouter
+from agents.scheduler import RateLimitScheduler
+
+OPTION = ModelOption("openai", "gpt-4o-mini")
+
+
+def throttled_scheduler(seconds: float) -> RateLimitScheduler:
+    scheduler = RateLimitScheduler(limits={OPTION.model: (600, None)})
+    scheduler.budget(OPTION.model).paused_until = time.monotonic() + seconds
+    return scheduler
+
+
+async def provider_call():
+    await asyncio.sleep(0.01)
+    return "ok"
+
+
+def test_queued_healthy_model_is_not_timed_out_or_cooled_down():
+    router = ModelRouter([OPTION], timeout=0.1)
+    scheduler = throttled_scheduler(0.3)
+
+    async def scenario():
+        return await asyncio.gather(*(
+            router.ainvoke("standard", lambda option: scheduler.acall(option.model, provider_call))
+            for _ in range(4)))
+
+    assert asyncio.run(scenario()) == ["ok"] * 4
+    health = router.health[OPTION.label]
+    assert health.counts["errors"] == 0 and health.cooldown_until == 0.0
+    assert health.latency < 0.1  # The provider call, not the 0.3s queue
+
+
+def test_sync_latency_excludes_queueing():
+    router = ModelRouter([OPTION])
+    scheduler = throttled_scheduler(0.2)
+    router.invoke("standard", lambda option: scheduler.call(option.model, lambda: "ok"))
+    assert router.health[OPTION.label].latency < 0.1
+
+
+def test_slow_provider_call_still_times_out():
+    router = ModelRouter([OPTION], timeout=0.05)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(router.ainvoke("standard", lambda option: slow()))
+    assert router.health[OPTION.label].counts["errors"] == 1
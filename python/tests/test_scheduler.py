@@ -0,0 +1,89 @@
+"""Cancelled or unreachable waiters must not leak budget or stop the dispatcher."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.scheduler import RateLimitScheduler
+
+
+def paused_scheduler(seconds: float) -> RateLimitScheduler:
+    scheduler = RateLimitScheduler(limits={"m": (60, None)})
+    scheduler.budget("m").paused_until = time.monotonic() + seconds
+    return scheduler
+
+
+def test_cancelled_async_waiter_is_dequeued_and_not_charged():
+    scheduler = paused_scheduler(0.2)
+    level = scheduler.budget("m").requests.level
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.aacquire("m", 10), timeout=0.05)
+
+    asyncio.run(scenario())
+    assert scheduler.queue_depth() == {"interactive": 0, "batch": 0}
+    time.sleep(0.3)
+    assert scheduler.budget("m").requests.level >= level
+    assert scheduler.stats()["m"]["cancelled"] == 1
+
+
+def test_dispatcher_survives_a_grant_on_a_closed_loop():
+    scheduler = paused_scheduler(0.1)
+    loop = asyncio.new_event_loop()
+    future = loop.create_future()
+    # A waiter whose loop closed without cancelling it
+    scheduler._enqueue("m", 10, lambda: loop.call_soon_threadsafe(future.set_result, None))
+    loop.close()
+
+    granted = threading.Event()
+    threading.Thread(target=lambda: (scheduler.acquire("m", 10), granted.set()), daemon=True).start()
+    assert granted.wait(timeout=2)
+    assert scheduler.stats()["m"]["grant_errors"] == 1
+
+
+def test_openai_models_report_rate_limit_headers(monkeypatch):
+    from langchain_core.messages import AIMessage
+
+    from agents.providers import get_chat_model
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    assert get_chat_model(provider="openai").include_response_headers
+
+    scheduler = RateLimitScheduler()
+    reply = AIMessage(content="ok", response_metadata={"headers": {
+        "x-ratelimit-limit-requests": "120", "x-ratelimit-remaining-requests": "119",
+        "x-ratelimit-reset-requests": "0.5s",
+    }})
+    scheduler.call("m", lambda: reply)
+    assert scheduler.budget("m").requests.per_minute == 120
+
+
+def test_a_429_is_rescheduled_exactly_once(monkeypatch):
+    import httpx
+
+    from agents.providers import get_chat_model
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "10"},
+                                  json={"error": {"message": "slow down", "type": "requests"}})
+        return httpx.Response(200, json={
+            "id": "c1", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "ok"}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+
+    llm = get_chat_model(provider="openai", http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+    scheduler = RateLimitScheduler()
+    assert scheduler.call("gpt-4o-mini", lambda: llm.invoke("hi")).content == "ok"
+    assert len(requests) == 2  # No retry inside the SDK
+    stats = scheduler.stats()["gpt-4o-mini"]
+    assert stats["calls"] == 2 and stats["throttled"] == 1
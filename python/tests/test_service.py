@@ -0,0 +1,88 @@
+"""Batches and streams are held to the queue and per-client limits."""
+
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from agents.service import create_app
+
+
+class SlowGraph:
+    def __init__(self, limiter_ref):
+        self.limiter_ref = limiter_ref
+        self.peak_places = 0  # Running plus queued
+
+    async def ainvoke(self, state, config=None):
+        limiter = self.limiter_ref()["limiter"]
+        self.peak_places = max(self.peak_places, limiter.in_flight + limiter.queued)
+        await asyncio.sleep(0.05)
+        return {"messages": []}
+
+    async def astream_events(self, state, config=None, version=None):
+        yield {"event": "on_chain_end", "data": {"output": await self.ainvoke(state, config)}}
+
+
+def run_with_client(scenario, **limits):
+    async def main():
+        app = None
+        graph = SlowGraph(lambda: app)
+        app = create_app(graph, lambda body: {"messages": []}, **limits)
+        async with TestClient(TestServer(app)) as client:
+            return graph, await scenario(client)
+
+    return asyncio.run(main())
+
+
+def test_batch_never_queues_past_its_admission():
+    async def scenario(client):
+        response = await client.post("/batch", json={"tasks": [{"task": str(i)} for i in range(20)]})
+        return response.status, await response.json()
+
+    graph, (status, body) = run_with_client(scenario, max_in_flight=2, max_queue=2, per_client=4)
+    assert status == 200 and body["succeeded"] == 20
+    assert graph.peak_places <= 2 + 2
+
+
+def test_batch_counts_against_the_client_limit():
+    async def scenario(client):
+        headers = {"X-Client-Id": "c1"}
+        first = asyncio.ensure_future(client.post("/batch", headers=headers,
+                                                  json={"tasks": [{"task": str(i)} for i in range(8)]}))
+        await asyncio.sleep(0.01)
+        second = await client.post("/invoke", headers=headers, json={"task": "x"})
+        await first
+        return second.status, second.headers.get("Retry-After")
+
+    _, (status, retry_after) = run_with_client(scenario, max_in_flight=8, max_queue=8, per_client=4)
+    assert status == 429 and retry_after
+
+
+def test_batch_rejected_when_queue_cannot_hold_it():
+    async def scenario(client):
+        busy = [asyncio.ensure_future(client.post("/invoke", headers={"X-Client-Id": f"c{i}"},
+                                                  json={"task": "x"})) for i in range(3)]
+        await asyncio.sleep(0.01)
+        response = await client.post("/batch", headers={"X-Client-Id": "b"},
+                                     json={"tasks": [{"task": str(i)} for i in range(4)]})
+        await asyncio.gather(*busy)
+        return response.status
+
+    _, status = run_with_client(scenario, max_in_flight=1, max_queue=3, per_client=4)
+    assert status == 429
+
+
+def test_concurrent_streams_are_admitted_within_the_queue():
+    async def scenario(client):
+        async def stream(i):
+            response = await client.post("/stream", headers={"X-Client-Id": f"c{i}"}, json={"task": "x"})
+            await response.read()
+            return response.status
+
+        statuses = await asyncio.gather(*(stream(i) for i in range(8)))
+        metrics = await (await client.get("/metrics")).json()
+        return statuses, metrics
+
+    graph, (statuses, metrics) = run_with_client(scenario, max_in_flight=1, max_queue=2, per_client=4)
+    assert statuses.count(200) == 3 and statuses.count(429) == 5
+    assert graph.peak_places <= 3
+    assert metrics["in_flight"] == 0 and metrics["queue_depth"] == 0 and metrics["clients_active"] == {}
@@ -0,0 +1,66 @@
+"""Merged tool calls share results and errors, never cancellation."""
+
+import asyncio
+
+import pytest
+
+from agents.tool_cache import ToolCache
+
+
+def test_cancelled_leader_does_not_cancel_merged_waiters():
+    cache = ToolCache()
+    runs = []
+
+    async def search():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "found"
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.acall("search", {"query": "q"}, search))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.acall("search", {"query": "q"}, search))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(scenario()) == "found"
+    assert len(runs) == 1
+    assert cache.stats()["search"]["merged"] == 1
+    assert cache.call("search", {"query": "q"}, lambda: "not called") == "found"
+
+
+def test_cancelled_waiter_does_not_cancel_the_leader():
+    cache = ToolCache()
+
+    async def search():
+        await asyncio.sleep(0.05)
+        return "found"
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.acall("search", {"query": "q"}, search))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.acall("search", {"query": "q"}, search))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        return await leader
+
+    assert asyncio.run(scenario()) == "found"
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = ToolCache()
+
+    async def search():
+        await asyncio.sleep(0.02)
+        raise ValueError("backend down")
+
+    async def scenario():
+        calls = [cache.acall("search", {"query": "q"}, search) for _ in range(3)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert cache.call("search", {"query": "q"}, lambda: "recovered") == "recovered"